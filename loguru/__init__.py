@@ -30,4 +30,4 @@ logger = _Logger(
 if _defaults.LOGURU_AUTOINIT and _sys.stderr:
     logger.add(_sys.stderr)
 
-_atexit.register(logger.remove)
+_atexit.register(logger._shutdown)
@@ -65,7 +65,8 @@ listed here and might be useful to type hint your code:
   attributes).
 - ``Catcher``: the context decorator returned by |catch|.
 - ``Contextualizer``: the context decorator returned by |contextualize|.
-- ``AwaitableCompleter``: the awaitable object returned by |complete|.
+- ``AwaitableCompleter``: the awaitable object returned by |complete| (with ``pending``
+  attribute).
 - ``RecordFile``: the ``record["file"]`` with ``name`` and ``path`` attributes.
 - ``RecordLevel``: the ``record["level"]`` with ``name``, ``no`` and ``icon`` attributes.
 - ``RecordThread``: the ``record["thread"]`` with ``id`` and ``name`` attributes.
@@ -139,7 +140,10 @@ class _GeneratorContextManager(ContextManager[_T], Generic[_T]):
 
 Catcher = _GeneratorContextManager[None]
 Contextualizer = _GeneratorContextManager[None]
-AwaitableCompleter = Awaitable
+
+class AwaitableCompleter(Awaitable[None]):
+    pending: int
+    def __await__(self) -> Generator[Any, None, None]: ...
 
 class Level(NamedTuple):
     name: str
@@ -212,7 +216,9 @@ class _HandlerConfig(TypedDict, total=False):
     serialize: bool
     backtrace: bool
     diagnose: bool
-    enqueue: bool
+    enqueue: Union[bool, str]
+    queue_size: Optional[int]
+    overflow: str
     catch: bool
 
 class LevelConfig(TypedDict, total=False):
@@ -236,7 +242,9 @@ class Logger:
         serialize: bool = ...,
         backtrace: bool = ...,
         diagnose: bool = ...,
-        enqueue: bool = ...,
+        enqueue: Union[bool, str] = ...,
+        queue_size: Optional[int] = ...,
+        overflow: str = ...,
         catch: bool = ...
     ) -> int: ...
     @overload
@@ -251,9 +259,35 @@ class Logger:
         serialize: bool = ...,
         backtrace: bool = ...,
         diagnose: bool = ...,
-        enqueue: bool = ...,
+        enqueue: Union[bool, str] = ...,
+        queue_size: Optional[int] = ...,
+        overflow: str = ...,
+        catch: bool = ...,
+        loop: Optional[AbstractEventLoop] = ...,
+        max_tasks: Optional[int] = ...,
+        batch_size: None = ...,
+        tasks_overflow: str = ...
+    ) -> int: ...
+    @overload
+    def add(
+        self,
+        sink: Callable[[List[Message]], Awaitable[None]],
+        *,
+        level: Union[str, int] = ...,
+        format: Union[str, FormatFunction] = ...,
+        filter: Optional[Union[str, FilterFunction, FilterDict]] = ...,
+        colorize: Optional[bool] = ...,
+        serialize: bool = ...,
+        backtrace: bool = ...,
+        diagnose: bool = ...,
+        enqueue: Union[bool, str] = ...,
+        queue_size: Optional[int] = ...,
+        overflow: str = ...,
         catch: bool = ...,
-        loop: Optional[AbstractEventLoop] = ...
+        loop: Optional[AbstractEventLoop] = ...,
+        max_tasks: Optional[int] = ...,
+        batch_size: int,
+        tasks_overflow: str = ...
     ) -> int: ...
     @overload
     def add(
@@ -267,19 +301,31 @@ class Logger:
         serialize: bool = ...,
         backtrace: bool = ...,
         diagnose: bool = ...,
-        enqueue: bool = ...,
+        enqueue: Union[bool, str] = ...,
+        queue_size: Optional[int] = ...,
+        overflow: str = ...,
         catch: bool = ...,
         rotation: Optional[Union[str, int, time, timedelta, RotationFunction]] = ...,
         retention: Optional[Union[str, int, timedelta, RetentionFunction]] = ...,
         compression: Optional[Union[str, CompressionFunction]] = ...,
+        compression_level: Optional[int] = ...,
+        compression_buffer_size: Optional[Union[str, int]] = ...,
+        compression_threads: Optional[int] = ...,
         delay: bool = ...,
         mode: str = ...,
-        buffering: int = ...,
+        buffering: Optional[int] = ...,
         encoding: str = ...,
+        flush_size: Optional[Union[str, int]] = ...,
+        flush_count: Optional[int] = ...,
+        flush_interval: Optional[Union[str, float, timedelta]] = ...,
+        flush_level: Optional[Union[str, int]] = ...,
+        background: Optional[Union[bool, str]] = ...,
+        background_timeout: Optional[Union[float, timedelta]] = ...,
         **kwargs: Any
     ) -> int: ...
     def remove(self, handler_id: Optional[int] = ...) -> None: ...
-    def complete(self) -> AwaitableCompleter: ...
+    def complete(self, timeout: Optional[float] = ...) -> AwaitableCompleter: ...
+    async def acomplete(self, timeout: Optional[float] = ...) -> int: ...
     @overload
     def catch(
         self,
@@ -323,6 +369,7 @@ class Logger:
         color: Optional[str] = ...,
         icon: Optional[str] = ...,
     ) -> Level: ...
+    def is_enabled_for(self, level: Union[int, str]) -> bool: ...
     def disable(self, name: Union[str, None]) -> None: ...
     def enable(self, name: Union[str, None]) -> None: ...
     def configure(
@@ -356,6 +403,8 @@ class Logger:
         cast: Union[Dict[str, Callable[[bytes], Any]], Callable[[Dict[str, bytes]], None]] = ...,
         chunk: int = ...
     ) -> Generator[Dict[str, Any], None, None]: ...
+    @staticmethod
+    def register_compression(extension: str, function: Callable[..., None]) -> None: ...
     @overload
     def trace(__self, __message: str, *args: Any, **kwargs: Any) -> None: ...
     @overload
@@ -0,0 +1,37 @@
+def make_activation_tree(activation_list):
+    # The activation rules are stored in a tree indexed by the dotted components of the module
+    # names, so that the status of a module can be found in a time proportional to its depth rather
+    # than to the number of rules. Each node is a "(status, children)" tuple, the status being
+    # "None" if no rule has been explicitly set for the corresponding module.
+    root = [True, {}]
+
+    for dotted_name, status in activation_list:
+        if dotted_name == "":
+            root[0] = status
+            continue
+
+        node = root
+        for part in dotted_name[:-1].split("."):
+            node = node[1].setdefault(part, [None, {}])
+        node[0] = status
+
+    return freeze_node(root)
+
+
+def freeze_node(node):
+    status, children = node
+    return (status, {part: freeze_node(child) for part, child in children.items()})
+
+
+def get_activation_status(tree, name):
+    status, children = tree
+
+    for part in name.split("."):
+        try:
+            node_status, children = children[part]
+        except KeyError:
+            break
+        if node_status is not None:
+            status = node_status
+
+    return status
@@ -1,4 +1,5 @@
 import builtins
+import functools
 import inspect
 import io
 import keyword
@@ -135,6 +136,41 @@ class ExceptionFormatter:
         self._cap_char = self._get_char("\u2514", "->")
         self._catch_point_identifier = " <Loguru catch point here>"
 
+        # Formatters sharing the same configuration produce the same output for a given exception.
+        self.config = (
+            colorize,
+            backtrace,
+            diagnose,
+            None if theme is None else tuple(sorted(theme.items())),
+            None if style is None else tuple(sorted(style.items())),
+            max_length,
+            encoding,
+            hidden_frames_filename,
+            prefix,
+        )
+
+        self._frames_cache = {}
+        self._create_caches()
+
+    def _create_caches(self):
+        # The instance attributes shadow the methods, so that the results are memoized per
+        # formatter. They hold references to "self" and are therefore recreated after pickling.
+        self._is_file_mine = functools.lru_cache(maxsize=512)(self._is_file_mine)
+        self._format_location = functools.lru_cache(maxsize=512)(self._format_location)
+        self._highlight = functools.lru_cache(maxsize=512)(self._syntax_highlighter.highlight)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_is_file_mine"]
+        del state["_format_location"]
+        del state["_highlight"]
+        state["_frames_cache"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._create_caches()
+
     @staticmethod
     def _get_lib_dirs():
         schemes = sysconfig.get_scheme_names()
@@ -156,25 +192,17 @@ class ExceptionFormatter:
             return False
         return not any(filepath.startswith(d) for d in self._lib_dirs)
 
-    def _extract_frames(self, tb, is_first, *, limit=None, from_decorator=False):
-        frames, final_source = [], None
+    def _extract_locations(self, tb, is_first, *, limit=None, from_decorator=False):
+        locations = []
 
         if tb is None or (limit is not None and limit <= 0):
-            return frames, final_source
+            return locations
 
         def is_valid(frame):
             return frame.f_code.co_filename != self._hidden_frames_filename
 
-        def get_info(frame, lineno):
-            filename = frame.f_code.co_filename
-            function = frame.f_code.co_name
-            source = linecache.getline(filename, lineno).strip()
-            return filename, lineno, function, source
-
-        infos = []
-
         if is_valid(tb.tb_frame):
-            infos.append((get_info(tb.tb_frame, tb.tb_lineno), tb.tb_frame))
+            locations.append((tb.tb_frame, tb.tb_lineno, False))
 
         get_parent_only = from_decorator and not self._backtrace
 
@@ -182,33 +210,44 @@ class ExceptionFormatter:
             frame = tb.tb_frame.f_back
             while frame:
                 if is_valid(frame):
-                    infos.insert(0, (get_info(frame, frame.f_lineno), frame))
+                    locations.insert(0, (frame, frame.f_lineno, False))
                     if get_parent_only:
                         break
                 frame = frame.f_back
 
-            if infos and not get_parent_only:
-                (filename, lineno, function, source), frame = infos[-1]
-                function += self._catch_point_identifier
-                infos[-1] = ((filename, lineno, function, source), frame)
+            if locations and not get_parent_only:
+                frame, lineno, _ = locations[-1]
+                locations[-1] = (frame, lineno, True)
 
         tb = tb.tb_next
 
         while tb:
             if is_valid(tb.tb_frame):
-                infos.append((get_info(tb.tb_frame, tb.tb_lineno), tb.tb_frame))
+                locations.append((tb.tb_frame, tb.tb_lineno, False))
             tb = tb.tb_next
 
         if limit is not None:
-            infos = infos[-limit:]
+            locations = locations[-limit:]
+
+        return locations
 
-        for (filename, lineno, function, source), frame in infos:
+    def _extract_frames(self, locations):
+        frames, final_source = [], None
+
+        for frame, lineno, is_catch_point in locations:
+            filename = frame.f_code.co_filename
+            function = frame.f_code.co_name
+            source = linecache.getline(filename, lineno).strip()
             final_source = source
+
+            if is_catch_point:
+                function += self._catch_point_identifier
+
             if source:
                 colorize = self._colorize and self._is_file_mine(filename)
                 lines = []
                 if colorize:
-                    lines.append(self._syntax_highlighter.highlight(source))
+                    lines.append(self._highlight(source))
                 else:
                     lines.append(source)
                 if self._diagnose:
@@ -306,6 +345,33 @@ class ExceptionFormatter:
             v = v[: max_length - 3] + "..."
         return v
 
+    def _format_location(self, file, line, function, prepend_with_new_line):
+        is_mine = self._is_file_mine(file)
+
+        if function is not None:
+            pattern = '  File "{}", line {}, in {}\n'
+        else:
+            pattern = '  File "{}", line {}\n'
+
+        if self._backtrace and function and function.endswith(self._catch_point_identifier):
+            function = function[: -len(self._catch_point_identifier)]
+            pattern = ">" + pattern[1:]
+
+        if self._colorize and is_mine:
+            dirname, basename = os.path.split(file)
+            if dirname:
+                dirname += os.sep
+            dirname = self._theme["dirname"].format(dirname)
+            basename = self._theme["basename"].format(basename)
+            file = dirname + basename
+            line = self._theme["line"].format(line)
+            function = self._theme["function"].format(function)
+
+        if self._diagnose and (is_mine or prepend_with_new_line):
+            pattern = "\n" + pattern
+
+        return pattern.format(file, line, function), is_mine
+
     def _format_locations(self, frames_lines, *, has_introduction):
         prepend_with_new_line = has_introduction
         regex = r'^  File "(?P<file>.*?)", line (?P<line>[^,]+)(?:, in (?P<function>.*))?\n'
@@ -315,37 +381,42 @@ class ExceptionFormatter:
 
             if match:
                 file, line, function = match.group("file", "line", "function")
-
-                is_mine = self._is_file_mine(file)
-
-                if function is not None:
-                    pattern = '  File "{}", line {}, in {}\n'
-                else:
-                    pattern = '  File "{}", line {}\n'
-
-                if self._backtrace and function and function.endswith(self._catch_point_identifier):
-                    function = function[: -len(self._catch_point_identifier)]
-                    pattern = ">" + pattern[1:]
-
-                if self._colorize and is_mine:
-                    dirname, basename = os.path.split(file)
-                    if dirname:
-                        dirname += os.sep
-                    dirname = self._theme["dirname"].format(dirname)
-                    basename = self._theme["basename"].format(basename)
-                    file = dirname + basename
-                    line = self._theme["line"].format(line)
-                    function = self._theme["function"].format(function)
-
-                if self._diagnose and (is_mine or prepend_with_new_line):
-                    pattern = "\n" + pattern
-
-                location = pattern.format(file, line, function)
+                location, is_mine = self._format_location(
+                    file, line, function, prepend_with_new_line
+                )
                 frame = location + frame[match.end() :]
                 prepend_with_new_line = is_mine
 
             yield frame
 
+    def _format_frames(self, locations):
+        # Without "diagnose", the formatted frames only depend on the location of the code being
+        # executed, so the result can be reused for exceptions raised repeatedly at the same place.
+        key = tuple(
+            (frame.f_code.co_filename, frame.f_code.co_name, lineno, is_catch_point)
+            for frame, lineno, is_catch_point in locations
+        )
+
+        try:
+            return self._frames_cache[key]
+        except KeyError:
+            pass
+
+        frames, _ = self._extract_frames(locations)
+        frames_lines = traceback.format_list(frames)
+
+        if self._colorize or self._backtrace:
+            frames_lines = self._format_locations(frames_lines, has_introduction=bool(frames))
+
+        formatted = "".join(frames_lines)
+
+        if len(self._frames_cache) >= 512:
+            self._frames_cache.clear()
+
+        self._frames_cache[key] = formatted
+
+        return formatted
+
     def _format_exception(self, value, tb, *, seen=None, is_first=False, from_decorator=False):
         # Implemented from built-in traceback module: https://git.io/fhHKw
         exc_type, exc_value, exc_traceback = type(value), value, tb
@@ -391,7 +462,7 @@ class ExceptionFormatter:
         except AttributeError:
             tracebacklimit = None
 
-        frames, final_source = self._extract_frames(
+        locations = self._extract_locations(
             exc_traceback, is_first, limit=tracebacklimit, from_decorator=from_decorator
         )
         exception_only = traceback.format_exception_only(exc_type, exc_value)
@@ -407,21 +478,30 @@ class ExceptionFormatter:
             else:
                 error_message = self._theme["exception_type"].format(error_message)
 
-        if self._diagnose and frames:
-            if issubclass(exc_type, AssertionError) and not str(exc_value) and final_source:
-                if self._colorize:
-                    final_source = self._syntax_highlighter.highlight(final_source)
-                error_message += ": " + final_source
+        has_introduction = bool(locations)
 
-            error_message = "\n" + error_message
+        if self._diagnose:
+            frames, final_source = self._extract_frames(locations)
 
-        exception_only[-1] = error_message + "\n"
+            if frames:
+                if issubclass(exc_type, AssertionError) and not str(exc_value) and final_source:
+                    if self._colorize:
+                        final_source = self._highlight(final_source)
+                    error_message += ": " + final_source
 
-        frames_lines = traceback.format_list(frames) + exception_only
-        has_introduction = bool(frames)
+                error_message = "\n" + error_message
 
-        if self._colorize or self._backtrace or self._diagnose:
+            exception_only[-1] = error_message + "\n"
+            frames_lines = traceback.format_list(frames) + exception_only
             frames_lines = self._format_locations(frames_lines, has_introduction=has_introduction)
+            formatted = "".join(frames_lines)
+        else:
+            exception_only[-1] = error_message + "\n"
+            if self._colorize or self._backtrace:
+                exception_only = self._format_locations(
+                    exception_only, has_introduction=has_introduction
+                )
+            formatted = self._format_frames(locations) + "".join(exception_only)
 
         if is_first:
             yield self._prefix
@@ -432,7 +512,7 @@ class ExceptionFormatter:
                 introduction = self._theme["introduction"].format(introduction)
             yield introduction + "\n"
 
-        yield "".join(frames_lines)
+        yield formatted
 
     def format_exception(self, type_, value, tb, *, from_decorator=False):
         yield from self._format_exception(value, tb, is_first=True, from_decorator=from_decorator)
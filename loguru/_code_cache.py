@@ -0,0 +1,57 @@
+from collections import OrderedDict, namedtuple
+from os.path import basename, splitext
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class CodeCache:
+    # The file and module names of a record only depend on the code object of the calling frame.
+    # They are cached to avoid recomputing them for each logged message. Code objects are compared
+    # by identity (equal code objects may come from different files), the cache keeps a reference
+    # to them so that their "id()" can't be reused by another object while the entry exists. Least
+    # recently used entries are evicted once "maxsize" is reached, to not grow indefinitely if code
+    # is generated dynamically.
+
+    def __init__(self, maxsize):
+        self._maxsize = maxsize
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, code):
+        entry = self._cache.get(id(code))
+
+        if entry is not None and entry[0] is code:
+            self._hits += 1
+            try:
+                self._cache.move_to_end(id(code))
+            except KeyError:
+                pass  # The entry has been evicted concurrently by another thread.
+            return entry[1]
+
+        self._misses += 1
+
+        file_path = code.co_filename
+        file_name = basename(file_path)
+        info = (file_name, file_path, splitext(file_name)[0])
+
+        cache = self._cache
+
+        while len(cache) >= self._maxsize:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                # The cache has been emptied concurrently by another thread.
+                break
+
+        cache[id(code)] = (code, info)
+
+        return info
+
+    def cache_info(self):
+        return CacheInfo(self._hits, self._misses, self._maxsize, len(self._cache))
+
+    def cache_clear(self):
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
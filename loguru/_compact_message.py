@@ -0,0 +1,83 @@
+import struct
+from datetime import timedelta, timezone
+
+from ._datetime import datetime
+from ._recattrs import RecordLevel
+
+# year, month, day, hour, minute, second, microsecond, utc offset (seconds), level no, and the sizes
+# of the encoded timezone name, level name, level icon and formatted message following the header.
+header = struct.Struct("<HBBBBBIiiHHHI")
+
+
+def pack_message(message):
+    # Only the fields of the record which may be needed by the sink are kept (e.g. for rotation).
+    # None is returned if they can't be packed (e.g. naive time or unexpected type set by a
+    # patcher).
+    record = message.record
+    time, level = record["time"], record["level"]
+
+    try:
+        offset = time.utcoffset()
+
+        if offset is None:
+            return None
+
+        tzname = (time.tzname() or "").encode("utf8")
+        level_name = level.name.encode("utf8")
+        level_icon = level.icon.encode("utf8")
+        text = str(message).encode("utf8")
+
+        packed_header = header.pack(
+            time.year,
+            time.month,
+            time.day,
+            time.hour,
+            time.minute,
+            time.second,
+            time.microsecond,
+            int(offset.total_seconds()),
+            level.no,
+            len(tzname),
+            len(level_name),
+            len(level_icon),
+            len(text),
+        )
+    except (AttributeError, TypeError, ValueError, struct.error):
+        return None
+
+    return b"".join((packed_header, tzname, level_name, level_icon, text))
+
+
+def unpack_message(data):
+    (
+        year,
+        month,
+        day,
+        hour,
+        minute,
+        second,
+        microsecond,
+        offset,
+        level_no,
+        tzname_size,
+        level_name_size,
+        level_icon_size,
+        text_size,
+    ) = header.unpack_from(data)
+
+    view = memoryview(data)
+    start = header.size
+    tzname = str(view[start : start + tzname_size], "utf8")
+    start += tzname_size
+    level_name = str(view[start : start + level_name_size], "utf8")
+    start += level_name_size
+    level_icon = str(view[start : start + level_icon_size], "utf8")
+    start += level_icon_size
+    text = str(view[start : start + text_size], "utf8")
+
+    tzinfo = timezone(timedelta(seconds=offset), tzname)
+    time = datetime(year, month, day, hour, minute, second, microsecond, tzinfo)
+
+    record = {"level": RecordLevel(level_name, level_no, level_icon), "time": time}
+
+    return text, record
@@ -1,14 +1,134 @@
+import functools
 import re
+import time as time_
 from calendar import day_abbr, day_name, month_abbr, month_name
 from datetime import datetime as datetime_
 from datetime import timedelta, timezone
-from time import localtime, strftime
+from time import localtime, strftime, time
+
+from . import _defaults
 
 tokens = r"H{1,2}|h{1,2}|m{1,2}|s{1,2}|S{1,6}|YYYY|YY|M{1,4}|D{1,4}|Z{1,2}|zz|A|X|x|E|Q|dddd|ddd|d"
 
 pattern = re.compile(r"(?:{0})|\[(?:{0}|!UTC)\]".format(tokens))
 
 
+def format_offset(dt, template):
+    tzinfo = dt.tzinfo or timezone(timedelta(seconds=0))
+    offset = tzinfo.utcoffset(dt).total_seconds()
+    sign = ("-", "+")[offset >= 0]
+    h, m = divmod(abs(offset // 60), 60)
+    return template % (sign, h, m)
+
+
+def format_zone(dt):
+    tzinfo = dt.tzinfo or timezone(timedelta(seconds=0))
+    return tzinfo.tzname(dt) or ""
+
+
+# Tokens whose value only changes once per second, they are rendered once and then cached.
+second_tokens = {
+    "YYYY": lambda dt: "%04d" % dt.year,
+    "YY": lambda dt: "%02d" % (dt.year % 100),
+    "Q": lambda dt: "%d" % ((dt.month - 1) // 3 + 1),
+    "MMMM": lambda dt: month_name[dt.month],
+    "MMM": lambda dt: month_abbr[dt.month],
+    "MM": lambda dt: "%02d" % dt.month,
+    "M": lambda dt: "%d" % dt.month,
+    "DDDD": lambda dt: "%03d" % dt.timetuple().tm_yday,
+    "DDD": lambda dt: "%d" % dt.timetuple().tm_yday,
+    "DD": lambda dt: "%02d" % dt.day,
+    "D": lambda dt: "%d" % dt.day,
+    "dddd": lambda dt: day_name[dt.weekday()],
+    "ddd": lambda dt: day_abbr[dt.weekday()],
+    "d": lambda dt: "%d" % dt.weekday(),
+    "E": lambda dt: "%d" % (dt.weekday() + 1),
+    "HH": lambda dt: "%02d" % dt.hour,
+    "H": lambda dt: "%d" % dt.hour,
+    "hh": lambda dt: "%02d" % ((dt.hour - 1) % 12 + 1),
+    "h": lambda dt: "%d" % ((dt.hour - 1) % 12 + 1),
+    "mm": lambda dt: "%02d" % dt.minute,
+    "m": lambda dt: "%d" % dt.minute,
+    "ss": lambda dt: "%02d" % dt.second,
+    "s": lambda dt: "%d" % dt.second,
+    "A": lambda dt: ("AM", "PM")[dt.hour // 12],
+    "Z": lambda dt: format_offset(dt, "%s%02d:%02d"),
+    "ZZ": lambda dt: format_offset(dt, "%s%02d%02d"),
+    "zz": format_zone,
+    "X": lambda dt: "%d" % dt.timestamp(),
+}
+
+# Tokens which need to be rendered for each formatted datetime.
+subsecond_tokens = {
+    "S": lambda dt: "%d" % (dt.microsecond // 100000),
+    "SS": lambda dt: "%02d" % (dt.microsecond // 10000),
+    "SSS": lambda dt: "%03d" % (dt.microsecond // 1000),
+    "SSSS": lambda dt: "%04d" % (dt.microsecond // 100),
+    "SSSSS": lambda dt: "%05d" % (dt.microsecond // 10),
+    "SSSSSS": lambda dt: "%06d" % dt.microsecond,
+    "x": lambda dt: "%d" % (int(dt.timestamp()) * 1000000 + dt.microsecond),
+}
+
+
+class CompiledFormat:
+    def __init__(self, parts):
+        self._parts = parts
+        self._is_subsecond = any(token in subsecond_tokens for _, token in parts)
+        self._cache = (None, None, None)
+
+    def format(self, dt):
+        key = (dt.second, dt.minute, dt.hour, dt.day, dt.month, dt.year)
+        cached_key, cached_tzinfo, rendered = self._cache
+
+        if key != cached_key or dt.tzinfo is not cached_tzinfo:
+            rendered = self._render_second(dt)
+            self._cache = (key, dt.tzinfo, rendered)
+
+        if not self._is_subsecond:
+            return rendered
+
+        return "".join([part if part.__class__ is str else part(dt) for part in rendered])
+
+    def _render_second(self, dt):
+        rendered = [""]
+
+        for literal, token in self._parts:
+            rendered[-1] += literal
+            if token is None:
+                continue
+            if token in subsecond_tokens:
+                rendered.append(subsecond_tokens[token])
+                rendered.append("")
+            else:
+                rendered[-1] += second_tokens[token](dt)
+
+        if not self._is_subsecond:
+            return rendered[0]
+
+        return [part for part in rendered if part != ""]
+
+
+@functools.lru_cache(maxsize=64)
+def compile_format(spec):
+    parts = []
+    literal = ""
+    position = 0
+
+    for match in pattern.finditer(spec):
+        literal += spec[position : match.start()]
+        token = match.group(0)
+        position = match.end()
+        if token in second_tokens or token in subsecond_tokens:
+            parts.append((literal, token))
+            literal = ""
+        else:
+            literal += token[1:-1]
+
+    parts.append((literal + spec[position:], None))
+
+    return CompiledFormat(parts)
+
+
 class datetime(datetime_):
     def __format__(self, spec):
         if spec.endswith("!UTC"):
@@ -23,73 +143,80 @@ class datetime(datetime_):
         if "%" in spec:
             return datetime_.__format__(dt, spec)
 
-        year, month, day, hour, minute, second, weekday, yearday, _ = dt.timetuple()
-        microsecond = dt.microsecond
-        timestamp = dt.timestamp()
-        tzinfo = dt.tzinfo or timezone(timedelta(seconds=0))
-        offset = tzinfo.utcoffset(dt).total_seconds()
-        sign = ("-", "+")[offset >= 0]
-        h, m = divmod(abs(offset // 60), 60)
-
-        rep = {
-            "YYYY": "%04d" % year,
-            "YY": "%02d" % (year % 100),
-            "Q": "%d" % ((month - 1) // 3 + 1),
-            "MMMM": month_name[month],
-            "MMM": month_abbr[month],
-            "MM": "%02d" % month,
-            "M": "%d" % month,
-            "DDDD": "%03d" % yearday,
-            "DDD": "%d" % yearday,
-            "DD": "%02d" % day,
-            "D": "%d" % day,
-            "dddd": day_name[weekday],
-            "ddd": day_abbr[weekday],
-            "d": "%d" % weekday,
-            "E": "%d" % (weekday + 1),
-            "HH": "%02d" % hour,
-            "H": "%d" % hour,
-            "hh": "%02d" % ((hour - 1) % 12 + 1),
-            "h": "%d" % ((hour - 1) % 12 + 1),
-            "mm": "%02d" % minute,
-            "m": "%d" % minute,
-            "ss": "%02d" % second,
-            "s": "%d" % second,
-            "S": "%d" % (microsecond // 100000),
-            "SS": "%02d" % (microsecond // 10000),
-            "SSS": "%03d" % (microsecond // 1000),
-            "SSSS": "%04d" % (microsecond // 100),
-            "SSSSS": "%05d" % (microsecond // 10),
-            "SSSSSS": "%06d" % microsecond,
-            "A": ("AM", "PM")[hour // 12],
-            "Z": "%s%02d:%02d" % (sign, h, m),
-            "ZZ": "%s%02d%02d" % (sign, h, m),
-            "zz": tzinfo.tzname(dt) or "",
-            "X": "%d" % timestamp,
-            "x": "%d" % (int(timestamp) * 1000000 + microsecond),
-        }
-
-        def get(m):
-            try:
-                return rep[m.group(0)]
-            except KeyError:
-                return m.group(0)[1:-1]
-
-        return pattern.sub(get, spec)
-
-
-def aware_now():
-    now = datetime.now()
-    timestamp = now.timestamp()
-    local = localtime(timestamp)
-
-    try:
-        seconds = local.tm_gmtoff
-        zone = local.tm_zone
-    except AttributeError:
-        offset = datetime.fromtimestamp(timestamp) - datetime.utcfromtimestamp(timestamp)
-        seconds = offset.total_seconds()
-        zone = strftime("%Z")
-
-    tzinfo = timezone(timedelta(seconds=seconds), zone)
-    return now.replace(tzinfo=tzinfo)
+        return compile_format(spec).format(dt)
+
+
+class LocalTimezoneCache:
+    # Computing the local timezone requires a few costly calls for each logged message, but the
+    # UTC offset only changes at DST transitions, which always happen on a whole minute. The same
+    # "tzinfo" instance is thus reused as long as the current time stays within the minute it was
+    # computed for and the offset did not change. Calling "time.tzset()" replaces "time.tzname",
+    # this is used to detect configuration changes and invalidate the cache.
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._state = (0, 0, None, None, None, None)
+
+    def get(self, timestamp):
+        start, end, tzname, seconds, zone, tzinfo = self._state
+
+        if start <= timestamp < end and tzname is time_.tzname:
+            return tzinfo
+
+        tzname = time_.tzname
+        local = localtime(timestamp)
+
+        try:
+            new_seconds = local.tm_gmtoff
+            new_zone = local.tm_zone
+        except AttributeError:
+            offset = datetime.fromtimestamp(timestamp) - datetime.utcfromtimestamp(timestamp)
+            new_seconds = offset.total_seconds()
+            new_zone = strftime("%Z")
+
+        if tzinfo is None or new_seconds != seconds or new_zone != zone:
+            tzinfo = timezone(timedelta(seconds=new_seconds), new_zone)
+
+        start = timestamp - timestamp % 60
+        end = start + 60
+
+        # The state is replaced at once so that it stays consistent across threads.
+        self._state = (start, end, tzname, new_seconds, new_zone, tzinfo)
+
+        return tzinfo
+
+
+local_timezone_cache = LocalTimezoneCache()
+
+
+def from_timestamp(timestamp, tzinfo):
+    # Instantiating a subclass of "datetime" is slow, so it's done once from the base class fields.
+    dt = datetime_.fromtimestamp(timestamp, tzinfo)
+    return datetime(
+        dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.microsecond, tzinfo
+    )
+
+
+def local_now():
+    timestamp = time()
+    return from_timestamp(timestamp, local_timezone_cache.get(timestamp))
+
+
+def utc_now():
+    return from_timestamp(time(), timezone.utc)
+
+
+def load_aware_now_function(clock):
+    if clock == "local":
+        return local_now
+    elif clock == "utc":
+        return utc_now
+    else:
+        raise ValueError(
+            "Invalid environment variable 'LOGURU_CLOCK' (expected 'local' or 'utc'): '%s'" % clock
+        )
+
+
+aware_now = load_aware_now_function(_defaults.LOGURU_CLOCK)
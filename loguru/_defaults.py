@@ -42,7 +42,11 @@ LOGURU_SERIALIZE = env("LOGURU_SERIALIZE", bool, False)
 LOGURU_BACKTRACE = env("LOGURU_BACKTRACE", bool, True)
 LOGURU_DIAGNOSE = env("LOGURU_DIAGNOSE", bool, True)
 LOGURU_ENQUEUE = env("LOGURU_ENQUEUE", bool, False)
+LOGURU_ENQUEUE_BATCH_SIZE = env("LOGURU_ENQUEUE_BATCH_SIZE", int, 1000)
+LOGURU_SHARED_MEMORY_SIZE = env("LOGURU_SHARED_MEMORY_SIZE", int, 4 * 1024 * 1024)
 LOGURU_CATCH = env("LOGURU_CATCH", bool, True)
+LOGURU_SHUTDOWN_TIMEOUT = env("LOGURU_SHUTDOWN_TIMEOUT", int, 10)
+LOGURU_CLOCK = env("LOGURU_CLOCK", str, "local")
 
 LOGURU_TRACE_NO = env("LOGURU_TRACE_NO", int, 5)
 LOGURU_TRACE_COLOR = env("LOGURU_TRACE_COLOR", str, "<cyan><bold>")
@@ -0,0 +1,251 @@
+import multiprocessing
+import os
+import sys
+import threading
+import traceback
+from threading import Thread
+
+from ._handler import Message, ThreadCounter, ThreadQueue
+from ._locks_machinery import create_handler_lock
+
+
+class Dispatcher:
+    """A multiprocess queue and a writer thread shared by the handlers using ``enqueue="shared"``.
+
+    Each logged record is put only once in the queue, along with the messages formatted by all the
+    handlers it is intended for. As there is a single writer thread, messages are written to each
+    sink in the order they were logged.
+    """
+
+    def __init__(self, batch_size):
+        self._batch_size = batch_size
+        self._queue = self._create_queue()
+        self._handlers = {}
+        self._stop_events = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._owner_process_pid = os.getpid()
+
+        # Shared with the handlers so that "logger.complete()" can wait for their messages.
+        self.enqueued_count = self._create_counter()
+        self.written_count = self._create_counter()
+        self.written_event = self._create_event()
+
+        self._thread = Thread(target=self._dispatcher, daemon=True, name="loguru-dispatcher")
+        self._thread.start()
+
+    def _create_queue(self):
+        return multiprocessing.SimpleQueue()
+
+    def _create_event(self):
+        return multiprocessing.Event()
+
+    def _create_counter(self):
+        return multiprocessing.Value("Q", 0)
+
+    def accepts_handlers(self):
+        return not self._closed and self._owner_process_pid == os.getpid()
+
+    def register(self, handler_id, handler):
+        with self._lock:
+            self._handlers[handler_id] = handler
+
+    def unregister(self, handler_id):
+        # The handler is only unregistered once the messages queued for it have been written.
+        event = threading.Event()
+
+        with self._lock:
+            self._stop_events[handler_id] = event
+
+        self._queue.put((None, None, handler_id))
+
+        # The thread may have been killed by an error which is not an "Exception".
+        while not event.wait(0.1):
+            if not self._thread.is_alive():
+                break
+
+        with self._lock:
+            del self._handlers[handler_id]
+            if self._handlers:
+                return
+            self._closed = True
+
+        self._queue.put(None)
+        self._thread.join()
+        if hasattr(self._queue, "close"):
+            self._queue.close()
+
+    def put(self, record, context, messages):
+        # The record is counted before being put, as it may be written before "put()" returns.
+        with self.enqueued_count.get_lock():
+            self.enqueued_count.value += 1
+
+        try:
+            self._queue.put(self._make_entry(record, context, messages))
+        except Exception:
+            self._count_written(1)
+            for handler, _ in messages:
+                handler.intercept_error(record)
+
+    def _make_entry(self, record, context, messages):
+        return (record, None, [(handler.id, text) for handler, text in messages])
+
+    def _dispatcher(self):
+        queue = self._queue
+        batch_size = self._batch_size
+
+        # We need to use a lock to protect sinks during fork.
+        lock = create_handler_lock()
+
+        # Messages of each handler are accumulated so that sinks can write them at once.
+        pending = {}
+        count = 0
+
+        while True:
+            try:
+                entry = queue.get()
+            except Exception:
+                with lock:
+                    self._write_pending(pending, count + 1)
+                pending, count = {}, 0
+                for handler in list(self._handlers.values()):
+                    try:
+                        handler.intercept_error(None)
+                    except Exception:
+                        self._print_error()
+                continue
+
+            if entry is None:
+                with lock:
+                    self._write_pending(pending, count)
+                break
+
+            record, context, messages = entry
+
+            if record is None:
+                with lock:
+                    self._write_pending(pending, count)
+                pending, count = {}, 0
+                with self._lock:
+                    event = self._stop_events.pop(messages)
+                event.set()
+                continue
+
+            self._collect(record, context, messages, pending)
+            count += 1
+
+            if count >= batch_size or queue.empty():
+                with lock:
+                    self._write_pending(pending, count)
+                pending, count = {}, 0
+
+    def _collect(self, record, context, messages, pending):
+        for handler_id, text in messages:
+            message = Message(text)
+            message.record = record
+            pending.setdefault(handler_id, []).append(message)
+
+    def _write_pending(self, pending, count):
+        try:
+            for handler_id, messages in pending.items():
+                handler = self._handlers.get(handler_id)
+                if handler is None:
+                    continue
+                try:
+                    handler.write_messages(messages, self._print_error)
+                except Exception:
+                    self._print_error()
+        finally:
+            self._count_written(count)
+
+    def _count_written(self, count):
+        with self.written_count.get_lock():
+            self.written_count.value += count
+        self.written_event.set()
+
+    @staticmethod
+    def _print_error():
+        # Errors not caught by a handler ("catch=False") would usually stop its writer thread, but
+        # this one is shared by other handlers, so the exception is only reported.
+        if sys.stderr:
+            traceback.print_exc(file=sys.stderr)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_handlers"] = {}
+        state["_stop_events"] = {}
+        state["_lock"] = None
+        state["_thread"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class DeferredDispatcher(Dispatcher):
+    """An in-process queue and a writer thread shared by the handlers using ``enqueue="deferred"``.
+
+    Only the raw record is put in the queue, the writer thread is responsible for filtering and
+    formatting it for each handler. This removes almost all the logging cost from the caller.
+    """
+
+    def _create_queue(self):
+        return ThreadQueue()
+
+    def _create_event(self):
+        return threading.Event()
+
+    def _create_counter(self):
+        return ThreadCounter()
+
+    def _make_entry(self, record, context, messages):
+        # If the record has an exception, it was formatted by the caller for each handler.
+        formatted_exceptions = next((text for _, text in messages if text is not None), None)
+        return (record, (context, formatted_exceptions), [handler.id for handler, _ in messages])
+
+    def _collect(self, record, context, handler_ids, pending):
+        context, formatted_exceptions = context
+        level_id, from_decorator, is_raw, colored_message = context
+
+        # Handlers configured identically share the formatting of the exception and message.
+        if formatted_exceptions is None:
+            formatted_exceptions = {}
+        formatted_messages = {}
+
+        for handler_id in handler_ids:
+            handler = self._handlers.get(handler_id)
+            if handler is None:
+                continue
+            try:
+                message = handler.prepare_message(
+                    record,
+                    level_id,
+                    from_decorator,
+                    is_raw,
+                    colored_message,
+                    formatted_exceptions,
+                    formatted_messages,
+                )
+            except Exception:
+                self._print_error()
+                continue
+            if message is not None:
+                pending.setdefault(handler_id, []).append(message)
+
+
+def dispatch(record, context, messages):
+    dispatcher = messages[0][0].dispatcher
+
+    if all(handler.dispatcher is dispatcher for handler, _ in messages):
+        dispatcher.put(record, context, messages)
+        return
+
+    # Handlers may have been added with different dispatchers, e.g. from a child process.
+    grouped = {}
+
+    for handler, text in messages:
+        grouped.setdefault(handler.dispatcher, []).append((handler, text))
+
+    for dispatcher, messages_ in grouped.items():
+        dispatcher.put(record, context, messages_)
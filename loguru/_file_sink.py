@@ -1,15 +1,32 @@
+import bisect
+import collections
+import concurrent.futures
+import contextlib
 import datetime as datetime_
 import decimal
+import fnmatch
 import glob
+import importlib
+import inspect
+import io
+import multiprocessing
 import numbers
 import os
+import re
 import shutil
 import string
+import sys
+import threading
+import traceback
 from functools import partial
 
 from . import _string_parsers as string_parsers
 from ._ctime_functions import get_ctime, set_ctime
 from ._datetime import aware_now, datetime
+from ._locks_machinery import create_handler_lock
+
+# Files are usually compressed long after being written, they are read by large chunks.
+COMPRESSION_BUFFER_SIZE = 1024 * 1024
 
 
 def generate_rename_path(root, ext, creation_time):
@@ -37,6 +54,9 @@ class FileDateFormatter:
 
 
 class Compression:
+    codecs = {}
+    requirements = {}
+
     @staticmethod
     def add_compress(path_in, path_out, opener, **kwargs):
         with opener(path_out, **kwargs) as f_comp:
@@ -48,10 +68,148 @@ class Compression:
             f_comp.write(path_in, os.path.basename(path_in))
 
     @staticmethod
-    def copy_compress(path_in, path_out, opener, **kwargs):
+    def copy_compress(path_in, path_out, opener, buffer_size, **kwargs):
         with open(path_in, "rb") as f_in:
             with opener(path_out, **kwargs) as f_out:
-                shutil.copyfileobj(f_in, f_out)
+                shutil.copyfileobj(f_in, f_out, buffer_size)
+
+    @staticmethod
+    def gzip_members_compress(path_in, path_out, level, buffer_size, threads):
+        # Blocks are compressed concurrently (zlib releases the GIL) as independent gzip members.
+        # Their concatenation is a valid gzip file, readable by any decompressor.
+        import zlib
+
+        def compress_block(block):
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            return compressor.compress(block) + compressor.flush()
+
+        with open(path_in, "rb") as f_in, open(path_out, "wb") as f_out:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+                pending = collections.deque()
+                empty = True
+
+                for block in iter(partial(f_in.read, buffer_size), b""):
+                    empty = False
+                    try:
+                        future = executor.submit(compress_block, block)
+                    except RuntimeError:
+                        # Threads can't be started anymore while the interpreter is exiting.
+                        future = concurrent.futures.Future()
+                        future.set_result(compress_block(block))
+                    pending.append(future)
+
+                    # Limit the memory used by blocks read in advance.
+                    if len(pending) >= 2 * threads:
+                        f_out.write(pending.popleft().result())
+
+                while pending:
+                    f_out.write(pending.popleft().result())
+
+                if empty:
+                    f_out.write(compress_block(b""))
+
+    @staticmethod
+    def compress_gz(path_in, path_out, level=9, buffer_size=COMPRESSION_BUFFER_SIZE, threads=1):
+        if threads > 1:
+            Compression.gzip_members_compress(path_in, path_out, level, buffer_size, threads)
+            return
+
+        import gzip
+
+        Compression.copy_compress(
+            path_in, path_out, gzip.open, buffer_size, mode="wb", compresslevel=level
+        )
+
+    @staticmethod
+    def compress_bz2(path_in, path_out, level=9, buffer_size=COMPRESSION_BUFFER_SIZE):
+        import bz2
+
+        Compression.copy_compress(
+            path_in, path_out, bz2.open, buffer_size, mode="wb", compresslevel=level
+        )
+
+    @staticmethod
+    def compress_xz(path_in, path_out, level=None, buffer_size=COMPRESSION_BUFFER_SIZE):
+        import lzma
+
+        Compression.copy_compress(
+            path_in,
+            path_out,
+            lzma.open,
+            buffer_size,
+            mode="wb",
+            format=lzma.FORMAT_XZ,
+            preset=level,
+        )
+
+    @staticmethod
+    def compress_lzma(path_in, path_out, level=None, buffer_size=COMPRESSION_BUFFER_SIZE):
+        import lzma
+
+        Compression.copy_compress(
+            path_in,
+            path_out,
+            lzma.open,
+            buffer_size,
+            mode="wb",
+            format=lzma.FORMAT_ALONE,
+            preset=level,
+        )
+
+    @staticmethod
+    def compress_tar(path_in, path_out):
+        import tarfile
+
+        Compression.add_compress(path_in, path_out, tarfile.open, mode="w:")
+
+    @staticmethod
+    def compress_tar_gz(path_in, path_out, level=9):
+        import tarfile
+
+        Compression.add_compress(path_in, path_out, tarfile.open, mode="w:gz", compresslevel=level)
+
+    @staticmethod
+    def compress_tar_bz2(path_in, path_out, level=9):
+        import tarfile
+
+        Compression.add_compress(path_in, path_out, tarfile.open, mode="w:bz2", compresslevel=level)
+
+    @staticmethod
+    def compress_tar_xz(path_in, path_out, level=None):
+        import tarfile
+
+        Compression.add_compress(path_in, path_out, tarfile.open, mode="w:xz", preset=level)
+
+    @staticmethod
+    def compress_zip(path_in, path_out, level=None):
+        import zipfile
+
+        options = {"mode": "w", "compression": zipfile.ZIP_DEFLATED}
+        # The level of the archive can only be chosen since Python 3.7.
+        if level is not None and sys.version_info >= (3, 7):
+            options["compresslevel"] = level
+        Compression.write_compress(path_in, path_out, zipfile.ZipFile, **options)
+
+    @staticmethod
+    def register(extension, function):
+        if not isinstance(extension, str):
+            raise TypeError(
+                "Invalid compression extension, it should be a string, not: '%s'"
+                % type(extension).__name__
+            )
+        if not callable(function):
+            raise TypeError(
+                "Invalid compression function, it should be a callable, not: '%s'"
+                % type(function).__name__
+            )
+
+        extension = extension.strip().lstrip(".")
+
+        if not extension:
+            raise ValueError("The compression extension must not be empty")
+
+        Compression.codecs[extension] = function
+        Compression.requirements.pop(extension, None)
 
     @staticmethod
     def compression(path_in, ext, compress_function):
@@ -66,21 +224,192 @@ class Compression:
         os.remove(path_in)
 
 
+# The modules needed by built-in formats are imported while adding the sink, to fail early.
+Compression.requirements.update(
+    {
+        "gz": ("gzip",),
+        "bz2": ("bz2",),
+        "xz": ("lzma",),
+        "lzma": ("lzma",),
+        "tar": ("tarfile",),
+        "tar.gz": ("gzip", "tarfile"),
+        "tar.bz2": ("bz2", "tarfile"),
+        "tar.xz": ("lzma", "tarfile"),
+        "zip": ("zipfile",),
+    }
+)
+
+Compression.codecs.update(
+    {
+        "gz": Compression.compress_gz,
+        "bz2": Compression.compress_bz2,
+        "xz": Compression.compress_xz,
+        "lzma": Compression.compress_lzma,
+        "tar": Compression.compress_tar,
+        "tar.gz": Compression.compress_tar_gz,
+        "tar.bz2": Compression.compress_tar_bz2,
+        "tar.xz": Compression.compress_tar_xz,
+        "zip": Compression.compress_zip,
+    }
+)
+
+
 class Retention:
     @staticmethod
-    def retention_count(logs, number):
-        def key_log(log):
-            return (-os.stat(log).st_mtime, log)
-
-        for log in sorted(logs, key=key_log)[number:]:
-            os.remove(log)
+    def retention_count(index, number):
+        for path in index.paths()[number:]:
+            index.remove(path)
 
     @staticmethod
-    def retention_age(logs, seconds):
+    def retention_age(index, seconds):
         t = datetime.now().timestamp()
-        for log in logs:
-            if os.stat(log).st_mtime <= t - seconds:
-                os.remove(log)
+        for path, mtime, _ in index.oldest():
+            if mtime > t - seconds:
+                break
+            index.remove(path)
+
+    @staticmethod
+    def retention_size(index, size):
+        for path, _, _ in index.oldest():
+            if index.total_size <= size:
+                break
+            index.remove(path)
+
+    @staticmethod
+    def retention_function(index, function):
+        function(index.paths())
+
+
+class RetentionIndex:
+    """The files matching the patterns of a sink, sorted by modification time.
+
+    The directories are listed with "os.scandir()" each time the retention is applied, but only the
+    files which were not already known are queried with "os.stat()". Rotated files are not supposed
+    to change, this avoids slowing down the rotation as old files accumulate.
+    """
+
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, glob_patterns):
+        self._lock = threading.Lock()
+        self._directories = {}
+        self._files = {}  # Mapping of path to (mtime, size).
+        self._sorted = []  # List of (-mtime, path), newest first.
+        self.total_size = 0
+
+        for pattern in glob_patterns:
+            directory, name = os.path.split(pattern)
+            self._directories.setdefault(directory, []).append(name)
+
+    @classmethod
+    def get(cls, glob_patterns):
+        key = tuple(glob_patterns)
+        with cls._indexes_lock:
+            index = cls._indexes.get(key)
+            if index is None:
+                index = cls._indexes[key] = cls(glob_patterns)
+            return index
+
+    @classmethod
+    def forget(cls, glob_patterns):
+        with cls._indexes_lock:
+            cls._indexes.pop(tuple(glob_patterns), None)
+
+    @classmethod
+    def _reset_at_fork(cls):
+        # The locks may have been acquired by a thread which doesn't exist in the child process.
+        cls._indexes = {}
+        cls._indexes_lock = threading.Lock()
+
+    def apply(self, retention_function, current_path, modified_before=None):
+        with self._lock:
+            self._refresh(current_path, modified_before)
+            retention_function(self)
+
+    def paths(self):
+        return [path for _, path in self._sorted]
+
+    def oldest(self):
+        return [(path, -key, self._files[path][1]) for key, path in reversed(self._sorted)]
+
+    def remove(self, path):
+        os.remove(path)
+        self._discard(path)
+
+    def _refresh(self, current_path, modified_before):
+        found = {}
+
+        for directory, names in self._directories.items():
+            if glob.has_magic(directory):
+                self._scan_glob(directory, names, current_path, found)
+            else:
+                self._scan_directory(directory, names, current_path, found)
+
+        for path in [path for path in self._files if path not in found]:
+            self._discard(path)
+
+        for path, stat in found.items():
+            if stat is None:
+                continue
+            if modified_before is not None and stat.st_mtime >= modified_before:
+                continue  # Not indexed, it may still be modified.
+            self._add(path, stat.st_mtime, stat.st_size)
+
+    def _scan_directory(self, directory, names, current_path, found):
+        absolute_directory = os.path.abspath(directory)
+
+        try:
+            entries = os.scandir(directory or os.curdir)
+        except FileNotFoundError:
+            return
+
+        try:
+            for entry in entries:
+                name = entry.name
+                # Hidden files are only matched explicitly, like "glob.glob()" does.
+                if not any(
+                    fnmatch.fnmatch(name, pattern)
+                    for pattern in names
+                    if name[0] != "." or pattern[0] == "."
+                ):
+                    continue
+                if os.path.join(absolute_directory, name) == current_path:
+                    continue
+                if not entry.is_file():
+                    continue
+
+                path = os.path.join(directory, name)
+                found[path] = None if path in self._files else entry.stat()
+        finally:
+            # The iterator can't be closed explicitly before Python 3.6, it is released once
+            # exhausted instead.
+            if hasattr(entries, "close"):
+                entries.close()
+
+    def _scan_glob(self, directory, names, current_path, found):
+        for name in names:
+            for path in glob.glob(os.path.join(directory, name)):
+                if path in found or os.path.abspath(path) == current_path:
+                    continue
+                if not os.path.isfile(path):
+                    continue
+                found[path] = None if path in self._files else os.stat(path)
+
+    def _add(self, path, mtime, size):
+        self._files[path] = (mtime, size)
+        self.total_size += size
+        bisect.insort(self._sorted, (-mtime, path))
+
+    def _discard(self, path):
+        mtime, size = self._files.pop(path)
+        self.total_size -= size
+        item = (-mtime, path)
+        del self._sorted[bisect.bisect_left(self._sorted, item)]
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=RetentionIndex._reset_at_fork)
 
 
 class Rotation:
@@ -99,10 +428,10 @@ class Rotation:
     def forward_interval(t, interval):
         return t + interval
 
-    @staticmethod
-    def rotation_size(message, file, size_limit):
-        file.seek(0, 2)
-        return file.tell() + len(message) > size_limit
+    class RotationSize:
+        # The size of the file is tracked by the sink itself, to avoid querying it for each message.
+        def __init__(self, size_limit):
+            self.size_limit = size_limit
 
     class RotationTime:
         def __init__(self, step_forward, time_init=None):
@@ -135,6 +464,132 @@ class Rotation:
             return False
 
 
+def archive_file(
+    path, compression_function, retention_function, glob_patterns, current_path, modified_before
+):
+    if compression_function is not None and path is not None:
+        compression_function(path)
+
+    if retention_function is not None:
+        # The file currently written may already exist if this is done in background.
+        index = RetentionIndex.get(glob_patterns)
+        index.apply(retention_function, current_path, modified_before)
+
+
+class ArchiveWorker:
+    """Run the compression and retention of rotated files in a background thread or process.
+
+    The files waiting to be compressed are listed in a journal next to the logs, so that their
+    compression can be resumed by the next process using the same sink if this one is interrupted.
+    """
+
+    def __init__(self, kind, journal_path):
+        self._kind = kind
+        self._journal_path = journal_path
+        self._executor = None
+        self._owner_process_pid = None
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    def pending_paths(self):
+        try:
+            with open(self._journal_path, encoding="utf8") as file:
+                return [path for path in file.read().splitlines() if path]
+        except FileNotFoundError:
+            return []
+
+    def discard(self, path):
+        self._update_journal(remove=path)
+
+    def submit(self, path, args):
+        if path is not None:
+            self._update_journal(add=path)
+
+        try:
+            future = self._get_executor().submit(archive_file, path, *args)
+        except RuntimeError:
+            # New tasks can't be submitted while the interpreter is exiting.
+            archive_file(path, *args)
+            if path is not None:
+                self._update_journal(remove=path)
+            return
+
+        with self._lock:
+            self._futures.add(future)
+
+        future.add_done_callback(partial(self._on_done, path))
+
+    def wait(self, timeout):
+        with self._lock:
+            futures = list(self._futures)
+
+        _, not_done = concurrent.futures.wait(futures, timeout)
+
+        if self._executor is not None:
+            # Unfinished compressions remain in the journal and will be resumed later.
+            self._executor.shutdown(wait=not not_done)
+            self._executor = None
+
+        return not not_done
+
+    def _get_executor(self):
+        # The executor can't be used by child processes, they need their own.
+        if self._executor is None or self._owner_process_pid != os.getpid():
+            if self._kind == "process":
+                # The process is started while the handler is locked, it can't be forked.
+                context = multiprocessing.get_context("spawn")
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=1, mp_context=context
+                )
+            else:
+                # Naming the thread is only possible since Python 3.6.
+                options = {"max_workers": 1}
+                if sys.version_info >= (3, 6):
+                    options["thread_name_prefix"] = "loguru-archive"
+                self._executor = concurrent.futures.ThreadPoolExecutor(**options)
+            self._owner_process_pid = os.getpid()
+        return self._executor
+
+    def _on_done(self, path, future):
+        with self._lock:
+            self._futures.discard(future)
+
+        if future.cancelled():
+            return
+
+        exception = future.exception()
+
+        if exception is not None:
+            if sys.stderr:
+                sys.stderr.write("Loguru: Failed to archive '%s' in background\n" % path)
+                traceback.print_exception(
+                    type(exception), exception, exception.__traceback__, file=sys.stderr
+                )
+            return
+
+        if path is not None:
+            self._update_journal(remove=path)
+
+    def _update_journal(self, *, add=None, remove=None):
+        with self._lock:
+            paths = self.pending_paths()
+
+            if add is not None and add not in paths:
+                paths.append(add)
+            if remove is not None and remove in paths:
+                paths.remove(remove)
+
+            if not paths:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self._journal_path)
+                return
+
+            temporary_path = self._journal_path + ".tmp"
+            with open(temporary_path, "w", encoding="utf8") as file:
+                file.write("".join(path + "\n" for path in paths))
+            os.replace(temporary_path, self._journal_path)
+
+
 class FileSink:
     def __init__(
         self,
@@ -143,37 +598,206 @@ class FileSink:
         rotation=None,
         retention=None,
         compression=None,
+        compression_level=None,
+        compression_buffer_size=None,
+        compression_threads=None,
         delay=False,
         mode="a",
-        buffering=1,
+        buffering=None,
         encoding="utf8",
+        flush_size=None,
+        flush_count=None,
+        flush_interval=None,
+        flush_level=None,
+        background=None,
+        background_timeout=None,
         **kwargs
     ):
         self.encoding = encoding
 
+        self._flush_size = self._make_flush_size(flush_size)
+        self._flush_count = self._make_flush_count(flush_count)
+        self._flush_interval = self._make_flush_interval(flush_interval)
+        self._flush_level = self._make_flush_level(flush_level)
+        self._is_buffered = any(
+            option is not None for option in (flush_size, flush_count, flush_interval, flush_level)
+        )
+
+        if buffering is None:
+            buffering = self._make_buffering(self._is_buffered, self._flush_size)
+
         self._kwargs = {**kwargs, "mode": mode, "buffering": buffering, "encoding": self.encoding}
         self._path = str(path)
 
         self._glob_patterns = self._make_glob_patterns(self._path)
         self._rotation_function = self._make_rotation_function(rotation)
         self._retention_function = self._make_retention_function(retention)
-        self._compression_function = self._make_compression_function(compression)
+        self._compression_function = self._make_compression_function(
+            compression,
+            self._make_compression_options(
+                compression_level, compression_buffer_size, compression_threads
+            ),
+        )
+
+        self._size_limit = None
+        self._errors = kwargs.get("errors") or "strict"
+        self._newline_overhead = self._make_newline_overhead(kwargs.get("newline"))
+
+        if isinstance(self._rotation_function, Rotation.RotationSize):
+            self._size_limit = self._rotation_function.size_limit
+
+        self._archive_worker = self._make_archive_worker(background, self._path)
+        self._background_timeout = self._make_background_timeout(background_timeout)
 
         self._file = None
         self._file_path = None
+        self._file_size = 0
+
+        if self._archive_worker is not None:
+            # Compressions interrupted by the end of a previous process are resumed.
+            for pending_path in self._archive_worker.pending_paths():
+                if os.path.isfile(pending_path):
+                    # The retention can't know which files are still in use, it waits the rotation.
+                    self._archive(pending_path, retain=False)
+                else:
+                    self._archive_worker.discard(pending_path)
+
+        # Messages written since the last flush, only tracked if a flush policy is configured.
+        self._unflushed_count = 0
+        self._unflushed_size = 0
+
+        # The file is also flushed by a timer thread, which is started at the first message.
+        self._lock = None
+        self._timer_stop = None
+        self._timer_pid = None
+
+        if self._flush_interval is not None:
+            self._lock = create_handler_lock()
 
         if not delay:
             self._initialize_file()
 
     def write(self, message):
+        if self._lock is None:
+            self._write(message)
+            return
+
+        with self._lock:
+            self._start_flush_timer()
+            self._write(message)
+
+    def write_batch(self, messages):
+        # Return False if the messages must be written one by one instead.
+        if self._lock is None:
+            return self._write_batch(messages)
+
+        with self._lock:
+            self._start_flush_timer()
+            return self._write_batch(messages)
+
+    def _write(self, message):
         if self._file is None:
             self._initialize_file()
 
-        if self._rotation_function is not None and self._rotation_function(message, self._file):
+        size = None
+
+        if self._size_limit is not None:
+            size = self._encoded_size(message)
+            if self._file_size + size > self._size_limit and self._is_full(size):
+                self._terminate_file(is_rotating=True)
+            self._file_size += size
+        elif self._rotation_function is not None and self._rotation_function(message, self._file):
             self._terminate_file(is_rotating=True)
 
         self._file.write(message)
 
+        if self._is_buffered:
+            self._count_unflushed((message,), message, size)
+
+    def _write_batch(self, messages):
+        if self._file is None:
+            self._initialize_file()
+
+        text = "".join(messages)
+        size = None
+
+        if self._size_limit is not None:
+            size = self._encoded_size(text)
+            if self._file_size + size > self._size_limit:
+                # The rotation needs to be checked against the file as it is before each message.
+                return False
+        elif self._rotation_function is not None:
+            return False
+
+        self._file.write(text)
+
+        if size is not None:
+            self._file_size += size
+
+        if self._is_buffered:
+            self._count_unflushed(messages, text, size)
+
+    def _count_unflushed(self, messages, text, size):
+        self._unflushed_count += len(messages)
+
+        if self._flush_count is not None and self._unflushed_count >= self._flush_count:
+            self._flush()
+            return
+
+        if self._flush_size is not None:
+            self._unflushed_size += self._encoded_size(text) if size is None else size
+            if self._unflushed_size >= self._flush_size:
+                self._flush()
+                return
+
+        if self._flush_level is not None:
+            if any(message.record["level"].no >= self._flush_level for message in messages):
+                self._flush()
+
+    def _flush(self):
+        self._file.flush()
+        self._unflushed_count = 0
+        self._unflushed_size = 0
+
+    def _start_flush_timer(self):
+        # The thread is not inherited by child processes, it needs to be started again.
+        if self._timer_pid == os.getpid():
+            return
+
+        self._timer_pid = os.getpid()
+        self._timer_stop = threading.Event()
+
+        thread = threading.Thread(
+            target=self._flush_periodically,
+            args=(self._timer_stop,),
+            daemon=True,
+            name="loguru-file-flush",
+        )
+        try:
+            thread.start()
+        except RuntimeError:
+            # Starting threads may be forbidden while the interpreter is finalizing.
+            pass
+
+    def _flush_periodically(self, stop_event):
+        while not stop_event.wait(self._flush_interval):
+            with self._lock:
+                if self._file is not None and self._unflushed_count:
+                    self._flush()
+
+    def _encoded_size(self, text):
+        size = len(text.encode(self.encoding, self._errors))
+        if self._newline_overhead:
+            size += text.count("\n") * self._newline_overhead
+        return size
+
+    def _is_full(self, size):
+        # The tracked size is only checked against the actual one when a rotation seems to be due,
+        # in case the file was truncated in the meantime (e.g. by "logrotate" in copytruncate mode).
+        self._file.flush()
+        self._file_size = os.fstat(self._file.fileno()).st_size
+        return self._file_size + size > self._size_limit
+
     def _prepare_new_path(self):
         path = self._path.format_map({"time": FileDateFormatter()})
         path = os.path.abspath(path)
@@ -185,6 +809,7 @@ class FileSink:
         path = self._prepare_new_path()
         self._file = open(path, **self._kwargs)
         self._file_path = path
+        self._file_size = os.fstat(self._file.fileno()).st_size
 
     def _terminate_file(self, *, is_rotating=False):
         old_path = self._file_path
@@ -193,6 +818,8 @@ class FileSink:
             self._file.close()
             self._file = None
             self._file_path = None
+            self._unflushed_count = 0
+            self._unflushed_size = 0
 
         if is_rotating:
             new_path = self._prepare_new_path()
@@ -204,31 +831,203 @@ class FileSink:
                 os.rename(old_path, renamed_path)
                 old_path = renamed_path
 
-        if is_rotating or self._rotation_function is None:
-            if self._compression_function is not None and old_path is not None:
-                self._compression_function(old_path)
-
-            if self._retention_function is not None:
-                logs = {
-                    file
-                    for pattern in self._glob_patterns
-                    for file in glob.glob(pattern)
-                    if os.path.isfile(file)
-                }
-                self._retention_function(list(logs))
+        if self._archive_worker is None and (is_rotating or self._rotation_function is None):
+            self._archive(old_path)
 
         if is_rotating:
             file = open(new_path, **self._kwargs)
             set_ctime(new_path, datetime.now().timestamp())
 
+            stat = os.fstat(file.fileno())
+
             self._file_path = new_path
             self._file = file
+            self._file_size = stat.st_size
+
+        # In background, the old file is only archived once the new one is ready to be written.
+        if self._archive_worker is not None and (is_rotating or self._rotation_function is None):
+            # The files modified since then (the current file, those rotated later and still
+            # waiting to be compressed) are not yet subject to the retention.
+            modified_before = stat.st_mtime if is_rotating else None
+            self._archive(old_path, modified_before=modified_before)
+
+    def _archive(self, path, *, retain=True, modified_before=None):
+        retention_function = self._retention_function if retain else None
+
+        if self._compression_function is None:
+            path = None
+            if retention_function is None:
+                return
+
+        args = (
+            self._compression_function,
+            retention_function,
+            self._glob_patterns,
+            self._file_path,
+            modified_before,
+        )
+
+        if self._archive_worker is None:
+            archive_file(path, *args)
+        else:
+            self._archive_worker.submit(path, args)
 
     def stop(self):
-        self._terminate_file(is_rotating=False)
+        last_path = self._file_path
+
+        if self._lock is None:
+            self._terminate_file(is_rotating=False)
+        else:
+            with self._lock:
+                if self._timer_stop is not None:
+                    self._timer_stop.set()
+                self._terminate_file(is_rotating=False)
+
+        if self._archive_worker is not None:
+            finished = self._archive_worker.wait(self._background_timeout)
+
+            # The files compressed after the last rotations may have been skipped by the
+            # retention, because they were modified after it was requested.
+            if finished and self._rotation_function is not None:
+                retention_function = self._retention_function
+                if retention_function is not None:
+                    args = (None, retention_function, self._glob_patterns, last_path, None)
+                    archive_file(None, *args)
+
+        if self._retention_function is not None:
+            RetentionIndex.forget(self._glob_patterns)
 
     async def complete(self):
-        pass
+        if not self._is_buffered:
+            return
+
+        if self._lock is None:
+            if self._file is not None:
+                self._flush()
+            return
+
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+
+    @staticmethod
+    def _make_archive_worker(background, path):
+        if background is None or background is False:
+            return None
+        elif background == "process" and sys.version_info < (3, 7):
+            raise ValueError("Using background='process' requires Python 3.7 or later")
+        elif background is True or background in ("thread", "process"):
+            kind = "thread" if background is True else background
+            # The journal is shared by all the files of the sink, whatever their formatted name.
+            path = os.path.abspath(path)
+            dirname = os.path.dirname(path.format_map({"time": FileDateFormatter()}))
+            basename = re.sub(r"{[^{}]*}", "", os.path.basename(path))
+            journal_path = os.path.join(dirname, ".%s.loguru-pending" % basename)
+            return ArchiveWorker(kind, journal_path)
+        elif isinstance(background, str):
+            raise ValueError(
+                "Invalid background, it should be 'thread' or 'process', not: '%s'" % background
+            )
+        else:
+            raise TypeError(
+                "Cannot infer background for objects of type: '%s'" % type(background).__name__
+            )
+
+    @staticmethod
+    def _make_background_timeout(timeout):
+        if timeout is None:
+            return None
+        elif isinstance(timeout, datetime_.timedelta):
+            return timeout.total_seconds()
+        elif isinstance(timeout, numbers.Real) and not isinstance(timeout, bool):
+            return float(timeout)
+        else:
+            raise TypeError(
+                "Cannot infer background_timeout for objects of type: '%s'" % type(timeout).__name__
+            )
+
+    @staticmethod
+    def _make_buffering(is_buffered, flush_size):
+        if not is_buffered:
+            return 1  # Line buffered.
+        if flush_size is None:
+            return -1
+        # The buffer should not be written to the file before the flush policy requires it.
+        return max(flush_size, io.DEFAULT_BUFFER_SIZE)
+
+    @staticmethod
+    def _make_flush_size(flush_size):
+        if flush_size is None:
+            return None
+        elif isinstance(flush_size, str):
+            size = string_parsers.parse_size(flush_size)
+            if size is None:
+                raise ValueError("Cannot parse flush_size from: '%s'" % flush_size)
+            return FileSink._make_flush_size(size)
+        elif isinstance(flush_size, (numbers.Real, decimal.Decimal)) and not isinstance(
+            flush_size, bool
+        ):
+            if flush_size <= 0:
+                raise ValueError("The flush_size must be positive, not: %s" % flush_size)
+            return int(flush_size)
+        else:
+            raise TypeError(
+                "Cannot infer flush_size for objects of type: '%s'" % type(flush_size).__name__
+            )
+
+    @staticmethod
+    def _make_flush_count(flush_count):
+        if flush_count is None:
+            return None
+        elif isinstance(flush_count, int) and not isinstance(flush_count, bool):
+            if flush_count <= 0:
+                raise ValueError("The flush_count must be positive, not: %d" % flush_count)
+            return flush_count
+        else:
+            raise TypeError(
+                "Cannot infer flush_count for objects of type: '%s'" % type(flush_count).__name__
+            )
+
+    @staticmethod
+    def _make_flush_interval(flush_interval):
+        if flush_interval is None:
+            return None
+        elif isinstance(flush_interval, str):
+            interval = string_parsers.parse_duration(flush_interval)
+            if interval is None:
+                raise ValueError("Cannot parse flush_interval from: '%s'" % flush_interval)
+            return FileSink._make_flush_interval(interval)
+        elif isinstance(flush_interval, datetime_.timedelta):
+            return FileSink._make_flush_interval(flush_interval.total_seconds())
+        elif isinstance(flush_interval, numbers.Real) and not isinstance(flush_interval, bool):
+            if flush_interval <= 0:
+                raise ValueError("The flush_interval must be positive, not: %s" % flush_interval)
+            return float(flush_interval)
+        else:
+            raise TypeError(
+                "Cannot infer flush_interval for objects of type: '%s'"
+                % type(flush_interval).__name__
+            )
+
+    @staticmethod
+    def _make_flush_level(flush_level):
+        # Level names are converted to their severity by the logger.
+        if flush_level is None:
+            return None
+        elif isinstance(flush_level, int) and not isinstance(flush_level, bool):
+            return flush_level
+        raise TypeError(
+            "Cannot infer flush_level for objects of type: '%s'" % type(flush_level).__name__
+        )
+
+    @staticmethod
+    def _make_newline_overhead(newline):
+        # Number of bytes added to each "\n" written to the file once newlines are translated.
+        if newline is None:
+            newline = os.linesep
+        elif newline == "":
+            newline = "\n"
+        return len(newline) - 1
 
     @staticmethod
     def _make_glob_patterns(path):
@@ -268,7 +1067,7 @@ class FileSink:
                 return Rotation.RotationTime(step_forward, time)
             raise ValueError("Cannot parse rotation from: '%s'" % rotation)
         elif isinstance(rotation, (numbers.Real, decimal.Decimal)):
-            return partial(Rotation.rotation_size, size_limit=rotation)
+            return Rotation.RotationSize(rotation)
         elif isinstance(rotation, datetime_.time):
             return Rotation.RotationTime(Rotation.forward_day, rotation)
         elif isinstance(rotation, datetime_.timedelta):
@@ -286,6 +1085,9 @@ class FileSink:
         if retention is None:
             return None
         elif isinstance(retention, str):
+            size = string_parsers.parse_size(retention)
+            if size is not None:
+                return partial(Retention.retention_size, size=size)
             interval = string_parsers.parse_duration(retention)
             if interval is None:
                 raise ValueError("Cannot parse retention from: '%s'" % retention)
@@ -295,77 +1097,94 @@ class FileSink:
         elif isinstance(retention, datetime_.timedelta):
             return partial(Retention.retention_age, seconds=retention.total_seconds())
         elif callable(retention):
-            return retention
+            return partial(Retention.retention_function, function=retention)
         else:
             raise TypeError(
                 "Cannot infer retention for objects of type: '%s'" % type(retention).__name__
             )
 
     @staticmethod
-    def _make_compression_function(compression):
+    def _make_compression_function(compression, options):
         if compression is None:
             return None
         elif isinstance(compression, str):
             ext = compression.strip().lstrip(".")
+            compress = Compression.codecs.get(ext)
 
-            if ext == "gz":
-                import gzip
-
-                compress = partial(Compression.copy_compress, opener=gzip.open, mode="wb")
-            elif ext == "bz2":
-                import bz2
-
-                compress = partial(Compression.copy_compress, opener=bz2.open, mode="wb")
+            if compress is None:
+                raise ValueError("Invalid compression format: '%s'" % ext)
 
-            elif ext == "xz":
-                import lzma
+            for module in Compression.requirements.get(ext, ()):
+                importlib.import_module(module)
 
-                compress = partial(
-                    Compression.copy_compress, opener=lzma.open, mode="wb", format=lzma.FORMAT_XZ
-                )
+            options = {name: value for name, value in options.items() if value is not None}
 
-            elif ext == "lzma":
-                import lzma
+            if options:
+                try:
+                    signature = inspect.signature(compress)
+                except (TypeError, ValueError):
+                    pass
+                else:
+                    try:
+                        signature.bind(None, None, **options)
+                    except TypeError:
+                        raise ValueError(
+                            "The '%s' compression does not support these options: %s"
+                            % (ext, ", ".join(sorted(options)))
+                        ) from None
 
-                compress = partial(
-                    Compression.copy_compress, opener=lzma.open, mode="wb", format=lzma.FORMAT_ALONE
-                )
-            elif ext == "tar":
-                import tarfile
-
-                compress = partial(Compression.add_compress, opener=tarfile.open, mode="w:")
-            elif ext == "tar.gz":
-                import gzip
-                import tarfile
-
-                compress = partial(Compression.add_compress, opener=tarfile.open, mode="w:gz")
-            elif ext == "tar.bz2":
-                import bz2
-                import tarfile
-
-                compress = partial(Compression.add_compress, opener=tarfile.open, mode="w:bz2")
-
-            elif ext == "tar.xz":
-                import lzma
-                import tarfile
-
-                compress = partial(Compression.add_compress, opener=tarfile.open, mode="w:xz")
-            elif ext == "zip":
-                import zipfile
-
-                compress = partial(
-                    Compression.write_compress,
-                    opener=zipfile.ZipFile,
-                    mode="w",
-                    compression=zipfile.ZIP_DEFLATED,
-                )
-            else:
-                raise ValueError("Invalid compression format: '%s'" % ext)
+                compress = partial(compress, **options)
 
             return partial(Compression.compression, ext="." + ext, compress_function=compress)
         elif callable(compression):
+            if any(value is not None for value in options.values()):
+                raise ValueError(
+                    "The compression options can only be used with a compression format, "
+                    "not with a custom compression function"
+                )
             return compression
         else:
             raise TypeError(
                 "Cannot infer compression for objects of type: '%s'" % type(compression).__name__
             )
+
+    @staticmethod
+    def _make_compression_options(level, buffer_size, threads):
+        if level is not None and (not isinstance(level, int) or isinstance(level, bool)):
+            raise TypeError(
+                "Cannot infer compression_level for objects of type: '%s'" % type(level).__name__
+            )
+
+        if buffer_size is None:
+            pass
+        elif isinstance(buffer_size, str):
+            size = string_parsers.parse_size(buffer_size)
+            if size is None:
+                raise ValueError("Cannot parse compression_buffer_size from: '%s'" % buffer_size)
+            buffer_size = size
+        elif not isinstance(buffer_size, (numbers.Real, decimal.Decimal)) or isinstance(
+            buffer_size, bool
+        ):
+            raise TypeError(
+                "Cannot infer compression_buffer_size for objects of type: '%s'"
+                % type(buffer_size).__name__
+            )
+
+        if buffer_size is not None:
+            if buffer_size < 1:
+                raise ValueError(
+                    "The compression_buffer_size must be positive, not: %s" % buffer_size
+                )
+            buffer_size = int(buffer_size)
+
+        if threads is None:
+            pass
+        elif not isinstance(threads, int) or isinstance(threads, bool):
+            raise TypeError(
+                "Cannot infer compression_threads for objects of type: '%s'"
+                % type(threads).__name__
+            )
+        elif threads < 1:
+            raise ValueError("The compression_threads must be positive, not: %d" % threads)
+
+        return {"level": level, "buffer_size": buffer_size, "threads": threads}
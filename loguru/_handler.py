@@ -2,10 +2,24 @@ import functools
 import json
 import multiprocessing
 import os
+import queue
+import sys
+import threading
+import time
 from threading import Thread
 
 from ._colorizer import Colorizer
+from ._compact_message import pack_message, unpack_message
+from ._file_sink import FileSink
 from ._locks_machinery import create_handler_lock
+from ._recattrs import RecordLevel
+from ._shared_memory_queue import SharedMemoryQueue
+from ._simple_sinks import AsyncSink
+
+if sys.version_info >= (3, 7):
+    ThreadQueue = queue.SimpleQueue
+else:
+    ThreadQueue = queue.Queue
 
 
 def prepare_colored_format(format_, ansi_level):
@@ -26,6 +40,37 @@ class Message(str):
     __slots__ = ("record",)
 
 
+class FormattingRecord:
+    # A view of the record used to format the message of a handler. It overrides the "exception"
+    # and "message" fields without having to copy the whole record for each handler.
+    __slots__ = ("record", "exception", "message")
+
+    def __init__(self, record, exception, message):
+        self.record = record
+        self.exception = exception
+        self.message = message
+
+    def __getitem__(self, key):
+        if key == "exception":
+            return self.exception
+        if key == "message":
+            return self.message
+        return self.record[key]
+
+
+class ThreadCounter:
+    # A counter with the interface of "multiprocessing.Value", for the messages which are enqueued
+    # and written within a single process. It avoids the cost of a shared memory and its lock.
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def get_lock(self):
+        return self._lock
+
+
 class Handler:
     def __init__(
         self,
@@ -39,10 +84,17 @@ class Handler:
         colorize,
         serialize,
         enqueue,
+        enqueue_batch_size,
+        shared_memory_size,
+        queue_size,
+        overflow,
+        overflow_levelno,
+        dispatcher,
         error_interceptor,
         exception_formatter,
         id_,
-        levels_ansi_codes
+        levels_ansi_codes,
+        levels
     ):
         self._name = name
         self._sink = sink
@@ -53,10 +105,17 @@ class Handler:
         self._colorize = colorize
         self._serialize = serialize
         self._enqueue = enqueue
+        self._enqueue_batch_size = enqueue_batch_size
+        self._shared_memory_size = shared_memory_size
+        self._queue_size = queue_size
+        self._overflow = overflow
+        self._overflow_levelno = overflow_levelno
+        self._dispatcher = dispatcher
         self._error_interceptor = error_interceptor
         self._exception_formatter = exception_formatter
         self._id = id_
         self._levels_ansi_codes = levels_ansi_codes  # Warning, reference shared among handlers
+        self._levels = levels  # Warning, reference shared among handlers
 
         self._decolorized_format = None
         self._precolorized_formats = {}
@@ -65,8 +124,12 @@ class Handler:
         self._stopped = False
         self._lock = create_handler_lock()
         self._queue = None
-        self._confirmation_event = None
-        self._confirmation_lock = None
+        self._queue_slots = None
+        self._dropped_messages = 0
+        self._unreported_dropped_messages = 0
+        self._enqueued_count = None
+        self._written_count = None
+        self._written_event = None
         self._owner_process_pid = None
         self._thread = None
 
@@ -82,10 +145,35 @@ class Handler:
             else:
                 self._decolorized_format = self._formatter.strip()
 
-        if self._enqueue:
-            self._queue = multiprocessing.SimpleQueue()
-            self._confirmation_event = multiprocessing.Event()
-            self._confirmation_lock = multiprocessing.Lock()
+        if self._enqueue in ("shared", "deferred"):
+            self._enqueued_count = self._dispatcher.enqueued_count
+            self._written_count = self._dispatcher.written_count
+            self._written_event = self._dispatcher.written_event
+            self._owner_process_pid = os.getpid()
+            self._dispatcher.register(self._id, self)
+        elif self._enqueue == "thread":
+            self._queue = ThreadQueue()
+            self._written_event = threading.Event()
+            if self._queue_size is not None:
+                self._queue_slots = threading.BoundedSemaphore(self._queue_size)
+        elif self._enqueue:
+            if self._enqueue == "shared_memory":
+                self._queue = SharedMemoryQueue(multiprocessing, self._shared_memory_size)
+            else:
+                self._queue = multiprocessing.SimpleQueue()
+            self._written_event = multiprocessing.Event()
+            if self._queue_size is not None:
+                self._queue_slots = multiprocessing.BoundedSemaphore(self._queue_size)
+
+        if self._enqueue == "thread":
+            self._enqueued_count = ThreadCounter()
+            self._written_count = ThreadCounter()
+        elif self._enqueue and self._dispatcher is None:
+            # Messages may be enqueued by several processes, the counters are shared between them.
+            self._enqueued_count = multiprocessing.Value("Q", 0)
+            self._written_count = multiprocessing.Value("Q", 0)
+
+        if self._enqueue and self._dispatcher is None:
             self._owner_process_pid = os.getpid()
             self._thread = Thread(
                 target=self._queued_writer, daemon=True, name="loguru-writer-%d" % self._id
@@ -93,77 +181,56 @@ class Handler:
             self._thread.start()
 
     def __repr__(self):
+        if self._queue_size is not None:
+            return "(id=%d, level=%d, sink=%s, dropped=%d)" % (
+                self._id,
+                self._levelno,
+                self._name,
+                self._dropped_messages,
+            )
         return "(id=%d, level=%d, sink=%s)" % (self._id, self._levelno, self._name)
 
-    def emit(self, record, level_id, from_decorator, is_raw, colored_message):
+    def emit(
+        self,
+        record,
+        level_id,
+        from_decorator,
+        is_raw,
+        colored_message,
+        formatted_exceptions,
+        formatted_messages,
+        dispatched,
+    ):
         try:
             if self._levelno > record["level"].no:
                 return
 
-            if self._filter is not None:
-                if not self._filter(record):
+            if self._enqueue == "deferred" and self._owner_process_pid == os.getpid():
+                # The filtering and formatting are done later by the thread of the dispatcher.
+                if self._stopped:
                     return
-
-            if self._is_formatter_dynamic:
-                dynamic_format = self._formatter(record)
-
-            formatter_record = record.copy()
-
-            if not record["exception"]:
-                formatter_record["exception"] = ""
-            else:
-                type_, value, tb = record["exception"]
-                formatter = self._exception_formatter
-                lines = formatter.format_exception(type_, value, tb, from_decorator=from_decorator)
-                formatter_record["exception"] = "".join(lines)
-
-            if colored_message is not None and colored_message.stripped != record["message"]:
-                colored_message = None
-
-            if is_raw:
-                if colored_message is None or not self._colorize:
-                    formatted = record["message"]
+                if record["exception"]:
+                    # The traceback must be formatted while the frames of the caller (and their
+                    # variables displayed by "diagnose") are still the ones which raised the error.
+                    self._format_exception(record, from_decorator, formatted_exceptions)
+                    dispatched.append((self, formatted_exceptions))
                 else:
-                    ansi_level = self._levels_ansi_codes[level_id]
-                    formatted = colored_message.colorize(ansi_level)
-            elif self._is_formatter_dynamic:
-                if not self._colorize:
-                    precomputed_format = self._memoize_dynamic_format(dynamic_format)
-                    formatted = precomputed_format.format_map(formatter_record)
-                elif colored_message is None:
-                    ansi_level = self._levels_ansi_codes[level_id]
-                    _, precomputed_format = self._memoize_dynamic_format(dynamic_format, ansi_level)
-                    formatted = precomputed_format.format_map(formatter_record)
-                else:
-                    ansi_level = self._levels_ansi_codes[level_id]
-                    formatter, precomputed_format = self._memoize_dynamic_format(
-                        dynamic_format, ansi_level
-                    )
-                    coloring_message = formatter.make_coloring_message(
-                        record["message"], ansi_level=ansi_level, colored_message=colored_message
-                    )
-                    formatter_record["message"] = coloring_message
-                    formatted = precomputed_format.format_map(formatter_record)
+                    dispatched.append((self, None))
+                return
 
-            else:
-                if not self._colorize:
-                    precomputed_format = self._decolorized_format
-                    formatted = precomputed_format.format_map(formatter_record)
-                elif colored_message is None:
-                    ansi_level = self._levels_ansi_codes[level_id]
-                    precomputed_format = self._precolorized_formats[level_id]
-                    formatted = precomputed_format.format_map(formatter_record)
-                else:
-                    ansi_level = self._levels_ansi_codes[level_id]
-                    precomputed_format = self._precolorized_formats[level_id]
-                    coloring_message = self._formatter.make_coloring_message(
-                        record["message"], ansi_level=ansi_level, colored_message=colored_message
-                    )
-                    formatter_record["message"] = coloring_message
-                    formatted = precomputed_format.format_map(formatter_record)
+            if self._filter is not None:
+                if not self._filter(record):
+                    return
 
-            if self._serialize:
-                formatted = self._serialize_record(formatted, record)
+            formatted = self._format(
+                record,
+                level_id,
+                from_decorator,
+                is_raw,
+                colored_message,
+                formatted_exceptions,
+                formatted_messages,
+            )
 
             str_record = Message(formatted)
             str_record.record = record
@@ -171,40 +238,258 @@ class Handler:
             with self._lock:
                 if self._stopped:
                     return
-                if self._enqueue:
-                    self._queue.put(str_record)
-                else:
+                if not self._enqueue:
                     self._sink.write(str_record)
+                elif self._enqueue == "shared":
+                    # The record is put in the queue once for all the handlers sharing it.
+                    dispatched.append((self, formatted))
+                elif (
+                    self._enqueue in ("thread", "deferred")
+                    and self._owner_process_pid != os.getpid()
+                ):
+                    # The queue is not shared with child processes, nothing would consume it.
+                    self._sink.write(str_record)
+                else:
+                    self._put_in_queue(str_record)
 
         except Exception:
             if not self._error_interceptor.should_catch():
                 raise
             self._error_interceptor.print(record)
 
+    def _format(
+        self,
+        record,
+        level_id,
+        from_decorator,
+        is_raw,
+        colored_message,
+        formatted_exceptions,
+        formatted_messages,
+    ):
+        if self._is_formatter_dynamic:
+            dynamic_format = self._formatter(record)
+
+        formatted_exception = self._format_exception(record, from_decorator, formatted_exceptions)
+        formatter_record = FormattingRecord(record, formatted_exception, record["message"])
+
+        if colored_message is not None and colored_message.stripped != record["message"]:
+            colored_message = None
+
+        if is_raw:
+            if colored_message is None or not self._colorize:
+                formatted = record["message"]
+            else:
+                ansi_level = self._levels_ansi_codes[level_id]
+                formatted = colored_message.colorize(ansi_level)
+        elif self._is_formatter_dynamic:
+            if not self._colorize:
+                precomputed_format = self._memoize_dynamic_format(dynamic_format)
+                formatted = self._format_map(
+                    precomputed_format, formatter_record, formatted_messages
+                )
+            elif colored_message is None:
+                ansi_level = self._levels_ansi_codes[level_id]
+                _, precomputed_format = self._memoize_dynamic_format(dynamic_format, ansi_level)
+                formatted = self._format_map(
+                    precomputed_format, formatter_record, formatted_messages
+                )
+            else:
+                ansi_level = self._levels_ansi_codes[level_id]
+                formatter, precomputed_format = self._memoize_dynamic_format(
+                    dynamic_format, ansi_level
+                )
+                coloring_message = formatter.make_coloring_message(
+                    record["message"], ansi_level=ansi_level, colored_message=colored_message
+                )
+                formatter_record.message = coloring_message
+                formatted = precomputed_format.format_map(formatter_record)
+
+        else:
+            if not self._colorize:
+                precomputed_format = self._decolorized_format
+                formatted = self._format_map(
+                    precomputed_format, formatter_record, formatted_messages
+                )
+            elif colored_message is None:
+                ansi_level = self._levels_ansi_codes[level_id]
+                precomputed_format = self._precolorized_formats[level_id]
+                formatted = self._format_map(
+                    precomputed_format, formatter_record, formatted_messages
+                )
+            else:
+                ansi_level = self._levels_ansi_codes[level_id]
+                precomputed_format = self._precolorized_formats[level_id]
+                coloring_message = self._formatter.make_coloring_message(
+                    record["message"], ansi_level=ansi_level, colored_message=colored_message
+                )
+                formatter_record.message = coloring_message
+                formatted = precomputed_format.format_map(formatter_record)
+
+        if self._serialize:
+            formatted = self._serialize_record(formatted, record)
+
+        return formatted
+
+    @staticmethod
+    def _format_map(precomputed_format, formatter_record, formatted_messages):
+        # The record being the same for all handlers, those using the same format share the result.
+        # This excludes the colored messages, whose formatting consumes an iterator.
+        key = (precomputed_format, formatter_record.exception, formatter_record.message)
+        formatted = formatted_messages.get(key)
+
+        if formatted is None:
+            formatted = precomputed_format.format_map(formatter_record)
+            formatted_messages[key] = formatted
+
+        return formatted
+
+    def _put_in_queue(self, message):
+        if self._queue_slots is not None:
+            if not self._acquire_queue_slot(message.record["level"].no):
+                self._dropped_messages += 1
+                self._unreported_dropped_messages += 1
+                return
+
+            if self._unreported_dropped_messages and self._queue_slots.acquire(False):
+                self._put(self._make_dropped_message(message.record))
+                self._unreported_dropped_messages = 0
+
+        self._put(message)
+
+    def _put(self, message):
+        message = self._pack_message(message)
+
+        # The message is counted before being put so that "complete()" never misses it, even if
+        # another process put its own message in the meantime.
+        with self._enqueued_count.get_lock():
+            self._enqueued_count.value += 1
+
+        try:
+            self._queue.put(message)
+        except Exception:
+            self._count_written(1)
+            raise
+
+    def _pack_message(self, message):
+        if self._enqueue != "compact" and self._enqueue != "shared_memory":
+            return message
+        # Messages whose record can't be packed (e.g. naive time set by a patcher) are pickled.
+        packed = pack_message(message)
+        return message if packed is None else packed
+
+    def _acquire_queue_slot(self, levelno):
+        slots = self._queue_slots
+
+        if self._overflow == "block":
+            return slots.acquire()
+
+        if slots.acquire(False):
+            return True
+
+        if self._overflow == "drop_newest":
+            return False
+
+        if self._overflow == "drop_below_level":
+            if levelno < self._overflow_levelno:
+                return False
+            return slots.acquire()
+
+        # With "drop_oldest", the slot of the discarded message is taken over by the new one.
+        try:
+            oldest = self._queue.get_nowait()
+        except queue.Empty:
+            # The writer thread just took the last message, it will release its slot shortly.
+            return slots.acquire()
+
+        if oldest is None:
+            self._queue.put(oldest)
+            return slots.acquire()
+
+        self._count_written(1)
+
+        self._dropped_messages += 1
+        self._unreported_dropped_messages += 1
+        return True
+
+    def _make_dropped_message(self, record):
+        name, no, _, icon = self._levels["WARNING"]
+        count = self._unreported_dropped_messages
+        dropped_record = record.copy()
+        dropped_record["exception"] = None
+        dropped_record["level"] = RecordLevel(name, no, icon)
+        dropped_record["message"] = "%d message%s dropped because the queue was full" % (
+            count,
+            " was" if count == 1 else "s were",
+        )
+        formatted = self._format(dropped_record, "WARNING", False, False, None, {}, {})
+        message = Message(formatted)
+        message.record = dropped_record
+        return message
+
     def stop(self):
+        self.request_stop()
+        self.finish_stop()
+
+    def request_stop(self):
+        # Reject new messages and tell the writer thread to exit once the queue is empty.
         with self._lock:
             self._stopped = True
+            if self._enqueue and self._owner_process_pid == os.getpid():
+                if self._dispatcher is None:
+                    self._queue.put(None)
+
+    def finish_stop(self):
+        with self._lock:
             if self._enqueue:
                 if self._owner_process_pid != os.getpid():
-                    return
-                self._queue.put(None)
-                self._thread.join()
-                if hasattr(self._queue, "close"):
-                    self._queue.close()
+                    if self._enqueue not in ("thread", "deferred"):
+                        return
+                elif self._dispatcher is not None:
+                    self._dispatcher.unregister(self._id)
+                else:
+                    self._thread.join()
+                    if hasattr(self._queue, "close"):
+                        self._queue.close()
 
             self._sink.stop()
 
-    def complete_queue(self):
-        if not self._enqueue:
-            return
+    def enqueued_count(self):
+        if not self._enqueue or self._stopped:
+            return None
+
+        if self._enqueue in ("thread", "deferred") and self._owner_process_pid != os.getpid():
+            return None
+
+        return self._enqueued_count.value
+
+    def complete_queue(self, count, deadline):
+        # Wait for the first "count" enqueued messages to be written, or until the deadline.
+        written = self._written_count
+        event = self._written_event
 
-        with self._confirmation_lock:
-            self._queue.put(True)
-            self._confirmation_event.wait()
-            self._confirmation_event.clear()
+        while written.value < count and not self._stopped:
+            if deadline is None:
+                timeout = 0.1
+            else:
+                timeout = min(deadline - time.monotonic(), 0.1)
+                if timeout <= 0:
+                    break
+
+            # Another thread may clear the event concurrently, hence the bounded wait.
+            event.clear()
+            if written.value >= count:
+                break
+            event.wait(timeout)
+
+        return max(count - written.value, 0)
 
     async def complete_async(self):
-        if self._enqueue and self._owner_process_pid != os.getpid():
+        if (
+            self._enqueue
+            and self._enqueue not in ("thread", "deferred")
+            and self._owner_process_pid != os.getpid()
+        ):
             return
 
         with self._lock:
@@ -216,10 +501,87 @@ class Handler:
         ansi_code = self._levels_ansi_codes[level_id]
         self._precolorized_formats[level_id] = self._formatter.colorize(ansi_code)
 
+    def _format_exception(self, record, from_decorator, formatted_exceptions):
+        exception = record["exception"]
+
+        if not exception:
+            return ""
+
+        formatter = self._exception_formatter
+        cached = formatted_exceptions.get(formatter.config)
+
+        if cached is not None and cached[0] is exception:
+            return cached[1]
+
+        type_, value, tb = exception
+        lines = formatter.format_exception(type_, value, tb, from_decorator=from_decorator)
+        formatted_exception = "".join(lines)
+        formatted_exceptions[formatter.config] = (exception, formatted_exception)
+        return formatted_exception
+
+    def prepare_message(
+        self,
+        record,
+        level_id,
+        from_decorator,
+        is_raw,
+        colored_message,
+        formatted_exceptions,
+        formatted_messages,
+    ):
+        # Used by the dispatcher of deferred handlers, the level has already been checked.
+        try:
+            if self._filter is not None:
+                if not self._filter(record):
+                    return None
+
+            formatted = self._format(
+                record,
+                level_id,
+                from_decorator,
+                is_raw,
+                colored_message,
+                formatted_exceptions,
+                formatted_messages,
+            )
+        except Exception:
+            self.intercept_error(record)
+            return None
+
+        message = Message(formatted)
+        message.record = record
+        return message
+
+    def write_messages(self, messages, print_error):
+        # The thread of the dispatcher is shared by other handlers, the errors which are not caught
+        # are printed without giving up the messages following the faulty one.
+        self._write_messages(messages, getattr(self._sink, "write_batch", None), print_error)
+
+    def intercept_error(self, record):
+        # Must be called while handling an exception, which is re-raised if it should not be caught.
+        if not self._error_interceptor.should_catch():
+            raise
+        self._error_interceptor.print(record)
+
     @property
     def levelno(self):
         return self._levelno
 
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def dispatcher(self):
+        return self._dispatcher
+
+    def blocks_loop(self, loop):
+        return isinstance(self._sink, AsyncSink) and self._sink.blocks_loop(loop)
+
+    @property
+    def stops_slowly(self):
+        return bool(self._enqueue) or isinstance(self._sink, FileSink)
+
     @staticmethod
     def _serialize_record(text, record):
         exception = record["exception"]
@@ -262,41 +624,100 @@ class Handler:
     def _queued_writer(self):
         message = None
         queue = self._queue
+        batch_size = self._enqueue_batch_size
+        slots = self._queue_slots
+        write_batch = getattr(self._sink, "write_batch", None)
 
         # We need to use a lock to protect sink during fork.
         # Particularly, writing to stderr may lead to deadlock in child process.
         lock = create_handler_lock()
 
+        # Messages already available are accumulated so that the sink can write them at once.
+        messages = []
+
         while True:
             try:
                 message = queue.get()
             except Exception:
                 with lock:
+                    # The message which could not be received is accounted as written anyway.
+                    self._write_queued_messages(messages, write_batch)
+                    self._count_written(1)
+                    messages = []
                     if not self._error_interceptor.should_catch():
                         raise
                     self._error_interceptor.print(None)
                 continue
 
+            if isinstance(message, bytes):
+                text, record = unpack_message(message)
+                message = Message(text)
+                message.record = record
+
             if message is None:
+                if messages:
+                    with lock:
+                        self._write_queued_messages(messages, write_batch)
                 break
 
-            if message is True:
-                self._confirmation_event.set()
-                continue
+            messages.append(message)
 
-            with lock:
-                try:
-                    self._sink.write(message)
-                except Exception:
-                    if not self._error_interceptor.should_catch():
-                        raise
+            if slots is not None:
+                slots.release()
+
+            if len(messages) >= batch_size or queue.empty():
+                with lock:
+                    self._write_queued_messages(messages, write_batch)
+                messages = []
+
+    def _write_queued_messages(self, messages, write_batch):
+        try:
+            self._write_messages(messages, write_batch)
+        finally:
+            self._count_written(len(messages))
+
+    def _count_written(self, count):
+        # Messages which were dropped or couldn't be transmitted are also accounted as written.
+        with self._written_count.get_lock():
+            self._written_count.value += count
+        self._written_event.set()
+
+    def _write_messages(self, messages, write_batch, print_error=None):
+        if write_batch is not None and len(messages) > 1:
+            try:
+                if write_batch(messages) is not False:
+                    return
+            except Exception:
+                # The joined messages were not written, they are retried one by one so that only
+                # the faulty ones are lost and reported.
+                pass
+
+        for message in messages:
+            try:
+                self._sink.write(message)
+            except Exception:
+                if self._error_interceptor.should_catch():
                     self._error_interceptor.print(message.record)
+                elif print_error is not None:
+                    print_error()
+                else:
+                    raise
 
     def __getstate__(self):
         state = self.__dict__.copy()
         state["_lock"] = None
         state["_memoize_dynamic_format"] = None
-        if self._enqueue:
+        if self._enqueue in ("thread", "deferred"):
+            # Without the queue and its thread, messages are directly written to the sink.
+            state["_dispatcher"] = None
+            state["_queue"] = None
+            state["_queue_slots"] = None
+            state["_enqueued_count"] = None
+            state["_written_count"] = None
+            state["_written_event"] = None
+            state["_thread"] = None
+            state["_owner_process_pid"] = None
+        elif self._enqueue:
             state["_sink"] = None
             state["_thread"] = None
             state["_owner_process"] = None
@@ -6,6 +6,8 @@
 .. |add| replace:: :meth:`~Logger.add()`
 .. |remove| replace:: :meth:`~Logger.remove()`
 .. |complete| replace:: :meth:`~Logger.complete()`
+.. |acomplete| replace:: :meth:`~Logger.acomplete()`
+.. |float| replace:: :class:`float`
 .. |catch| replace:: :meth:`~Logger.catch()`
 .. |bind| replace:: :meth:`~Logger.bind()`
 .. |contextualize| replace:: :meth:`~Logger.contextualize()`
@@ -15,6 +17,7 @@
 .. |level| replace:: :meth:`~Logger.level()`
 .. |enable| replace:: :meth:`~Logger.enable()`
 .. |disable| replace:: :meth:`~Logger.disable()`
+.. |register_compression| replace:: :meth:`~Logger.register_compression()`
 
 .. |str| replace:: :class:`str`
 .. |int| replace:: :class:`int`
@@ -78,24 +81,29 @@ import itertools
 import logging
 import re
 import sys
+import time
+import traceback
 import warnings
 from collections import namedtuple
 from inspect import isclass, iscoroutinefunction, isgeneratorfunction
 from multiprocessing import current_process
-from os.path import basename, splitext
 from threading import current_thread
 
 from . import _asyncio_loop, _colorama, _defaults, _filters
+from ._activation import get_activation_status, make_activation_tree
 from ._better_exceptions import ExceptionFormatter
+from ._code_cache import CodeCache
 from ._colorizer import Colorizer
 from ._contextvars import ContextVar
 from ._datetime import aware_now
+from ._dispatcher import DeferredDispatcher, Dispatcher, dispatch
 from ._error_interceptor import ErrorInterceptor
-from ._file_sink import FileSink
+from ._file_sink import Compression, FileSink
 from ._get_frame import get_frame
 from ._handler import Handler
 from ._locks_machinery import create_logger_lock
-from ._recattrs import RecordException, RecordFile, RecordLevel, RecordProcess, RecordThread
+from ._recattrs import LazyRecord, RecordException, RecordLevel
+from ._shutdown_workers import ShutdownWorkers
 from ._simple_sinks import AsyncSink, CallableSink, StandardSink, StreamSink
 
 if sys.version_info >= (3, 6):
@@ -110,6 +118,8 @@ start_time = aware_now()
 
 context = ContextVar("loguru_context", default={})
 
+code_cache = CodeCache(maxsize=2048)
+
 
 class Core:
     def __init__(self):
@@ -171,19 +181,31 @@ class Core:
 
         self.min_level = float("inf")
         self.enabled = {}
+        self.enabled_maxsize = 4096
         self.activation_list = []
+        self.activation_tree = make_activation_tree([])
         self.activation_none = True
 
+        self.dispatcher = None
+        self.shutdown_workers = ShutdownWorkers()
+        self.deferred_dispatcher = None
+
         self.lock = create_logger_lock()
 
     def __getstate__(self):
         state = self.__dict__.copy()
         state["lock"] = None
+        # Handlers keep a reference to their own dispatcher, the one of the core is owned by the
+        # current process and can't be used by another one to add new handlers.
+        state["dispatcher"] = None
+        state["shutdown_workers"] = None
+        state["deferred_dispatcher"] = None
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
         self.lock = create_logger_lock()
+        self.shutdown_workers = ShutdownWorkers()
 
 
 class Logger:
@@ -228,6 +250,8 @@ class Logger:
         backtrace=_defaults.LOGURU_BACKTRACE,
         diagnose=_defaults.LOGURU_DIAGNOSE,
         enqueue=_defaults.LOGURU_ENQUEUE,
+        queue_size=None,
+        overflow="block",
         catch=_defaults.LOGURU_CATCH,
         **kwargs
     ):
@@ -258,10 +282,38 @@ class Logger:
         diagnose : |bool|, optional
             Whether the exception trace should display the variables values to eases the debugging.
             This should be set to ``False`` in production to avoid leaking sensitive data.
-        enqueue : |bool|, optional
+        enqueue : |bool| or |str|, optional
             Whether the messages to be logged should first pass through a multiprocess-safe queue
             before reaching the sink. This is useful while logging to a file through multiple
-            processes. This also has the advantage of making logging calls non-blocking.
+            processes. This also has the advantage of making logging calls non-blocking. Pending
+            messages are handed over to the sink by batches, so that files and streams are written
+            and flushed once per batch rather than once per message. Passing ``"process"`` is
+            equivalent to ``True``, while ``"thread"`` uses a queue internal to the current process
+            instead, which avoids the cost of serializing the messages but does not support logging
+            from child processes through the same queue. Passing ``"compact"`` uses a multiprocess
+            queue too, but only the formatted message and the ``time`` and ``level`` of its record
+            are transmitted to the sink, which is much cheaper than serializing the whole record.
+            Passing ``"shared_memory"`` transmits messages the same way, but through a fixed-size
+            buffer in shared memory rather than a pipe (requires Python 3.8+). Messages larger than
+            this buffer (4 MiB by default, see the ``LOGURU_SHARED_MEMORY_SIZE`` environment
+            variable) can't be transmitted and are reported as logging errors. Finally, handlers
+            added with ``"shared"`` all use the same multiprocess queue and writer thread instead
+            of creating their own: each record is serialized only once for all of them, and the
+            messages are still written to each sink in the order they were logged. Handlers added
+            with ``"deferred"`` share a queue internal to the current process too, but the raw
+            record is sent instead: filtering and formatting happen in the writer thread, which
+            makes the logging call even cheaper (the ``filter`` and ``format`` functions are then
+            called from that thread).
+        queue_size : |int|, optional
+            The maximum number of messages waiting in the queue of an enqueued handler. If ``None``,
+            the queue is unbounded.
+        overflow : |str|, optional
+            What to do with new messages once the queue reached its ``queue_size``. This can be
+            ``"block"`` to wait for the sink to catch up, ``"drop_newest"`` to discard the new
+            message, ``"drop_oldest"`` to discard the oldest pending one (only with
+            ``enqueue="thread"``) or ``"drop_below_level:LEVEL"`` to discard messages whose severity
+            is below ``LEVEL`` and wait for the other ones. When messages are dropped, a warning
+            with their count is sent to the sink as soon as there is room for it again.
         catch : |bool|, optional
             Whether errors occurring while sink handles logs messages should be automatically
             caught. If ``True``, an exception message is displayed on |sys.stderr| but the exception
@@ -271,7 +323,7 @@ class Logger:
             below).
 
 
-        If and only if the sink is a coroutine function, the following parameter applies:
+        If and only if the sink is a coroutine function, the following parameters apply:
 
         Parameters
         ----------
@@ -279,6 +331,21 @@ class Logger:
             The event loop in which the asynchronous logging task will be scheduled and executed. If
             ``None``, the loop used is the one returned by |asyncio.get_running_loop| at the time of
             the logging call (task is discarded if there is no loop currently running).
+        max_tasks : |int|, optional
+            The maximum number of logging tasks running concurrently. If ``None``, a task is
+            started for each message as soon as it is logged. Otherwise, messages are held until a
+            task is done.
+        batch_size : |int|, optional
+            If not ``None``, the coroutine function receives a list of messages instead of a
+            single one. Messages logged during the same iteration of the event loop or waiting for
+            a task to be available are grouped by batches of at most ``batch_size`` messages.
+        tasks_overflow : |str|, optional
+            What to do with new messages once ``max_tasks`` tasks are running and a batch of
+            messages is already waiting. This can be ``"queue"`` to keep all of them (the
+            default), ``"drop"`` to discard the new messages or ``"block"`` to wait for a task to
+            be done (this requires ``enqueue``, so that only the thread of the handler is blocked,
+            and the messages should then be waited for with |acomplete|, as |complete| can't be
+            called from the event loop of the sink).
 
 
         If and only if the sink is a file path, the following parameters apply:
@@ -293,6 +360,19 @@ class Logger:
             program.
         compression : |str| or |callable|_, optional
             A compression or archive format to which log files should be converted at closure.
+        compression_level : |int|, optional
+            The compression level (or preset) of the ``compression`` format, e.g. from ``0`` to
+            ``9`` for ``"gz"``. It defaults to the level used by the format module. It is ignored
+            by ``"zip"`` before Python 3.7.
+        compression_buffer_size : |str| or |int|, optional
+            The size of the chunks read from the log file while it is compressed (e.g. ``"4 MB"``).
+            It defaults to 1 MiB and is used by the ``"gz"``, ``"bz2"``, ``"xz"`` and ``"lzma"``
+            formats.
+        compression_threads : |int|, optional
+            The number of threads compressing the file with the ``"gz"`` format. If greater than
+            ``1``, the file is split into chunks of ``compression_buffer_size`` bytes which are
+            compressed in parallel as independent gzip members, which are concatenated into a file
+            readable by any gzip decompressor.
         delay : |bool|, optional
             Whether the file should be created as soon as the sink is configured, or delayed until
             first logged message. It defaults to ``False``.
@@ -301,9 +381,36 @@ class Logger:
             file in appending mode).
         buffering : |int|, optional
             The buffering policy as for built-in |open| function. It defaults to ``1`` (line
-            buffered file).
+            buffered file), unless one of the ``flush_*`` parameters below is used. In such case,
+            the file is only flushed as they require, when the handler is removed or when the
+            object returned by |complete| is awaited.
         encoding : |str|, optional
             The file encoding as for built-in |open| function. It defaults to ``"utf8"``.
+        flush_size : |str| or |int|, optional
+            The file is flushed once this many bytes were written since the last flush (e.g.
+            ``"64 KB"``).
+        flush_count : |int|, optional
+            The file is flushed once this many messages were written since the last flush.
+        flush_interval : |str|, |int|, |float| or |timedelta|, optional
+            The file is flushed at least this often (e.g. ``"500 ms"``, or a number of seconds) by a
+            background thread, if messages were written since the last flush.
+        flush_level : |str| or |int|, optional
+            The file is flushed right after writing a message whose severity is at least this
+            level (e.g. ``"ERROR"``), so that such messages are not lost if the program crashes.
+        background : |bool| or |str|, optional
+            Whether the ``compression`` and ``retention`` should be done by a background
+            ``"thread"`` (or ``True``) or ``"process"``, so that the rotation only needs to close
+            the file and open a new one. The files waiting to be compressed are listed in a hidden
+            file next to the logs, their compression is resumed when the sink is added again if the
+            program ended before. It defaults to ``None`` (done while rotating). The process is
+            started with the ``"spawn"`` method (requires Python 3.7+), the ``compression`` and
+            ``retention`` functions must therefore be picklable and the main module importable.
+            The ``retention`` ignores the files modified since the rotation that requested it
+            (such as the ones still waiting to be compressed), they are handled by the next one or
+            when the handler is removed.
+        background_timeout : |int|, |float| or |timedelta|, optional
+            The maximum delay to wait for the background work when the handler is removed. If
+            ``None``, the handler waits until it is finished.
         **kwargs
             Others parameters are passed to the built-in |open| function.
 
@@ -594,16 +701,21 @@ class Logger:
         - a |timedelta| which specifies the maximum age of files to keep.
         - a |str| for human-friendly parametrization of the maximum age of files to keep.
           Examples: ``"1 week, 3 days"``, ``"2 months"``, ...
+        - a |str| for human-friendly parametrization of the maximum total size of files to keep,
+          the oldest ones being removed first. Examples: ``"10 GB"``, ``"500 MiB"``, ...
         - a |callable|_ which will be invoked before the retention process. It should accept the
           list of log files as argument and process to whatever it wants (moving files, removing
           them, etc.).
 
+        The files are listed once per retention, but their modification time and size are only
+        queried the first time they are seen, as log files are not supposed to change once rotated.
+
         The ``compression`` happens at rotation or at sink stop if rotation is ``None``. This
         parameter accepts:
 
         - a |str| which corresponds to the compressed or archived file extension. This can be one
           of: ``"gz"``, ``"bz2"``, ``"xz"``, ``"lzma"``, ``"tar"``, ``"tar.gz"``, ``"tar.bz2"``,
-          ``"tar.xz"``, ``"zip"``.
+          ``"tar.xz"``, ``"zip"``, or a format registered with |register_compression|.
         - a |callable|_ which will be invoked before file termination. It should accept the path of
           the log file as argument and process to whatever it wants (custom compression, network
           sending, removing it, etc.).
@@ -698,6 +810,15 @@ class Logger:
         If you want to disable the pre-configured sink, you can set the ``LOGURU_AUTOINIT``
         variable to ``False``.
 
+        By default, the ``time`` of the record is an aware datetime in the local timezone. Setting
+        the ``LOGURU_CLOCK`` variable to ``"utc"`` makes the logger use UTC time instead, which
+        avoids the need to look up the local timezone and is slightly faster.
+
+        The maximum number of enqueued messages written to a sink at once can be set with the
+        ``LOGURU_ENQUEUE_BATCH_SIZE`` variable (``1000`` by default). The size in bytes of the
+        buffer used by handlers added with ``enqueue="shared_memory"`` can be set with the
+        ``LOGURU_SHARED_MEMORY_SIZE`` variable (``4194304`` by default).
+
         On Linux, you will probably need to edit the ``~/.profile`` file to make this persistent. On
         Windows, don't forget to restart your terminal for the change to be taken into account.
 
@@ -759,6 +880,9 @@ class Logger:
             if colorize is None:
                 colorize = False
 
+            if isinstance(kwargs.get("flush_level"), str):
+                kwargs["flush_level"] = self.level(kwargs["flush_level"]).no
+
             wrapped_sink = FileSink(path, **kwargs)
             kwargs = {}
             encoding = wrapped_sink.encoding
@@ -796,6 +920,32 @@ class Logger:
                 colorize = False
 
             loop = kwargs.pop("loop", None)
+            max_tasks = kwargs.pop("max_tasks", None)
+            batch_size = kwargs.pop("batch_size", None)
+            tasks_overflow = kwargs.pop("tasks_overflow", "queue")
+
+            for option, value in (("max_tasks", max_tasks), ("batch_size", batch_size)):
+                if value is None:
+                    continue
+                if not isinstance(value, int) or isinstance(value, bool):
+                    raise TypeError(
+                        "Invalid %s, it should be an integer or None, not: '%s'"
+                        % (option, type(value).__name__)
+                    )
+                if value < 1:
+                    raise ValueError(
+                        "Invalid %s, it should be a positive integer, not: %d" % (option, value)
+                    )
+
+            if tasks_overflow not in ("queue", "drop", "block"):
+                raise ValueError(
+                    "Invalid tasks_overflow, it should be 'queue', 'drop' or 'block', not: '%s'"
+                    % tasks_overflow
+                )
+
+            if tasks_overflow == "block" and not enqueue:
+                # The logging thread would hold the handler lock while the loop may need it.
+                raise ValueError("The 'block' policy of 'tasks_overflow' requires 'enqueue'")
 
             # The worker thread needs an event loop, it can't create a new one internally because it
             # has to be accessible by the user while calling "complete()", instead we use the global
@@ -812,7 +962,9 @@ class Logger:
                     ) from e
 
             coro = sink if iscoroutinefunction(sink) else sink.__call__
-            wrapped_sink = AsyncSink(coro, loop, error_interceptor)
+            wrapped_sink = AsyncSink(
+                coro, loop, error_interceptor, max_tasks, batch_size, tasks_overflow
+            )
             encoding = "utf8"
             terminator = "\n"
             exception_prefix = ""
@@ -929,6 +1081,68 @@ class Logger:
                 % type(format).__name__
             )
 
+        if isinstance(enqueue, str) and enqueue not in (
+            "thread",
+            "process",
+            "compact",
+            "shared_memory",
+            "shared",
+            "deferred",
+        ):
+            raise ValueError(
+                "Invalid enqueue value, it should be a boolean, 'thread', 'process', 'compact', "
+                "'shared_memory', 'shared' or 'deferred', not: '%s'" % enqueue
+            )
+
+        if enqueue == "shared_memory" and sys.version_info < (3, 8):
+            raise ValueError("Using enqueue='shared_memory' requires Python 3.8 or later")
+
+        if enqueue in ("compact", "shared_memory") and isinstance(wrapped_sink, StandardSink):
+            raise ValueError(
+                "A standard logging handler requires the whole record, it can't be used "
+                "with enqueue='%s'" % enqueue
+            )
+
+        if queue_size is not None:
+            if not enqueue:
+                raise ValueError("The 'queue_size' parameter requires 'enqueue' to be enabled")
+            if enqueue in ("shared", "deferred"):
+                raise ValueError(
+                    "The 'queue_size' parameter can't be used with enqueue='%s'" % enqueue
+                )
+            if not isinstance(queue_size, int) or isinstance(queue_size, bool):
+                raise TypeError(
+                    "Invalid queue_size, it should be an integer, not: '%s'"
+                    % type(queue_size).__name__
+                )
+            if queue_size <= 0:
+                raise ValueError(
+                    "Invalid queue_size, it should be a strictly positive integer, not: %d"
+                    % queue_size
+                )
+
+        if not isinstance(overflow, str):
+            raise TypeError(
+                "Invalid overflow, it should be a string, not: '%s'" % type(overflow).__name__
+            )
+
+        overflow_levelno = None
+
+        if overflow.startswith("drop_below_level:"):
+            overflow_level = overflow[len("drop_below_level:") :]
+            if overflow_level.isdigit():
+                overflow_levelno = int(overflow_level)
+            else:
+                overflow_levelno = self.level(overflow_level).no
+            overflow = "drop_below_level"
+        elif overflow not in ("block", "drop_newest", "drop_oldest"):
+            raise ValueError(
+                "Invalid overflow, it should be 'block', 'drop_newest', 'drop_oldest' or "
+                "'drop_below_level:LEVEL', not: '%s'" % overflow
+            )
+        elif overflow == "drop_oldest" and queue_size is not None and enqueue != "thread":
+            raise ValueError("The 'drop_oldest' overflow policy requires enqueue='thread'")
+
         if not isinstance(encoding, str):
             encoding = "ascii"
 
@@ -942,6 +1156,19 @@ class Logger:
                 prefix=exception_prefix,
             )
 
+            dispatcher = None
+
+            if enqueue == "shared":
+                dispatcher = self._core.dispatcher
+                if dispatcher is None or not dispatcher.accepts_handlers():
+                    dispatcher = Dispatcher(_defaults.LOGURU_ENQUEUE_BATCH_SIZE)
+                    self._core.dispatcher = dispatcher
+            elif enqueue == "deferred":
+                dispatcher = self._core.deferred_dispatcher
+                if dispatcher is None or not dispatcher.accepts_handlers():
+                    dispatcher = DeferredDispatcher(_defaults.LOGURU_ENQUEUE_BATCH_SIZE)
+                    self._core.deferred_dispatcher = dispatcher
+
             handler = Handler(
                 name=name,
                 sink=wrapped_sink,
@@ -952,10 +1179,17 @@ class Logger:
                 colorize=colorize,
                 serialize=serialize,
                 enqueue=enqueue,
+                enqueue_batch_size=_defaults.LOGURU_ENQUEUE_BATCH_SIZE,
+                shared_memory_size=_defaults.LOGURU_SHARED_MEMORY_SIZE,
+                queue_size=queue_size,
+                overflow=overflow,
+                overflow_levelno=overflow_levelno,
+                dispatcher=dispatcher,
                 id_=handler_id,
                 error_interceptor=error_interceptor,
                 exception_formatter=exception_formatter,
                 levels_ansi_codes=self._core.levels_ansi_codes,
+                levels=self._core.levels,
             )
 
             handlers = self._core.handlers.copy()
@@ -969,6 +1203,13 @@ class Logger:
     def remove(self, handler_id=None):
         """Remove a previously added handler and stop sending logs to its sink.
 
+        All the handlers are automatically removed when the interpreter exits. In that case, they
+        are stopped concurrently: pending messages are written and files are compressed in
+        parallel, within a delay which can be configured through the ``LOGURU_SHUTDOWN_TIMEOUT``
+        environment variable (``10`` seconds by default). The handlers which may be slow to stop
+        (enqueued or writing to a file) are also stopped concurrently when several of them are
+        removed at once.
+
         Parameters
         ----------
         handler_id : |int| or ``None``
@@ -1005,6 +1246,26 @@ class Logger:
             else:
                 handler_ids = [handler_id]
 
+            # Handlers which may be slow to stop (e.g. compressing a file) are stopped concurrently.
+            slow_ids = [i for i in handler_ids if handlers[i].stops_slowly]
+
+            if len(slow_ids) > 1:
+                slow_handlers = [handlers.pop(i) for i in slow_ids]
+                levelnos = (h.levelno for h in handlers.values())
+                self._core.min_level = min(levelnos, default=float("inf"))
+                self._core.handlers = handlers
+
+                for handler in slow_handlers:
+                    handler.request_stop()
+
+                functions = [handler.finish_stop for handler in slow_handlers]
+                _, errors = self._core.shutdown_workers.run(functions)
+
+                if errors:
+                    raise errors[0]
+
+                handler_ids = [i for i in handler_ids if i in handlers]
+
             for handler_id in handler_ids:
                 handler = handlers.pop(handler_id)
 
@@ -1015,13 +1276,52 @@ class Logger:
 
                 handler.stop()
 
-    def complete(self):
+    def _shutdown(self, timeout=None):
+        # Called at exit to remove all the handlers at once. Instead of stopping them one after the
+        # other, all the writer threads are signaled first, then the handlers are finalized
+        # concurrently (this includes compression and retention of files) within a deadline.
+        if timeout is None:
+            timeout = _defaults.LOGURU_SHUTDOWN_TIMEOUT
+
+        with self._core.lock:
+            handlers = list(self._core.handlers.values())
+            self._core.handlers = {}
+            self._core.min_level = float("inf")
+
+        for handler in handlers:
+            handler.request_stop()
+
+        # Handlers which may be slow to stop are given first to the workers, as new threads might
+        # not be started at exit, in which case the remaining handlers are stopped inline.
+        handlers.sort(key=lambda handler: not handler.stops_slowly)
+        functions = [handler.finish_stop for handler in handlers]
+        unfinished, errors = self._core.shutdown_workers.run(functions, timeout)
+
+        if not sys.stderr:
+            return
+
+        for error in errors:
+            traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+
+        if unfinished:
+            sys.stderr.write(
+                "Loguru: %d handler(s) could not be stopped within %s seconds at exit\n"
+                % (unfinished, timeout)
+            )
+
+    def complete(self, timeout=None):
         """Wait for the end of enqueued messages and asynchronous tasks scheduled by handlers.
 
         This method proceeds in two steps: first it waits for all logging messages added to handlers
         with ``enqueue=True`` to be processed, then it returns an object that can be awaited to
         finalize all logging tasks added to the event loop by coroutine sinks.
 
+        The queues of all the handlers are drained concurrently and the logger is not locked while
+        waiting, so that other threads can keep logging or adding and removing handlers. If
+        ``timeout`` is not ``None``, the method gives up waiting for enqueued messages after this
+        many seconds. The number of messages logged before the call which were still not processed
+        is then available through the ``pending`` attribute of the returned object.
+
         It can be called from non-asynchronous code. This is especially recommended when the
         ``logger`` is utilized with ``multiprocessing`` to ensure messages put to the internal
         queue have been properly transmitted before leaving a child process.
@@ -1029,13 +1329,27 @@ class Logger:
         The returned object should be awaited before the end of a coroutine executed by
         |asyncio.run| or |loop.run_until_complete| to ensure all asynchronous logging messages are
         processed. The function |asyncio.get_running_loop| is called beforehand, only tasks
-        scheduled in the same loop that the current one will be awaited by the method.
+        scheduled in the same loop that the current one will be awaited by the method. To wait for
+        the enqueued messages without blocking the event loop, prefer |acomplete|.
+
+        Parameters
+        ----------
+        timeout : |float|, optional
+            The maximum number of seconds to wait for the enqueued messages to be processed. By
+            default, the method waits until all of them have been processed.
 
         Returns
         -------
         :term:`awaitable`
             An awaitable object which ensures all asynchronous logging calls are completed when
-            awaited.
+            awaited. Its ``pending`` attribute is the number of enqueued messages which were not
+            processed before the ``timeout`` expired.
+
+        Raises
+        ------
+        ValueError
+            If called from the event loop of a coroutine sink using ``tasks_overflow="block"``,
+            which would otherwise wait forever for the tasks that this very loop has to run.
 
         Examples
         --------
@@ -1065,20 +1379,81 @@ class Logger:
         >>> process.join()
         Message sent from the child
         """
+        try:
+            loop = _asyncio_loop.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # The loop couldn't run the tasks the writer thread is waiting for, hence a deadlock.
+            if any(handler.blocks_loop(loop) for handler in self._core.handlers.values()):
+                raise ValueError(
+                    "The 'block' policy of 'tasks_overflow' prevents calling 'complete()' from "
+                    "the event loop of the sink, 'acomplete()' should be awaited instead"
+                )
 
-        with self._core.lock:
-            handlers = self._core.handlers.copy()
-            for handler in handlers.values():
-                handler.complete_queue()
+        pending = self._complete_queues(timeout)
+        core = self._core
 
         class AwaitableCompleter:
             def __await__(self_):
-                with self._core.lock:
-                    handlers = self._core.handlers.copy()
-                    for handler in handlers.values():
-                        yield from handler.complete_async().__await__()
+                # The handlers are replaced (not mutated) on change, no need to lock the core.
+                for handler in core.handlers.values():
+                    yield from handler.complete_async().__await__()
+
+        completer = AwaitableCompleter()
+        completer.pending = pending
+        return completer
+
+    async def acomplete(self, timeout=None):
+        """Wait for the end of enqueued messages and asynchronous tasks without blocking the loop.
+
+        This is the coroutine counterpart of |complete|: the enqueued messages are waited for in a
+        thread of the default executor of the running event loop, so that other tasks can progress
+        meanwhile. The tasks scheduled by coroutine sinks are awaited afterwards.
+
+        Parameters
+        ----------
+        timeout : |float|, optional
+            The maximum number of seconds to wait for the enqueued messages to be processed. By
+            default, the method waits until all of them have been processed.
+
+        Returns
+        -------
+        :class:`int`
+            The number of enqueued messages which were not processed before the ``timeout``
+            expired.
+
+        Examples
+        --------
+        >>> async def main():
+        ...     logger.info("Message processed by another thread")
+        ...     await logger.acomplete(timeout=5)
+        ...
+        >>> logger.add(sys.stderr, enqueue=True)
+        1
+        >>> asyncio.run(main())
+        Message processed by another thread
+        """
+        loop = _asyncio_loop.get_running_loop()
+        pending = await loop.run_in_executor(None, self._complete_queues, timeout)
+
+        for handler in self._core.handlers.values():
+            await handler.complete_async()
+
+        return pending
+
+    def _complete_queues(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        handlers = self._core.handlers.values()
 
-        return AwaitableCompleter()
+        # Sizes are all recorded first so that queues are waited for concurrently.
+        counts = [(handler, handler.enqueued_count()) for handler in handlers]
+
+        return sum(
+            handler.complete_queue(count, deadline)
+            for handler, count in counts
+            if count is not None
+        )
 
     def catch(
         self,
@@ -1559,6 +1934,45 @@ class Logger:
 
         return level
 
+    def is_enabled_for(self, level):
+        """Check whether a message with the given severity could be sent to at least one handler.
+
+        This is useful to guard expensive computations which are only required to build messages
+        that would be discarded otherwise. Only the severity of the level is taken into account,
+        the filters of the handlers and the activation status of the module are not evaluated.
+
+        Parameters
+        ----------
+        level : |int| or |str|
+            The name or the severity of the level to be checked.
+
+        Returns
+        -------
+        :class:`bool`
+            ``True`` if the minimum level of at least one handler is lower or equal to the
+            severity of ``level``, ``False`` otherwise.
+
+        Raises
+        ------
+        ValueError
+            If ``level`` is a name and there is no level registered with such name.
+
+        Examples
+        --------
+        >>> logger.add(sys.stderr, level="INFO")
+        1
+        >>> logger.is_enabled_for("DEBUG")
+        False
+        >>> if logger.is_enabled_for("INFO"):
+        ...     logger.info("Stats: {}", compute_expensive_stats())
+        """
+        level_id, level_no = self._dynamic_level(level)
+
+        if level_id is not None:
+            level_no = self.level(level_id).no
+
+        return level_no >= self._core.min_level
+
     def disable(self, name):
         """Disable logging of messages coming from ``name`` module and its children.
 
@@ -1701,14 +2115,9 @@ class Logger:
             )
 
         with self._core.lock:
-            enabled = self._core.enabled.copy()
-
             if name is None:
-                for n in enabled:
-                    if n is None:
-                        enabled[n] = status
                 self._core.activation_none = status
-                self._core.enabled = enabled
+                self._core.enabled = {}
                 return
 
             if name != "":
@@ -1727,12 +2136,10 @@ class Logger:
 
                 activation_list.sort(key=modules_depth, reverse=True)
 
-            for n in enabled:
-                if n is not None and (n + ".")[: len(name)] == name:
-                    enabled[n] = status
-
+            # The tree must be replaced before the cache, see "_log()" for the reason.
             self._core.activation_list = activation_list
-            self._core.enabled = enabled
+            self._core.activation_tree = make_activation_tree(activation_list)
+            self._core.enabled = {}
 
     @staticmethod
     def parse(file, pattern, *, cast={}, chunk=2 ** 16):
@@ -1826,6 +2233,36 @@ class Logger:
         if should_close:
             fileobj.close()
 
+    @staticmethod
+    def register_compression(extension, function):
+        """Register a new compression format usable by file sinks.
+
+        Once registered, the ``extension`` can be passed as the ``compression`` argument of
+        |add|, the rotated files are then compressed by ``function`` and renamed with this
+        extension appended. This allows third-party libraries to provide additional codecs. A
+        format registered with the name of a built-in one replaces it.
+
+        Parameters
+        ----------
+        extension : |str|
+            The extension of the compressed files, which is also the name of the format.
+        function : |callable|_
+            A function accepting the path of the log file and the path of the compressed file to
+            create. It may also accept the ``level``, ``buffer_size`` and ``threads`` keyword
+            arguments, which are only passed if the corresponding ``compression_level``,
+            ``compression_buffer_size`` and ``compression_threads`` options are used.
+
+        Examples
+        --------
+        >>> def compress_zstd(path_in, path_out, level=3):
+        ...     with open(path_in, "rb") as f_in, open(path_out, "wb") as f_out:
+        ...         zstandard.ZstdCompressor(level=level).copy_stream(f_in, f_out)
+        ...
+        >>> logger.register_compression("zst", compress_zstd)
+        >>> logger.add("file.log", rotation="1 GB", compression="zst", compression_level=10)
+        """
+        Compression.register(extension, function)
+
     @staticmethod
     def _find_iter(fileobj, regex, chunk):
         buffer = fileobj.read(0)
@@ -1850,6 +2287,19 @@ class Logger:
         if not core.handlers:
             return
 
+        # The level is resolved first so that messages discarded by all handlers are dropped before
+        # paying for frame inspection, activation lookup and timestamp.
+        if level_id is None:
+            level_no = static_level_no
+        else:
+            try:
+                level_name, level_no, _, level_icon = core.levels[level_id]
+            except KeyError:
+                raise ValueError("Level '%s' does not exist" % level_id) from None
+
+        if level_no < core.min_level:
+            return
+
         (exception, depth, record, lazy, colors, raw, capture, patcher, extra) = options
 
         frame = get_frame(depth + 2)
@@ -1859,47 +2309,36 @@ class Logger:
         except KeyError:
             name = None
 
+        # The cache is updated without holding the lock. This is safe because it's retrieved before
+        # the activation tree, while "_change_activation()" replaces the tree before the cache: a
+        # status computed from an outdated tree can only be stored in an outdated cache.
+        enabled = core.enabled
+
         try:
-            if not core.enabled[name]:
+            if not enabled[name]:
                 return
         except KeyError:
-            enabled = core.enabled
             if name is None:
                 status = core.activation_none
-                enabled[name] = status
-                if not status:
-                    return
             else:
-                dotted_name = name + "."
-                for dotted_module_name, status in core.activation_list:
-                    if dotted_name[: len(dotted_module_name)] == dotted_module_name:
-                        if status:
-                            break
-                        enabled[name] = False
-                        return
-                enabled[name] = True
+                status = get_activation_status(core.activation_tree, name)
+
+            if len(enabled) >= core.enabled_maxsize:
+                enabled.clear()
+
+            enabled[name] = status
+
+            if not status:
+                return
 
         current_datetime = aware_now()
 
         if level_id is None:
             level_icon = " "
-            level_no = static_level_no
             level_name = "Level %d" % level_no
-        else:
-            try:
-                level_name, level_no, _, level_icon = core.levels[level_id]
-            except KeyError:
-                raise ValueError("Level '%s' does not exist" % level_id) from None
-
-        if level_no < core.min_level:
-            return
 
         code = frame.f_code
-        file_path = code.co_filename
-        file_name = basename(file_path)
-        thread = current_thread()
-        process = current_process()
-        elapsed = current_datetime - start_time
+        code_info = code_cache.get(code)
 
         if exception:
             if isinstance(exception, BaseException):
@@ -1912,21 +2351,20 @@ class Logger:
         else:
             exception = None
 
-        log_record = {
-            "elapsed": elapsed,
-            "exception": exception,
-            "extra": {**core.extra, **context.get(), **extra},
-            "file": RecordFile(file_name, file_path),
-            "function": code.co_name,
-            "level": RecordLevel(level_name, level_no, level_icon),
-            "line": frame.f_lineno,
-            "message": str(message),
-            "module": splitext(file_name)[0],
-            "name": name,
-            "process": RecordProcess(process.ident, process.name),
-            "thread": RecordThread(thread.ident, thread.name),
-            "time": current_datetime,
-        }
+        # The "elapsed", "file", "module", "process" and "thread" fields are computed lazily.
+        log_record = LazyRecord(
+            {
+                "exception": exception,
+                "extra": {**core.extra, **context.get(), **extra},
+                "function": code.co_name,
+                "level": RecordLevel(level_name, level_no, level_icon),
+                "line": frame.f_lineno,
+                "message": str(message),
+                "name": name,
+                "time": current_datetime,
+            },
+            (code_info, current_thread(), current_process(), current_datetime, start_time),
+        )
 
         if lazy:
             args = [arg() for arg in args]
@@ -1961,39 +2399,72 @@ class Logger:
         if patcher:
             patcher(log_record)
 
+        # Handlers configured identically share the formatting of the exception and message.
+        formatted_exceptions = {}
+        formatted_messages = {}
+        dispatched = []
+
         for handler in core.handlers.values():
-            handler.emit(log_record, level_id, from_decorator, raw, colored_message)
+            handler.emit(
+                log_record,
+                level_id,
+                from_decorator,
+                raw,
+                colored_message,
+                formatted_exceptions,
+                formatted_messages,
+                dispatched,
+            )
+
+        if dispatched:
+            dispatch(log_record, (level_id, from_decorator, raw, colored_message), dispatched)
 
     def trace(__self, __message, *args, **kwargs):
         r"""Log ``message.format(*args, **kwargs)`` with severity ``'TRACE'``."""
+        if __self._core.min_level > _defaults.LOGURU_TRACE_NO:
+            return
         __self._log("TRACE", None, False, __self._options, __message, args, kwargs)
 
     def debug(__self, __message, *args, **kwargs):
         r"""Log ``message.format(*args, **kwargs)`` with severity ``'DEBUG'``."""
+        if __self._core.min_level > _defaults.LOGURU_DEBUG_NO:
+            return
         __self._log("DEBUG", None, False, __self._options, __message, args, kwargs)
 
     def info(__self, __message, *args, **kwargs):
         r"""Log ``message.format(*args, **kwargs)`` with severity ``'INFO'``."""
+        if __self._core.min_level > _defaults.LOGURU_INFO_NO:
+            return
         __self._log("INFO", None, False, __self._options, __message, args, kwargs)
 
     def success(__self, __message, *args, **kwargs):
         r"""Log ``message.format(*args, **kwargs)`` with severity ``'SUCCESS'``."""
+        if __self._core.min_level > _defaults.LOGURU_SUCCESS_NO:
+            return
         __self._log("SUCCESS", None, False, __self._options, __message, args, kwargs)
 
     def warning(__self, __message, *args, **kwargs):
         r"""Log ``message.format(*args, **kwargs)`` with severity ``'WARNING'``."""
+        if __self._core.min_level > _defaults.LOGURU_WARNING_NO:
+            return
         __self._log("WARNING", None, False, __self._options, __message, args, kwargs)
 
     def error(__self, __message, *args, **kwargs):
         r"""Log ``message.format(*args, **kwargs)`` with severity ``'ERROR'``."""
+        if __self._core.min_level > _defaults.LOGURU_ERROR_NO:
+            return
         __self._log("ERROR", None, False, __self._options, __message, args, kwargs)
 
     def critical(__self, __message, *args, **kwargs):
         r"""Log ``message.format(*args, **kwargs)`` with severity ``'CRITICAL'``."""
+        if __self._core.min_level > _defaults.LOGURU_CRITICAL_NO:
+            return
         __self._log("CRITICAL", None, False, __self._options, __message, args, kwargs)
 
     def exception(__self, __message, *args, **kwargs):
         r"""Convenience method for logging an ``'ERROR'`` with exception information."""
+        if __self._core.min_level > _defaults.LOGURU_ERROR_NO:
+            return
         options = (True,) + __self._options[1:]
         __self._log("ERROR", None, False, options, __message, args, kwargs)
 
@@ -75,3 +75,170 @@ class RecordException(namedtuple("RecordException", ("type", "value", "traceback
             return (RecordException, (self.type, None, None))
         else:
             return (RecordException, (self.type, self.value, None))
+
+
+class LazyRecord(dict):
+    # Some fields of the record are costly to compute and are rarely used by handlers (they don't
+    # appear in most formats). They are built from the "_lazy" context captured during the logging
+    # call, and only once accessed through "record[key]". Any other operation requiring to know
+    # the full content of the dict (iteration, comparison, pickling...) computes all fields first,
+    # so that the record always behaves like a plain "dict".
+
+    __slots__ = ("_lazy",)
+
+    lazy_keys = ("elapsed", "file", "module", "process", "thread")
+
+    keys_order = (
+        "elapsed",
+        "exception",
+        "extra",
+        "file",
+        "function",
+        "level",
+        "line",
+        "message",
+        "module",
+        "name",
+        "process",
+        "thread",
+        "time",
+    )
+
+    def __init__(self, fields, lazy):
+        dict.__init__(self, fields)
+        self._lazy = lazy
+
+    def __missing__(self, key):
+        if self._lazy is None or key not in self.lazy_keys:
+            raise KeyError(key)
+        value = self._compute(key)
+        dict.__setitem__(self, key, value)
+        return value
+
+    def _compute(self, key):
+        code_info, thread, process, current_datetime, start_time = self._lazy
+
+        if key == "elapsed":
+            return current_datetime - start_time
+        elif key == "file":
+            file_name, file_path, _ = code_info
+            return RecordFile(file_name, file_path)
+        elif key == "module":
+            return code_info[2]
+        elif key == "process":
+            return RecordProcess(process.ident, process.name)
+        else:
+            return RecordThread(thread.ident, thread.name)
+
+    def _materialize(self):
+        if self._lazy is None:
+            return
+
+        computed = {
+            key: self._compute(key) for key in self.lazy_keys if not dict.__contains__(self, key)
+        }
+        self._lazy = None
+
+        if not computed:
+            return
+
+        fields = dict(dict.items(self))
+        dict.clear(self)
+
+        for key in self.keys_order:
+            if key in computed:
+                dict.__setitem__(self, key, computed[key])
+            elif key in fields:
+                dict.__setitem__(self, key, fields.pop(key))
+
+        dict.update(self, fields)
+
+    def copy(self):
+        return LazyRecord(dict.items(self), self._lazy)
+
+    def get(self, key, default=None):
+        self._materialize()
+        return dict.get(self, key, default)
+
+    def keys(self):
+        self._materialize()
+        return dict.keys(self)
+
+    def values(self):
+        self._materialize()
+        return dict.values(self)
+
+    def items(self):
+        self._materialize()
+        return dict.items(self)
+
+    def pop(self, *args):
+        self._materialize()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self._materialize()
+        return dict.popitem(self)
+
+    def setdefault(self, *args):
+        self._materialize()
+        return dict.setdefault(self, *args)
+
+    def clear(self):
+        self._lazy = None
+        dict.clear(self)
+
+    def __contains__(self, key):
+        self._materialize()
+        return dict.__contains__(self, key)
+
+    def __delitem__(self, key):
+        self._materialize()
+        dict.__delitem__(self, key)
+
+    def __iter__(self):
+        self._materialize()
+        return dict.__iter__(self)
+
+    def __reversed__(self):
+        self._materialize()
+        return reversed(dict.keys(self))
+
+    def __len__(self):
+        self._materialize()
+        return dict.__len__(self)
+
+    def __eq__(self, other):
+        self._materialize()
+        if isinstance(other, LazyRecord):
+            other._materialize()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        self._materialize()
+        if isinstance(other, LazyRecord):
+            other._materialize()
+        return dict.__ne__(self, other)
+
+    __hash__ = None
+
+    if hasattr(dict, "__or__"):
+
+        def __or__(self, other):
+            self._materialize()
+            return dict(dict.items(self)).__or__(other)
+
+        def __ror__(self, other):
+            self._materialize()
+            return dict(dict.items(self)).__ror__(other)
+
+    def __repr__(self):
+        self._materialize()
+        return dict.__repr__(self)
+
+    def __reduce__(self):
+        self._materialize()
+        return (dict, (dict(dict.items(self)),))
+
+    def __reduce_ex__(self, protocol):
+        return self.__reduce__()
@@ -0,0 +1,157 @@
+import collections
+import pickle
+import struct
+
+# The shared memory starts with the total number of bytes written and read so far, the remaining
+# space is used as a circular buffer of frames made of a header (size and kind) and a payload.
+counters = struct.Struct("<QQ")
+frame_header = struct.Struct("<IB")
+
+KIND_BYTES = 0
+KIND_PICKLE = 1
+KIND_STOP = 2
+
+
+class SharedMemoryQueue:
+    """A multi-producer, single-consumer queue backed by a fixed-size shared memory buffer.
+
+    It mimics the interface of ``multiprocessing.SimpleQueue`` used by the handlers. Producers only
+    take a lock while copying their frame into the buffer and signal the consumer through a
+    semaphore, the consumer moves all the pending frames out of the buffer at once. When the buffer
+    is full, producers wait for the consumer to notify them that some room was made.
+    """
+
+    def __init__(self, context, capacity):
+        from multiprocessing import shared_memory
+
+        self._capacity = capacity
+        self._memory = shared_memory.SharedMemory(create=True, size=counters.size + capacity)
+        counters.pack_into(self._memory.buf, 0, 0, 0)
+        self._lock = context.Lock()
+        self._not_full = context.Condition(self._lock)
+        self._items = context.Semaphore(0)
+        self._pending = collections.deque()
+        self._owner = True
+
+    def put(self, obj):
+        if obj is None:
+            kind, payload = KIND_STOP, b""
+        elif isinstance(obj, bytes):
+            kind, payload = KIND_BYTES, obj
+        else:
+            kind, payload = KIND_PICKLE, pickle.dumps(obj)
+
+        size = frame_header.size + len(payload)
+
+        if size > self._capacity:
+            raise ValueError(
+                "The message is too large for the shared memory queue (%d > %d bytes)"
+                % (size, self._capacity)
+            )
+
+        with self._not_full:
+            while True:
+                buf = self._memory.buf
+                written, read = counters.unpack_from(buf, 0)
+                if self._capacity - (written - read) >= size:
+                    self._copy_in(written, frame_header.pack(len(payload), kind) + payload)
+                    counters.pack_into(buf, 0, written + size, read)
+                    break
+                # The buffer is full, wait for the consumer to make some room.
+                self._not_full.wait()
+
+        self._items.release()
+
+    def get(self):
+        while not self._pending:
+            self._items.acquire()
+            count = self._receive()
+            # The semaphore was released once per frame, but some releases may still be pending.
+            for _ in range(count - 1):
+                if not self._items.acquire(False):
+                    break
+
+        kind, payload = self._pending.popleft()
+
+        if kind == KIND_BYTES:
+            return payload
+        if kind == KIND_PICKLE:
+            return pickle.loads(payload)
+        return None
+
+    def empty(self):
+        if self._pending:
+            return False
+        written, read = counters.unpack_from(self._memory.buf, 0)
+        return written == read
+
+    def close(self):
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+    def _receive(self):
+        with self._not_full:
+            buf = self._memory.buf
+            written, read = counters.unpack_from(buf, 0)
+            data = self._copy_out(read, written - read)
+            counters.pack_into(buf, 0, written, written)
+            self._not_full.notify_all()
+
+        count = 0
+        position = 0
+
+        while position < len(data):
+            size, kind = frame_header.unpack_from(data, position)
+            position += frame_header.size
+            self._pending.append((kind, data[position : position + size]))
+            position += size
+            count += 1
+
+        return count
+
+    def _copy_in(self, position, data):
+        buf = self._memory.buf
+        start = position % self._capacity
+        end = start + len(data)
+        offset = counters.size
+
+        if end <= self._capacity:
+            buf[offset + start : offset + end] = data
+        else:
+            split = self._capacity - start
+            buf[offset + start : offset + self._capacity] = data[:split]
+            buf[offset : offset + end - self._capacity] = data[split:]
+
+    def _copy_out(self, position, size):
+        buf = self._memory.buf
+        start = position % self._capacity
+        end = start + size
+        offset = counters.size
+
+        if end <= self._capacity:
+            return bytes(buf[offset + start : offset + end])
+
+        return bytes(buf[offset + start : offset + self._capacity]) + bytes(
+            buf[offset : offset + end - self._capacity]
+        )
+
+    def __getstate__(self):
+        return {
+            "_capacity": self._capacity,
+            "_name": self._memory.name,
+            "_lock": self._lock,
+            "_not_full": self._not_full,
+            "_items": self._items,
+        }
+
+    def __setstate__(self, state):
+        from multiprocessing import shared_memory
+
+        self._capacity = state["_capacity"]
+        self._memory = shared_memory.SharedMemory(state["_name"])
+        self._lock = state["_lock"]
+        self._not_full = state["_not_full"]
+        self._items = state["_items"]
+        self._pending = collections.deque()
+        self._owner = False
@@ -0,0 +1,94 @@
+import os
+import queue
+import threading
+import time
+from threading import Thread
+
+
+class ShutdownWorkers:
+    """Threads used to stop several handlers concurrently.
+
+    The workers are only started the first time handlers are stopped together, and are then kept
+    to be reused, notably when the interpreter exits. Python 3.12 forbids starting new threads from
+    "atexit" callbacks, in such case the handlers which can't be given to an existing worker are
+    stopped by the calling thread.
+    """
+
+    max_workers = 8
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks = queue.Queue()
+        self._threads = []
+        self._owner_process_pid = os.getpid()
+
+    def run(self, functions, timeout=None):
+        # Call all the functions concurrently. Return how many of them didn't finish in time, and
+        # the exceptions raised by the others.
+        available = self._start_workers(min(len(functions), self.max_workers))
+        events = []
+        errors = []
+
+        for index, function in enumerate(functions):
+            event = threading.Event()
+            events.append(event)
+
+            if index < available:
+                self._tasks.put((function, event, errors))
+                continue
+
+            thread = Thread(target=self._run, args=(function, event, errors), daemon=True)
+            try:
+                thread.start()
+            except RuntimeError:
+                # Starting threads may be forbidden while the interpreter is finalizing.
+                self._run(function, event, errors)
+
+        if timeout is None:
+            for event in events:
+                event.wait()
+        else:
+            deadline = time.monotonic() + timeout
+            for event in events:
+                event.wait(max(deadline - time.monotonic(), 0))
+
+        return sum(not event.is_set() for event in events), errors
+
+    def _start_workers(self, count):
+        # Return the number of workers available, which may be lower than requested at exit.
+        with self._lock:
+            self._forget_forked_threads()
+            while len(self._threads) < count:
+                thread = Thread(
+                    target=self._worker,
+                    daemon=True,
+                    name="loguru-shutdown-%d" % len(self._threads),
+                )
+                try:
+                    thread.start()
+                except RuntimeError:
+                    break
+                self._threads.append(thread)
+            return len(self._threads)
+
+    def _forget_forked_threads(self):
+        # Threads are not inherited by child processes.
+        if self._owner_process_pid != os.getpid():
+            self._tasks = queue.Queue()
+            self._threads = []
+            self._owner_process_pid = os.getpid()
+
+    def _worker(self):
+        tasks = self._tasks
+        while True:
+            function, event, errors = tasks.get()
+            self._run(function, event, errors)
+
+    @staticmethod
+    def _run(function, event, errors):
+        try:
+            function()
+        except Exception as error:
+            errors.append(error)
+        finally:
+            event.set()
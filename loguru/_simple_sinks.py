@@ -1,5 +1,8 @@
 import asyncio
+import collections
+import io
 import logging
+import threading
 import weakref
 
 from ._asyncio_loop import get_running_loop, get_task_loop
@@ -12,11 +15,26 @@ class StreamSink:
         self._stoppable = callable(getattr(stream, "stop", None))
         self._completable = asyncio.iscoroutinefunction(getattr(stream, "complete", None))
 
+        self._joinable = isinstance(stream, io.TextIOBase)
+
     def write(self, message):
         self._stream.write(message)
         if self._flushable:
             self._stream.flush()
 
+    @property
+    def write_batch(self):
+        # Custom streams may rely on the "record" attribute of each message, only text files are
+        # known to be safe to receive several messages joined together.
+        if self._joinable:
+            return self._write_joined
+        return None
+
+    def _write_joined(self, messages):
+        self._stream.write("".join(messages))
+        if self._flushable:
+            self._stream.flush()
+
     def stop(self):
         if self._stoppable:
             self._stream.stop()
@@ -57,19 +75,40 @@ class StandardSink:
 
 
 class AsyncSink:
-    def __init__(self, function, loop, error_interceptor):
+    def __init__(
+        self, function, loop, error_interceptor, max_tasks=None, batch_size=None, overflow="queue"
+    ):
         self._function = function
         self._loop = loop
         self._error_interceptor = error_interceptor
         self._tasks = weakref.WeakSet()
 
+        self._max_tasks = max_tasks
+        self._batch_size = batch_size
+        self._overflow = overflow
+        self._is_limited = max_tasks is not None or batch_size is not None
+
+        # Only used if the number of tasks is limited or if messages are batched.
+        self._pending = {}
+        self._scheduled = set()
+        self._running = 0
+        self._lock = threading.Lock()
+        self._task_done = threading.Condition(self._lock)
+
     def write(self, message):
         try:
             loop = self._loop or get_running_loop()
         except RuntimeError:
             return
 
+        if self._is_limited:
+            self._write_pending(message, loop)
+            return
+
         coroutine = self._function(message)
+        self._create_task(loop, coroutine, message.record)
+
+    def _create_task(self, loop, coroutine, record):
         task = loop.create_task(coroutine)
 
         def check_exception(future):
@@ -77,32 +116,137 @@ class AsyncSink:
                 return
             if not self._error_interceptor.should_catch():
                 raise future.exception()
-            self._error_interceptor.print(message.record, exception=future.exception())
+            self._error_interceptor.print(record, exception=future.exception())
 
         task.add_done_callback(check_exception)
         self._tasks.add(task)
+        return task
+
+    def _write_pending(self, message, loop):
+        with self._lock:
+            pending = self._pending.setdefault(loop, collections.deque())
+
+            if self._is_full(pending):
+                if self._overflow == "drop":
+                    return
+                if self._overflow == "block" and not self._is_loop_thread(loop):
+                    while self._is_full(pending) and self._pending.get(loop) is pending:
+                        self._task_done.wait()
+                    if self._pending.get(loop) is not pending:
+                        return  # The sink was stopped while waiting.
+
+            pending.append(message)
+
+            if loop in self._scheduled:
+                return
+            self._scheduled.add(loop)
+
+        # Messages logged during the same iteration of the event loop are grouped if possible.
+        loop.call_soon_threadsafe(self._start_tasks, loop)
+
+    def _is_full(self, pending):
+        if self._max_tasks is None:
+            return False
+        # Besides the batches taken by the available tasks, at most one batch can wait.
+        batch_size = self._batch_size or 1
+        return len(pending) >= (self._max_tasks - self._running + 1) * batch_size
+
+    def blocks_loop(self, loop):
+        # The writer thread may wait for tasks which can only progress if this loop is running.
+        return self._overflow == "block" and self._loop is loop
+
+    @staticmethod
+    def _is_loop_thread(loop):
+        try:
+            return get_running_loop() is loop
+        except RuntimeError:
+            return False
+
+    def _start_tasks(self, loop):
+        batches = []
+
+        with self._lock:
+            self._scheduled.discard(loop)
+            pending = self._pending.get(loop)
+
+            while pending and (self._max_tasks is None or self._running < self._max_tasks):
+                if self._batch_size is None:
+                    batches.append(pending.popleft())
+                else:
+                    count = min(len(pending), self._batch_size)
+                    batches.append([pending.popleft() for _ in range(count)])
+                self._running += 1
+
+        for batch in batches:
+            record = batch.record if self._batch_size is None else batch[0].record
+            task = self._create_task(loop, self._function(batch), record)
+            task.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, task):
+        with self._lock:
+            self._running -= 1
+            self._task_done.notify_all()
+            loops = [loop for loop, pending in self._pending.items() if pending]
+            loops = [loop for loop in loops if loop not in self._scheduled]
+            self._scheduled.update(loops)
+
+        for loop in loops:
+            if loop is get_task_loop(task):
+                self._start_tasks(loop)
+            else:
+                loop.call_soon_threadsafe(self._start_tasks, loop)
 
     def stop(self):
+        with self._lock:
+            self._pending.clear()
+            self._task_done.notify_all()
+
         for task in self._tasks:
             task.cancel()
 
     async def complete(self):
         loop = get_running_loop()
-        for task in self._tasks:
-            if get_task_loop(task) is loop:
+
+        while True:
+            tasks = [task for task in self._tasks if get_task_loop(task) is loop]
+
+            for task in tasks:
                 try:
                     await task
                 except Exception:
                     pass  # Handled in "check_exception()"
 
+            if not self._is_limited:
+                break
+
+            # New tasks may have been started for the pending messages once others were done.
+            with self._lock:
+                has_pending = bool(self._pending.get(loop))
+
+            tasks = [task for task in self._tasks if get_task_loop(task) is loop]
+
+            if not has_pending and all(task.done() for task in tasks):
+                break
+
+            await asyncio.sleep(0)
+
     def __getstate__(self):
         state = self.__dict__.copy()
         state["_tasks"] = None
+        state["_pending"] = None
+        state["_scheduled"] = None
+        state["_lock"] = None
+        state["_task_done"] = None
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
         self._tasks = weakref.WeakSet()
+        self._pending = {}
+        self._scheduled = set()
+        self._running = 0
+        self._lock = threading.Lock()
+        self._task_done = threading.Condition(self._lock)
 
 
 class CallableSink:
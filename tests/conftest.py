@@ -1,5 +1,6 @@
 import asyncio
 import contextlib
+import datetime
 import logging
 import os
 import sys
@@ -86,6 +87,7 @@ def reset_logger():
             loguru._logger.Core(), None, 0, False, False, False, False, True, None, {}
         )
         loguru._logger.context.set({})
+        loguru._datetime.local_timezone_cache.clear()
 
     reset()
     yield
@@ -144,14 +146,22 @@ def monkeypatch_date(monkeypatch):
         else:
             struct = time.struct_time([*dt.timetuple()] + [zone, offset])
 
+        timestamp = dt.replace(tzinfo=datetime.timezone(datetime.timedelta(seconds=offset)))
+        timestamp = timestamp.timestamp()
+
         def patched_now(tz=None):
             return dt
 
         def patched_localtime(t):
             return struct
 
+        def patched_time():
+            return timestamp
+
         monkeypatch.setattr(loguru._datetime.datetime, "now", patched_now)
         monkeypatch.setattr(loguru._datetime, "localtime", patched_localtime)
+        monkeypatch.setattr(loguru._datetime, "time", patched_time)
+        loguru._datetime.local_timezone_cache.clear()
 
     return monkeypatch_date
 
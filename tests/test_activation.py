@@ -151,3 +151,73 @@ def test_invalid_enable_name(name):
 def test_invalid_disable_name(name):
     with pytest.raises(TypeError):
         logger.disable(name)
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("foo", True),
+        ("foo.bar", False),
+        ("foo.bar.baz", True),
+        ("foo.bar.baz.qux", True),
+        ("foo.bar.bazz", False),
+        ("foo.barr", True),
+        ("foobar", True),
+        ("lib", False),
+        ("lib.public", True),
+        ("lib.public.private", False),
+        ("lib.publicity", False),
+    ],
+)
+def test_activation_tree(writer, name, expected):
+    logger.add(writer, format="{message}")
+    logger.disable("foo.bar")
+    logger.enable("foo.bar.baz")
+    logger.disable("lib")
+    logger.enable("lib.public")
+    logger.disable("lib.public.private")
+
+    exec("logger.info('Test')", {"__name__": name, "logger": logger})
+
+    assert writer.read() == ("Test\n" if expected else "")
+
+
+def test_many_activation_rules(writer):
+    logger.add(writer, format="{message}")
+
+    for i in range(500):
+        logger.disable("plugins.plugin_%d" % i)
+    logger.enable("plugins.plugin_250.public")
+
+    for i in [0, 250, 499]:
+        exec("logger.info('%d')" % i, {"__name__": "plugins.plugin_%d" % i, "logger": logger})
+    exec("logger.info('public')", {"__name__": "plugins.plugin_250.public", "logger": logger})
+    exec("logger.info('other')", {"__name__": "plugins.plugin_500", "logger": logger})
+
+    assert writer.read() == "public\nother\n"
+
+
+def test_enabled_cache_is_bounded(writer, monkeypatch):
+    monkeypatch.setattr(logger._core, "enabled_maxsize", 10)
+    logger.add(writer, format="{message}")
+    logger.disable("generated.module_3")
+
+    for i in range(25):
+        exec("logger.info('%d')" % i, {"__name__": "generated.module_%d" % i, "logger": logger})
+
+    assert len(logger._core.enabled) <= 10
+    assert writer.read() == "".join("%d\n" % i for i in range(25) if i != 3)
+
+
+def test_activation_change_resets_cache(writer):
+    logger.add(writer, format="{message}")
+    logger.info("1")
+    assert logger._core.enabled == {"tests.test_activation": True}
+
+    logger.disable("tests")
+    assert logger._core.enabled == {}
+    logger.info("2")
+    assert logger._core.enabled == {"tests.test_activation": False}
+
+    logger.enable(None)
+    assert logger._core.enabled == {}
@@ -1,10 +1,17 @@
+import asyncio
+import inspect
+import io
+import multiprocessing
 import pickle
+import queue
 import re
 import sys
+import threading
 import time
 
 import pytest
 
+import loguru
 from loguru import logger
 
 from .conftest import default_threading_excepthook
@@ -33,6 +40,20 @@ class NotWritable:
         print(message, end="")
 
 
+class BlockingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+        self.writing = threading.Event()
+        self.unblocked = threading.Event()
+
+    def write(self, message):
+        self.writing.set()
+        self.unblocked.wait()
+        self.writes.append(message)
+        return super().write(message)
+
+
 def test_enqueue():
     x = []
 
@@ -234,3 +255,832 @@ def test_logging_not_unpicklable_exception():
     assert type_ is ValueError
     assert value is None
     assert traceback_ is None
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_enqueued_messages_written_by_batch(enqueue):
+    stream = BlockingStream()
+    logger.add(stream, format="{message}", enqueue=enqueue)
+
+    logger.info("0")
+    stream.writing.wait()
+
+    for i in range(1, 10):
+        logger.info("{}", i)
+
+    stream.unblocked.set()
+    logger.complete()
+
+    assert stream.writes == ["0\n", "1\n2\n3\n4\n5\n6\n7\n8\n9\n"]
+    assert stream.getvalue() == "".join("%d\n" % i for i in range(10))
+
+
+def test_enqueued_messages_batch_size(monkeypatch):
+    monkeypatch.setattr(loguru._defaults, "LOGURU_ENQUEUE_BATCH_SIZE", 4)
+
+    stream = BlockingStream()
+    logger.add(stream, format="{message}", enqueue=True)
+
+    logger.info("0")
+    stream.writing.wait()
+
+    for i in range(1, 10):
+        logger.info("{}", i)
+
+    stream.unblocked.set()
+    logger.complete()
+
+    assert stream.writes == ["0\n", "1\n2\n3\n4\n", "5\n6\n7\n8\n", "9\n"]
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_enqueued_messages_batch_with_faulty_message(enqueue, capsys):
+    class Stream(BlockingStream):
+        def write(self, message):
+            if "c" in message:
+                raise RuntimeError("Faulty message")
+            super().write(message)
+
+    stream = Stream()
+    logger.add(stream, format="{message}", enqueue=enqueue, catch=True)
+
+    logger.info("0")
+    stream.writing.wait()
+
+    for message in "abcd":
+        logger.info(message)
+
+    stream.unblocked.set()
+    logger.complete()
+
+    out, err = capsys.readouterr()
+    lines = err.strip().splitlines()
+    assert stream.getvalue() == "0\na\nb\nd\n"
+    assert out == ""
+    assert lines[0].startswith("--- Logging error in Loguru Handler")
+    assert "'message': 'c'" in lines[1]
+    assert lines[-2] == "RuntimeError: Faulty message"
+    assert err.count("Logging error in Loguru Handler") == 1
+
+
+def test_enqueue_shared_batch_with_not_caught_faulty_message(capsys):
+    class Stream(BlockingStream):
+        def write(self, message):
+            if "c" in message:
+                raise RuntimeError("Faulty message")
+            super().write(message)
+
+    stream = Stream()
+    logger.add(stream, format="{message}", enqueue="shared", catch=False)
+
+    logger.info("0")
+    stream.writing.wait()
+
+    for message in "abcd":
+        logger.info(message)
+
+    stream.unblocked.set()
+    logger.complete()
+
+    out, err = capsys.readouterr()
+    lines = err.strip().splitlines()
+    assert stream.getvalue() == "0\na\nb\nd\n"
+    assert out == ""
+    assert lines[0] == "Traceback (most recent call last):"
+    assert lines[-1] == "RuntimeError: Faulty message"
+    assert err.count("Traceback (most recent call last):") == 1
+
+
+def test_enqueued_messages_not_joined_for_custom_stream():
+    messages = []
+
+    class Stream:
+        def write(self, message):
+            messages.append(message)
+
+    logger.add(Stream(), format="{message}", enqueue=True)
+
+    for i in range(10):
+        logger.info("{}", i)
+
+    logger.complete()
+
+    assert messages == ["%d\n" % i for i in range(10)]
+    assert all(message.record["message"] == str(i) for i, message in enumerate(messages))
+
+
+@pytest.mark.parametrize("rotation", [None, 50])
+def test_enqueued_messages_written_by_batch_to_file(tmp_path, rotation):
+    logger.add(tmp_path / "test.log", format="{message}", enqueue=True, rotation=rotation)
+
+    for i in range(100):
+        logger.info("{:03}", i)
+
+    logger.remove()
+
+    files = sorted(tmp_path.iterdir(), key=lambda path: path.read_text())
+    assert "".join(path.read_text() for path in files) == "".join("%03d\n" % i for i in range(100))
+    assert all(path.stat().st_size <= 50 for path in files) or rotation is None
+
+
+@pytest.mark.parametrize("enqueue", [True, "process", "thread"])
+def test_enqueue_modes(enqueue):
+    x = []
+
+    def sink(message):
+        time.sleep(0.1)
+        x.append(message)
+
+    logger.add(sink, format="{message}", enqueue=enqueue)
+    logger.debug("Test")
+    assert len(x) == 0
+    logger.complete()
+    assert len(x) == 1
+    assert x[0] == "Test\n"
+
+
+def test_enqueue_thread_does_not_serialize(writer):
+    logger.add(writer, format="{message} {extra[unpicklable]}", enqueue="thread", catch=False)
+    logger.bind(unpicklable=NotPicklable()).info("Not pickled")
+    logger.remove()
+    assert writer.read().startswith("Not pickled <tests.test_add_option_enqueue.NotPicklable")
+
+
+def test_enqueue_thread_keeps_record():
+    records = []
+    logger.add(lambda m: records.append(m.record), enqueue="thread", catch=False)
+    logger.patch(lambda r: r["extra"].update(patched=r)).info("Test")
+    logger.remove()
+    assert records[0] is records[0]["extra"]["patched"]
+
+
+def test_enqueue_thread_without_simple_queue(monkeypatch):
+    # Python 3.5 and 3.6 don't have "queue.SimpleQueue".
+    monkeypatch.setattr(loguru._handler, "ThreadQueue", queue.Queue)
+    stream = BlockingStream()
+    logger.add(stream, format="{message}", enqueue="thread", queue_size=2, overflow="drop_oldest")
+
+    logger.info("0")
+    stream.writing.wait()
+
+    for i in range(1, 5):
+        logger.info("{}", i)
+
+    stream.unblocked.set()
+    logger.complete()
+    logger.info("5")
+    logger.remove()
+
+    assert stream.getvalue() == ("0\n3\n4\n2 messages were dropped because the queue was full\n5\n")
+
+
+def test_enqueue_thread_exception(writer):
+    logger.add(writer, format="{message}", enqueue="thread", catch=False, colorize=False)
+
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Error")
+
+    logger.remove()
+
+    lines = writer.read().strip().splitlines()
+    assert lines[0] == "Error"
+    assert lines[-1] == "ZeroDivisionError: division by zero"
+
+
+@pytest.mark.parametrize("enqueue", ["", "threads", "PROCESS"])
+def test_invalid_enqueue_value(writer, enqueue):
+    with pytest.raises(ValueError, match=r"Invalid enqueue value"):
+        logger.add(writer, enqueue=enqueue)
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_queue_size_drop_newest(enqueue):
+    stream = BlockingStream()
+    overflow = "drop_newest"
+    logger.add(stream, format="{level} {message}", enqueue=enqueue, queue_size=3, overflow=overflow)
+
+    logger.info("0")
+    stream.writing.wait()
+
+    for i in range(1, 10):
+        logger.info("{}", i)
+
+    stream.unblocked.set()
+    logger.complete()
+    logger.info("10")
+    logger.complete()
+
+    assert stream.getvalue() == (
+        "INFO 0\nINFO 1\nINFO 2\nINFO 3\n"
+        "WARNING 6 messages were dropped because the queue was full\n"
+        "INFO 10\n"
+    )
+
+
+def test_queue_size_drop_oldest():
+    stream = BlockingStream()
+    logger.add(stream, format="{message}", enqueue="thread", queue_size=3, overflow="drop_oldest")
+
+    logger.info("0")
+    stream.writing.wait()
+
+    for i in range(1, 10):
+        logger.info("{}", i)
+
+    stream.unblocked.set()
+    logger.complete()
+    logger.info("10")
+    logger.remove()
+
+    assert stream.getvalue() == (
+        "0\n7\n8\n9\n6 messages were dropped because the queue was full\n10\n"
+    )
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_queue_size_drop_below_level(enqueue):
+    stream = BlockingStream()
+    overflow = "drop_below_level:WARNING"
+    logger.add(stream, format="{message}", enqueue=enqueue, queue_size=3, overflow=overflow)
+
+    logger.info("0")
+    stream.writing.wait()
+
+    for i in range(1, 6):
+        logger.info("{}", i)
+
+    timer = threading.Timer(0.1, stream.unblocked.set)
+    timer.start()
+    logger.warning("Blocking")
+    timer.join()
+    logger.complete()
+    logger.info("Done")
+    logger.remove()
+
+    # The warning about dropped messages is sent as soon as there is room for it in the queue.
+    lines = stream.getvalue().splitlines()
+    assert lines[:4] == ["0", "1", "2", "3"]
+    assert sorted(lines[4:6]) == ["2 messages were dropped because the queue was full", "Blocking"]
+    assert lines[6:] == ["Done"]
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_queue_size_block(enqueue):
+    stream = BlockingStream()
+    logger.add(stream, format="{message}", enqueue=enqueue, queue_size=2, overflow="block")
+
+    logger.info("0")
+    stream.writing.wait()
+
+    logger.info("1")
+    logger.info("2")
+
+    timer = threading.Timer(0.1, stream.unblocked.set)
+    timer.start()
+    logger.info("3")
+    timer.join()
+    logger.remove()
+
+    assert stream.getvalue() == "0\n1\n2\n3\n"
+
+
+def test_queue_size_dropped_count_in_repr():
+    stream = BlockingStream()
+    i = logger.add(stream, enqueue="thread", queue_size=1, overflow="drop_newest")
+
+    logger.info("0")
+    stream.writing.wait()
+
+    for _ in range(4):
+        logger.info("Message")
+
+    assert repr(logger) == "<loguru.logger handlers=[(id=%d, level=10, sink=%r, dropped=3)]>" % (
+        i,
+        stream,
+    )
+
+    stream.unblocked.set()
+    logger.remove()
+
+
+@pytest.mark.parametrize("queue_size", [1.5, "10", True])
+def test_invalid_queue_size_type(writer, queue_size):
+    with pytest.raises(TypeError, match=r"Invalid queue_size"):
+        logger.add(writer, enqueue=True, queue_size=queue_size)
+
+
+@pytest.mark.parametrize("queue_size", [0, -1])
+def test_invalid_queue_size_value(writer, queue_size):
+    with pytest.raises(ValueError, match=r"Invalid queue_size"):
+        logger.add(writer, enqueue=True, queue_size=queue_size)
+
+
+def test_queue_size_without_enqueue(writer):
+    with pytest.raises(ValueError, match=r"requires 'enqueue'"):
+        logger.add(writer, enqueue=False, queue_size=10)
+
+
+@pytest.mark.parametrize("overflow", ["", "drop", "drop_below_level", "BLOCK"])
+def test_invalid_overflow_value(writer, overflow):
+    with pytest.raises(ValueError, match=r"Invalid overflow"):
+        logger.add(writer, enqueue=True, queue_size=10, overflow=overflow)
+
+
+@pytest.mark.parametrize("overflow", [None, 1, object()])
+def test_invalid_overflow_type(writer, overflow):
+    with pytest.raises(TypeError, match=r"Invalid overflow"):
+        logger.add(writer, enqueue=True, queue_size=10, overflow=overflow)
+
+
+def test_overflow_unknown_level(writer):
+    with pytest.raises(ValueError, match=r"Level 'foo' does not exist"):
+        logger.add(writer, enqueue=True, queue_size=10, overflow="drop_below_level:foo")
+
+
+@pytest.mark.parametrize("enqueue", [True, "process"])
+def test_drop_oldest_requires_thread(writer, enqueue):
+    with pytest.raises(ValueError, match=r"requires enqueue='thread'"):
+        logger.add(writer, enqueue=enqueue, queue_size=10, overflow="drop_oldest")
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_complete_timeout_returns_pending_messages(enqueue):
+    stream = BlockingStream()
+    logger.add(stream, format="{message}", enqueue=enqueue)
+
+    for i in range(3):
+        logger.info("{}", i)
+
+    stream.writing.wait()
+    start = time.monotonic()
+    assert logger.complete(timeout=0.1).pending == 3
+    assert time.monotonic() - start < 1
+
+    stream.unblocked.set()
+    assert logger.complete().pending == 0
+    assert stream.getvalue() == "0\n1\n2\n"
+
+
+def test_complete_waits_for_message_being_put(writer, monkeypatch):
+    putting, unblocked = threading.Event(), threading.Event()
+    i = logger.add(writer, format="{message}", enqueue="thread")
+    handler_queue = logger._core.handlers[i]._queue
+
+    class SlowQueue:
+        def __getattr__(self, name):
+            return getattr(handler_queue, name)
+
+        def put(self, message):
+            putting.set()
+            unblocked.wait()
+            handler_queue.put(message)
+
+    monkeypatch.setattr(logger._core.handlers[i], "_queue", SlowQueue())
+
+    thread = threading.Thread(target=logger.info, args=("Slow",))
+    thread.start()
+    putting.wait()
+
+    # The message is accounted for before being actually put in the queue.
+    assert logger.complete(timeout=0.1).pending == 1
+
+    unblocked.set()
+    thread.join()
+    assert logger.complete().pending == 0
+    assert writer.read() == "Slow\n"
+
+
+def test_complete_after_failed_put(writer):
+    logger.add(writer, format="{message}", enqueue=True, catch=True)
+    logger.bind(broken=NotPicklable()).info("Bye bye...")
+    assert logger.complete(timeout=5).pending == 0
+
+
+def test_complete_without_enqueued_handler(writer):
+    logger.add(writer, format="{message}")
+    logger.info("Test")
+    assert logger.complete(timeout=0).pending == 0
+    assert writer.read() == "Test\n"
+
+
+def test_complete_does_not_lock_logger(writer):
+    stream = BlockingStream()
+    logger.add(stream, format="{message}", enqueue="thread")
+    logger.info("Blocked")
+    stream.writing.wait()
+
+    thread = threading.Thread(target=logger.complete)
+    thread.start()
+
+    # Handlers can be added and used while another thread waits for the queue.
+    i = logger.add(writer, format="{message}")
+    logger.info("Not blocked")
+    logger.remove(i)
+    assert writer.read() == "Not blocked\n"
+
+    stream.unblocked.set()
+    thread.join()
+    assert stream.getvalue() == "Blocked\nNot blocked\n"
+
+
+def test_complete_waits_for_queues_concurrently():
+    def sink(message):
+        time.sleep(0.2)
+
+    for _ in range(4):
+        logger.add(sink, enqueue="thread")
+
+    logger.info("Test")
+
+    start = time.monotonic()
+    assert logger.complete().pending == 0
+    assert time.monotonic() - start < 0.6
+
+
+def test_complete_from_multiple_threads(writer):
+    logger.add(writer, format="{message}", enqueue="thread")
+
+    def worker(i):
+        logger.info("{}", i)
+        assert logger.complete().pending == 0
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(writer.read().splitlines()) == [str(i) for i in range(10)]
+
+
+@pytest.mark.parametrize("enqueue", [True, "thread"])
+def test_acomplete_does_not_block_event_loop(enqueue):
+    stream = BlockingStream()
+    logger.add(stream, format="{message}", enqueue=enqueue)
+
+    async def unblock():
+        stream.unblocked.set()
+
+    async def main():
+        logger.info("Test")
+        stream.writing.wait()
+        task = asyncio.ensure_future(unblock())
+        pending = await logger.acomplete()
+        await task
+        return pending
+
+    assert asyncio.run(main()) == 0
+    assert stream.getvalue() == "Test\n"
+
+
+def test_acomplete_timeout():
+    stream = BlockingStream()
+    logger.add(stream, format="{message}", enqueue="thread")
+
+    async def main():
+        logger.info("Test")
+        return await logger.acomplete(timeout=0.1)
+
+    assert asyncio.run(main()) == 1
+    stream.unblocked.set()
+    logger.remove()
+    assert stream.getvalue() == "Test\n"
+
+
+class PickleCounter:
+    count = 0
+
+    def __reduce__(self):
+        PickleCounter.count += 1
+        return (PickleCounter, ())
+
+
+def test_enqueue_shared_uses_single_thread():
+    writers = [io.StringIO() for _ in range(20)]
+
+    for writer in writers:
+        logger.add(writer, format="{message}", enqueue="shared")
+
+    threads = [t.name for t in threading.enumerate() if t.name.startswith("loguru-")]
+    assert [name for name in threads if not name.startswith("loguru-shutdown")] == [
+        "loguru-dispatcher"
+    ]
+
+    for i in range(3):
+        logger.info("{}", i)
+
+    logger.remove()
+
+    assert all(writer.getvalue() == "0\n1\n2\n" for writer in writers)
+    assert not any(t.name == "loguru-dispatcher" for t in threading.enumerate())
+
+
+def test_enqueue_shared_serializes_record_once(monkeypatch):
+    monkeypatch.setattr(PickleCounter, "count", 0)
+
+    for _ in range(5):
+        logger.add(lambda _: None, enqueue="shared")
+
+    logger.bind(counter=PickleCounter()).info("Test")
+    logger.remove()
+
+    assert PickleCounter.count == 1
+
+
+def test_enqueue_shared_formats_per_handler(writer):
+    stream = io.StringIO()
+    logger.add(writer, format="{level} {message}", level="WARNING", enqueue="shared")
+    logger.add(stream, format="{message}", enqueue="shared")
+
+    logger.info("A")
+    logger.warning("B")
+    logger.complete()
+
+    assert writer.read() == "WARNING B\n"
+    assert stream.getvalue() == "A\nB\n"
+
+
+def test_enqueue_shared_remove_one_handler():
+    stream_1, stream_2 = BlockingStream(), io.StringIO()
+    i = logger.add(stream_1, format="{message}", enqueue="shared")
+    logger.add(stream_2, format="{message}", enqueue="shared")
+
+    logger.info("A")
+    stream_1.writing.wait()
+    threading.Timer(0.1, stream_1.unblocked.set).start()
+
+    # Pending messages are written before the handler is removed.
+    logger.info("B")
+    logger.remove(i)
+    logger.info("C")
+    logger.complete()
+
+    assert stream_1.getvalue() == "A\nB\n"
+    assert stream_2.getvalue() == "A\nB\nC\n"
+
+
+def test_enqueue_shared_mixed_with_other_handlers(writer):
+    stream = io.StringIO()
+    logger.add(writer, format="{message}")
+    logger.add(stream, format="{message}", enqueue="shared")
+
+    logger.info("Test")
+    assert writer.read() == "Test\n"
+    logger.remove()
+    assert stream.getvalue() == "Test\n"
+
+
+def test_enqueue_shared_after_removal(writer):
+    logger.add(writer, format="{message}", enqueue="shared")
+    logger.info("A")
+    logger.remove()
+
+    logger.add(writer, format="{message}", enqueue="shared")
+    logger.info("B")
+    logger.remove()
+
+    assert writer.read() == "A\nB\n"
+
+
+def test_enqueue_shared_not_picklable(writer, capsys):
+    logger.add(writer, format="{message}", enqueue="shared", catch=True)
+
+    logger.info("It's fine")
+    logger.bind(broken=NotPicklable()).info("Bye bye...")
+    logger.info("It's fine again")
+    logger.remove()
+
+    out, err = capsys.readouterr()
+    lines = err.strip().splitlines()
+    assert writer.read() == "It's fine\nIt's fine again\n"
+    assert lines[0] == "--- Logging error in Loguru Handler #0 ---"
+    assert lines[-2].endswith("PicklingError: You shall not serialize me!")
+
+
+def test_enqueue_shared_not_caught_exception_sink_write(writer, capsys):
+    logger.add(NotWritable(), format="{message}", enqueue="shared", catch=False)
+    logger.add(writer, format="{message}", enqueue="shared")
+
+    logger.info("It's fine")
+    logger.bind(fail=True).info("Bye bye...")
+    logger.info("It's still fine")
+    logger.remove()
+
+    out, err = capsys.readouterr()
+    lines = err.strip().splitlines()
+    assert out == "It's fine\nIt's still fine\n"
+    assert writer.read() == "It's fine\nBye bye...\nIt's still fine\n"
+    assert lines[0] == "Traceback (most recent call last):"
+    assert lines[-1] == "RuntimeError: You asked me to fail..."
+
+
+def test_enqueue_shared_remove_after_thread_died(writer, capsys):
+    class KillingSink:
+        def write(self, message):
+            raise KeyboardInterrupt
+
+    logger.add(KillingSink(), enqueue="shared", catch=False)
+    logger.add(writer, enqueue="shared")
+
+    with default_threading_excepthook():
+        logger.info("Test")
+        logger.remove()
+
+    out, err = capsys.readouterr()
+    assert err.strip().splitlines()[-1] == "KeyboardInterrupt"
+
+    assert not any(t.name == "loguru-dispatcher" for t in threading.enumerate())
+
+
+def test_enqueue_shared_complete_after_failed_put(writer, monkeypatch):
+    logger.add(writer, format="{message}", enqueue="shared", catch=True)
+    logger.info("A")
+    logger.complete()
+
+    dispatcher = logger._core.dispatcher
+    monkeypatch.setattr(dispatcher._queue, "put", NotWritable().write)
+    logger.bind(fail=True).info("B")
+    monkeypatch.undo()
+
+    assert logger.complete(timeout=1).pending == 0
+    logger.remove()
+    assert writer.read() == "A\n"
+
+
+def test_enqueue_deferred_formats_in_writer_thread():
+    threads = []
+    stream = io.StringIO()
+
+    def filter_(record):
+        threads.append(threading.current_thread().name)
+        return "skip" not in record["extra"]
+
+    def format_(record):
+        threads.append(threading.current_thread().name)
+        return "{level} {message}\n"
+
+    logger.add(stream, format=format_, filter=filter_, enqueue="deferred")
+
+    logger.info("A")
+    logger.bind(skip=True).info("B")
+    logger.warning("C")
+    logger.complete()
+
+    assert stream.getvalue() == "INFO A\nWARNING C\n"
+    assert threads == ["loguru-dispatcher"] * 5
+
+    logger.remove()
+
+
+def test_enqueue_deferred_keeps_record_context():
+    records = []
+    logger.add(records.append, format="{message}", enqueue="deferred")
+
+    logger.bind(a=1).opt(colors=True).info("<red>{}</red>", "Test")
+    logger.complete()
+    logger.remove()
+
+    [message] = records
+    assert message == "Test\n"
+    assert message.record["extra"] == {"a": 1}
+    assert message.record["thread"].name == threading.current_thread().name
+
+
+def test_enqueue_deferred_remove_one_handler():
+    stream_1, stream_2 = BlockingStream(), io.StringIO()
+    i = logger.add(stream_1, format="{message}", enqueue="deferred")
+    logger.add(stream_2, format="{message}", enqueue="deferred")
+
+    logger.info("A")
+    stream_1.writing.wait()
+    threading.Timer(0.1, stream_1.unblocked.set).start()
+
+    # Pending messages are written before the handler is removed.
+    logger.info("B")
+    logger.remove(i)
+    logger.info("C")
+    logger.complete()
+
+    assert stream_1.getvalue() == "A\nB\n"
+    assert stream_2.getvalue() == "A\nB\nC\n"
+
+
+def test_enqueue_deferred_exception_formatted_by_caller():
+    stream = io.StringIO()
+    unblocked = threading.Event()
+
+    def filter_(record):
+        if "block" in record["extra"]:
+            unblocked.wait()
+        return True
+
+    logger.add(
+        stream,
+        format="{message}",
+        filter=filter_,
+        backtrace=True,
+        diagnose=True,
+        colorize=False,
+        enqueue="deferred",
+    )
+
+    def inner(value):
+        raise ValueError(value)
+
+    def outer():
+        value = "first"
+        try:
+            inner(value)
+        except ValueError:
+            logger.exception("Error")
+        value = "second"
+        return value
+
+    # The writer thread is blocked while the frames of the caller move on.
+    logger.bind(block=True).info("Blocking")
+    outer_line = inspect.currentframe().f_lineno + 1
+    outer()
+    unblocked_line = inspect.currentframe().f_lineno + 1
+    unblocked.set()
+    logger.complete()
+
+    output = stream.getvalue()
+    inner_line = inner.__code__.co_firstlineno + 1
+    call_line = outer.__code__.co_firstlineno + 3
+
+    assert "line %d, in test_enqueue_deferred_exception_formatted_by_caller" % outer_line in output
+    assert "line %d, in outer" % call_line in output
+    assert "line %d, in inner" % inner_line in output
+    assert "line %d" % unblocked_line not in output
+    assert "'first'" in output
+    assert "'second'" not in output
+
+
+def test_enqueue_deferred_error_in_format(writer, capsys):
+    def format_(record):
+        if "fail" in record["extra"]:
+            raise ValueError("Formatting failed")
+        return "{message}\n"
+
+    logger.add(writer, format=format_, enqueue="deferred", catch=True)
+    logger.add(NotWritable(), format="{message}", enqueue="deferred", catch=False)
+
+    logger.info("A")
+    logger.bind(fail=True).info("B")
+    logger.complete()
+    logger.info("C")
+    logger.remove()
+
+    out, err = capsys.readouterr()
+    lines = err.strip().splitlines()
+    assert writer.read() == "A\nC\n"
+    assert out == "A\nC\n"
+    assert lines[0] == "--- Logging error in Loguru Handler #0 ---"
+    assert "ValueError: Formatting failed" in lines
+    assert lines[-1] == "RuntimeError: You asked me to fail..."
+
+
+def test_enqueue_deferred_with_queue_size(writer):
+    with pytest.raises(ValueError, match=r"enqueue='deferred'"):
+        logger.add(writer, enqueue="deferred", queue_size=10)
+
+
+def test_enqueue_deferred_without_simple_queue(monkeypatch, writer):
+    monkeypatch.setattr(loguru._dispatcher, "ThreadQueue", queue.Queue)
+    logger.add(writer, format="{message}", enqueue="deferred")
+
+    assert isinstance(logger._core.deferred_dispatcher._queue, queue.Queue)
+
+    logger.info("Test")
+    logger.remove()
+
+    assert writer.read() == "Test\n"
+
+
+@pytest.mark.parametrize("enqueue", ["thread", "deferred"])
+def test_enqueue_within_process_does_not_use_shared_counters(monkeypatch, writer, enqueue):
+    def shared_value(*args, **kwargs):
+        raise AssertionError("The counters should not be shared between processes")
+
+    monkeypatch.setattr(multiprocessing, "Value", shared_value)
+    i = logger.add(writer, format="{message}", enqueue=enqueue)
+    handler = logger._core.handlers[i]
+
+    assert isinstance(handler._enqueued_count, loguru._handler.ThreadCounter)
+    assert isinstance(handler._written_count, loguru._handler.ThreadCounter)
+
+    logger.info("Test")
+    logger.complete()
+
+    assert writer.read() == "Test\n"
+    assert handler._written_count.value == handler._enqueued_count.value
+
+    logger.remove()
+
+
+def test_enqueue_shared_with_queue_size(writer):
+    with pytest.raises(ValueError, match=r"enqueue='shared'"):
+        logger.add(writer, enqueue="shared", queue_size=10)
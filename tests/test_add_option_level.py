@@ -1,5 +1,6 @@
 import pytest
 
+import loguru
 from loguru import logger
 
 
@@ -27,3 +28,16 @@ def test_invalid_level(writer, level):
 def test_unknown_level(writer, level):
     with pytest.raises(ValueError):
         logger.add(writer, level=level)
+
+
+@pytest.mark.parametrize("level", ["WARNING", 25])
+def test_level_too_high_skips_frame_and_time(writer, monkeypatch, level):
+    def unexpected_call(*args, **kwargs):
+        raise AssertionError("Should not be called for a discarded message")
+
+    logger.add(writer, level=level, format="{message}")
+    monkeypatch.setattr(loguru._logger, "get_frame", unexpected_call)
+    monkeypatch.setattr(loguru._logger, "aware_now", unexpected_call)
+    logger.info("Test level")
+    logger.log(20, "Test level")
+    assert writer.read() == ""
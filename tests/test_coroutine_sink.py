@@ -617,3 +617,218 @@ def test_complete_with_sub_processes(monkeypatch, capsys):
 def test_invalid_coroutine_sink_if_no_loop_with_enqueue():
     with pytest.raises(ValueError):
         logger.add(async_writer, enqueue=True, loop=None)
+
+
+class ConcurrencyTracker:
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.received = []
+
+    async def __call__(self, messages):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.received.append(messages)
+        self.running -= 1
+
+
+def test_max_tasks():
+    sink = ConcurrencyTracker()
+    logger.add(sink, format="{message}", max_tasks=3)
+
+    async def worker():
+        for i in range(20):
+            logger.info("{}", i)
+        await logger.complete()
+
+    asyncio.run(worker())
+
+    assert sink.max_running == 3
+    assert sorted(sink.received, key=int) == ["%d\n" % i for i in range(20)]
+
+
+def test_batch_size():
+    sink = ConcurrencyTracker()
+    logger.add(sink, format="{message}", batch_size=4)
+
+    async def worker():
+        for i in range(10):
+            logger.info("{}", i)
+        await asyncio.sleep(0.05)
+        logger.info("10")
+        await logger.complete()
+
+    asyncio.run(worker())
+
+    assert [len(batch) for batch in sink.received] == [4, 4, 2, 1]
+    assert [message for batch in sink.received for message in batch] == [
+        "%d\n" % i for i in range(11)
+    ]
+    assert sink.received[0][0].record["message"] == "0"
+
+
+def test_batch_size_with_max_tasks():
+    sink = ConcurrencyTracker()
+    logger.add(sink, format="{message}", max_tasks=1, batch_size=5)
+
+    async def worker():
+        for i in range(4):
+            logger.info("{}", i)
+            await asyncio.sleep(0)
+        await logger.complete()
+
+    asyncio.run(worker())
+
+    # The first message is sent at once, the following ones wait for the task to be done.
+    assert sink.max_running == 1
+    assert sink.received == [["0\n"], ["1\n", "2\n", "3\n"]]
+
+
+def test_tasks_overflow_drop():
+    sink = ConcurrencyTracker()
+    logger.add(sink, format="{message}", max_tasks=2, tasks_overflow="drop")
+
+    async def worker():
+        for i in range(10):
+            logger.info("{}", i)
+        await logger.complete()
+        logger.info("10")
+        await logger.complete()
+
+    asyncio.run(worker())
+
+    # Two messages are taken by the tasks, another one can wait for a task to be available.
+    assert sorted(sink.received, key=int) == ["0\n", "1\n", "2\n", "10\n"]
+
+
+def test_tasks_overflow_block():
+    loop = asyncio.new_event_loop()
+    sink = ConcurrencyTracker()
+    logger.add(
+        sink, format="{message}", enqueue=True, loop=loop, max_tasks=2, tasks_overflow="block"
+    )
+
+    async def worker():
+        for i in range(10):
+            logger.info("{}", i)
+        await logger.acomplete()
+
+    loop.run_until_complete(worker())
+    loop.close()
+
+    assert sink.max_running == 2
+    assert sorted(sink.received, key=int) == ["%d\n" % i for i in range(10)]
+
+
+def test_tasks_overflow_block_complete_from_loop():
+    loop = asyncio.new_event_loop()
+    sink = ConcurrencyTracker()
+    logger.add(
+        sink, format="{message}", enqueue=True, loop=loop, max_tasks=1, tasks_overflow="block"
+    )
+
+    async def worker():
+        logger.info("0")
+        with pytest.raises(ValueError, match=r"'acomplete\(\)' should be awaited instead"):
+            logger.complete()
+        await logger.acomplete()
+
+    loop.run_until_complete(worker())
+    loop.close()
+
+    assert sink.received == ["0\n"]
+
+
+def test_tasks_overflow_block_complete_from_other_loop():
+    loop = asyncio.new_event_loop()
+    sink = ConcurrencyTracker()
+    logger.add(
+        sink, format="{message}", enqueue=True, loop=loop, max_tasks=1, tasks_overflow="block"
+    )
+
+    async def worker():
+        await logger.complete()
+
+    logger.info("0")
+    asyncio.run(worker())
+    loop.run_until_complete(logger.acomplete())
+    loop.close()
+
+    assert sink.received == ["0\n"]
+
+
+def test_complete_waits_for_pending_messages(capsys):
+    logger.add(async_writer, format="{message}", max_tasks=1)
+
+    async def worker():
+        for i in range(5):
+            logger.info("{}", i)
+        await logger.complete()
+
+    asyncio.run(worker())
+
+    out, err = capsys.readouterr()
+    assert out == "0\n1\n2\n3\n4\n"
+    assert err == ""
+
+
+def test_pending_messages_discarded_on_remove():
+    sink = ConcurrencyTracker()
+    logger.add(sink, format="{message}", max_tasks=1)
+
+    async def worker():
+        for i in range(5):
+            logger.info("{}", i)
+        await asyncio.sleep(0)
+        logger.remove()
+        await logger.complete()
+
+    asyncio.run(worker())
+
+    assert sink.received == []
+
+
+def test_exception_in_batch_coroutine_caught(capsys):
+    async def sink(messages):
+        raise ValueError("Oops")
+
+    logger.add(sink, format="{message}", batch_size=10, catch=True)
+
+    async def worker():
+        logger.info("A")
+        logger.info("B")
+        await logger.complete()
+
+    asyncio.run(worker())
+
+    out, err = capsys.readouterr()
+    lines = err.strip().splitlines()
+    assert out == ""
+    assert lines[0] == "--- Logging error in Loguru Handler #0 ---"
+    assert re.match(r"Record was: \{.*'message': 'A'.*\}", lines[1])
+    assert lines[-2] == "ValueError: Oops"
+
+
+@pytest.mark.parametrize("option", ["max_tasks", "batch_size"])
+@pytest.mark.parametrize("value", ["1", 1.0, True])
+def test_invalid_tasks_option_type(option, value):
+    with pytest.raises(TypeError, match=r"^Invalid %s" % option):
+        logger.add(async_writer, **{option: value})
+
+
+@pytest.mark.parametrize("option", ["max_tasks", "batch_size"])
+@pytest.mark.parametrize("value", [0, -1])
+def test_invalid_tasks_option_value(option, value):
+    with pytest.raises(ValueError, match=r"^Invalid %s" % option):
+        logger.add(async_writer, **{option: value})
+
+
+def test_invalid_tasks_overflow():
+    with pytest.raises(ValueError, match=r"^Invalid tasks_overflow"):
+        logger.add(async_writer, max_tasks=1, tasks_overflow="drop_newest")
+
+
+def test_tasks_overflow_block_requires_enqueue():
+    with pytest.raises(ValueError, match=r"requires 'enqueue'"):
+        logger.add(async_writer, max_tasks=1, tasks_overflow="block")
@@ -146,3 +146,129 @@ def test_missing_struct_time_fields(writer, monkeypatch, monkeypatch_date):
 
     result = writer.read()
     assert re.fullmatch(r"\d{4} \d{2} \d{2} \d{2} \d{2} \d{2} \d{6} [+-]\d{4} .*\n", result)
+
+
+def test_local_timezone_is_reused(writer):
+    logger.add(writer, format="{time:ZZ zz}")
+    logger.info("A")
+    logger.info("B")
+
+    first = loguru._datetime.aware_now()
+    second = loguru._datetime.aware_now()
+
+    assert first.tzinfo is second.tzinfo
+    assert writer.read() == "{0}\n{0}\n".format(format(first, "ZZ zz"))
+
+
+def test_local_timezone_updated_every_minute(monkeypatch):
+    calls = []
+    timestamp = 1528502400.0  # 2018-06-09 00:00:00 UTC
+
+    def patched_localtime(t):
+        calls.append(t)
+        return time.struct_time((2018, 6, 9, 0, 0, 0, 5, 160, 0, "A", 3600))
+
+    monkeypatch.setattr(loguru._datetime, "localtime", patched_localtime)
+
+    cache = loguru._datetime.LocalTimezoneCache()
+    tzinfo = cache.get(timestamp + 10)
+    assert cache.get(timestamp + 59.9) is tzinfo
+    assert calls == [timestamp + 10]
+
+    assert cache.get(timestamp + 60) is tzinfo
+    assert cache.get(timestamp - 0.1) is tzinfo
+    assert calls == [timestamp + 10, timestamp + 60, timestamp - 0.1]
+
+
+def test_local_timezone_offset_change(monkeypatch):
+    offsets = iter([("CET", 3600), ("CEST", 7200)])
+
+    def patched_localtime(t):
+        zone, offset = next(offsets)
+        return time.struct_time((2018, 3, 25, 0, 0, 0, 6, 84, 0, zone, offset))
+
+    monkeypatch.setattr(loguru._datetime, "localtime", patched_localtime)
+
+    cache = loguru._datetime.LocalTimezoneCache()
+    before = cache.get(1521939540.0)
+    after = cache.get(1521939600.0)
+
+    assert before.utcoffset(None) == datetime.timedelta(hours=1)
+    assert before.tzname(None) == "CET"
+    assert after.utcoffset(None) == datetime.timedelta(hours=2)
+    assert after.tzname(None) == "CEST"
+
+
+@pytest.mark.skipif(not hasattr(time, "tzset"), reason="Unix only")
+def test_local_timezone_invalidated_by_tzset(monkeypatch):
+    calls = []
+
+    def patched_localtime(t):
+        calls.append(t)
+        return time.localtime(t)
+
+    monkeypatch.setattr(loguru._datetime, "localtime", patched_localtime)
+
+    cache = loguru._datetime.LocalTimezoneCache()
+    cache.get(1528502400.0)
+    cache.get(1528502400.0)
+    assert len(calls) == 1
+
+    time.tzset()
+    cache.get(1528502400.0)
+    assert len(calls) == 2
+
+
+def test_utc_clock(writer, monkeypatch):
+    utc_now = loguru._datetime.load_aware_now_function("utc")
+    monkeypatch.setattr(loguru._logger, "aware_now", utc_now)
+    logger.add(writer, format="{time:ZZ zz}")
+    logger.info("Test")
+    assert writer.read() == "+0000 %s\n" % UTC_NAME
+
+
+def test_utc_clock_value():
+    before = datetime.datetime.now(datetime.timezone.utc)
+    now = loguru._datetime.load_aware_now_function("utc")()
+    after = datetime.datetime.now(datetime.timezone.utc)
+
+    assert isinstance(now, loguru._datetime.datetime)
+    assert now.utcoffset() == datetime.timedelta(0)
+    assert before <= now <= after
+
+
+def test_invalid_clock():
+    with pytest.raises(ValueError, match=r".*LOGURU_CLOCK.*"):
+        loguru._datetime.load_aware_now_function("foobar")
+
+
+def test_formatting_within_same_second():
+    spec = "YYYY-MM-DD HH:mm:ss.SSSSSS x"
+    first = loguru._datetime.datetime(2018, 6, 9, 1, 2, 3, 45, tzinfo=datetime.timezone.utc)
+    second = loguru._datetime.datetime(2018, 6, 9, 1, 2, 3, 999999, tzinfo=datetime.timezone.utc)
+    third = loguru._datetime.datetime(2018, 6, 9, 1, 2, 4, 0, tzinfo=datetime.timezone.utc)
+
+    assert format(first, spec) == "2018-06-09 01:02:03.000045 1528506123000045"
+    assert format(second, spec) == "2018-06-09 01:02:03.999999 1528506123999999"
+    assert format(third, spec) == "2018-06-09 01:02:04.000000 1528506124000000"
+    assert format(first, spec) == "2018-06-09 01:02:03.000045 1528506123000045"
+
+
+def test_formatting_same_time_different_timezone():
+    spec = "HH:mm:ss zz ZZ"
+    tz_a = datetime.timezone(datetime.timedelta(hours=1), "A")
+    tz_b = datetime.timezone(datetime.timedelta(hours=1), "B")
+    first = loguru._datetime.datetime(2018, 6, 9, 1, 2, 3, tzinfo=tz_a)
+    second = loguru._datetime.datetime(2018, 6, 9, 1, 2, 3, tzinfo=tz_b)
+
+    assert format(first, spec) == "01:02:03 A +0100"
+    assert format(second, spec) == "01:02:03 B +0100"
+
+
+def test_formatting_compiled_once():
+    spec = "YYYY [YYYY] SSS"
+    compiled = loguru._datetime.compile_format(spec)
+    assert loguru._datetime.compile_format(spec) is compiled
+
+    dt = loguru._datetime.datetime(2018, 6, 9, 1, 2, 3, 456789)
+    assert compiled.format(dt) == "2018 YYYY 456"
@@ -429,3 +429,150 @@ def test_default_with_coroutine():
         return 1 / 0
 
     assert asyncio.run(foo()) == 42
+
+
+def test_exception_formatted_once_for_identical_handlers(monkeypatch):
+    calls = []
+    format_exception = loguru._better_exceptions.ExceptionFormatter.format_exception
+
+    def counting_format_exception(self, *args, **kwargs):
+        calls.append(self)
+        return format_exception(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        loguru._better_exceptions.ExceptionFormatter, "format_exception", counting_format_exception
+    )
+
+    sinks = [[] for _ in range(3)]
+    for sink in sinks:
+        logger.add(sink.append, format="{message}", backtrace=True, diagnose=True, colorize=False)
+
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Error")
+
+    assert len(calls) == 1
+    assert sinks[0] == sinks[1] == sinks[2]
+    assert sinks[0][0].endswith("ZeroDivisionError: division by zero\n")
+
+    logger.exception("No exception")
+
+    assert len(calls) == 2
+
+
+def test_exception_formatted_per_handler_configuration(monkeypatch):
+    calls = []
+    format_exception = loguru._better_exceptions.ExceptionFormatter.format_exception
+
+    def counting_format_exception(self, *args, **kwargs):
+        calls.append(self)
+        return format_exception(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        loguru._better_exceptions.ExceptionFormatter, "format_exception", counting_format_exception
+    )
+
+    diagnosed, not_diagnosed, colored = [], [], []
+    logger.add(diagnosed.append, format="{message}", diagnose=True, colorize=False)
+    logger.add(not_diagnosed.append, format="{message}", diagnose=False, colorize=False)
+    logger.add(colored.append, format="{message}", diagnose=True, colorize=True)
+
+    value = 0
+
+    try:
+        1 / value
+    except ZeroDivisionError:
+        logger.exception("Error")
+
+    assert len(calls) == 3
+    assert "└ 0" in diagnosed[0]
+    assert "└ 0" not in not_diagnosed[0]
+    assert "\x1b[" in colored[0]
+
+
+def test_exception_formatted_again_if_changed_by_filter():
+    def filter_(record):
+        try:
+            raise ValueError("Replaced")
+        except ValueError:
+            record["exception"] = loguru._recattrs.RecordException(*sys.exc_info())
+        return True
+
+    first, second = [], []
+    logger.add(first.append, format="{message}", colorize=False)
+    logger.add(second.append, format="{message}", colorize=False, filter=filter_)
+
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Error")
+
+    assert first[0].endswith("ZeroDivisionError: division by zero\n")
+    assert second[0].endswith("ValueError: Replaced\n")
+
+
+def test_repeated_exception_frames_cached_without_diagnose(monkeypatch):
+    lines = []
+    getline = loguru._better_exceptions.linecache.getline
+
+    def counting_getline(filename, lineno, *args):
+        lines.append(lineno)
+        return getline(filename, lineno, *args)
+
+    monkeypatch.setattr(loguru._better_exceptions.linecache, "getline", counting_getline)
+
+    messages = []
+    logger.add(messages.append, format="{message}", backtrace=False, diagnose=False, colorize=False)
+
+    def fail(value):
+        return 1 / value
+
+    for value in [0, 0, 0, None]:
+        try:
+            fail(value)
+        except (ZeroDivisionError, TypeError):
+            logger.exception("Error")
+
+    assert len(lines) == 2
+    assert messages[0] == messages[1] == messages[2]
+    assert messages[0].endswith("ZeroDivisionError: division by zero\n")
+    assert messages[3].endswith(
+        "TypeError: unsupported operand type(s) for /: 'int' and 'NoneType'\n"
+    )
+    assert messages[0].splitlines()[:-1] == messages[3].splitlines()[:-1]
+
+
+def test_exception_frames_not_cached_across_locations():
+    messages = []
+    logger.add(messages.append, format="{message}", backtrace=False, diagnose=False, colorize=False)
+
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Error")
+
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Error")
+
+    first_line = messages[0].splitlines()[-3]
+    second_line = messages[1].splitlines()[-3]
+    assert first_line != second_line
+    assert first_line.startswith('  File "%s", line ' % __file__)
+    assert second_line.startswith('  File "%s", line ' % __file__)
+
+
+def test_repeated_exception_values_updated_with_diagnose():
+    messages = []
+    logger.add(messages.append, format="{message}", diagnose=True, colorize=False)
+
+    for value in (0, 0.0):
+        try:
+            1 / value
+        except ZeroDivisionError:
+            logger.exception("Error")
+
+    assert "└ 0\n" in messages[0]
+    assert "└ 0.0\n" in messages[1]
@@ -0,0 +1,270 @@
+import datetime
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from loguru import logger
+
+
+def journal_of(tmpdir, name="test.log"):
+    return tmpdir.join(".%s.loguru-pending" % name)
+
+
+class BlockingCompression:
+    def __init__(self):
+        self.unblocked = threading.Event()
+        self.done = threading.Semaphore(0)
+        self.threads = []
+        self.compressed = []
+
+    def __call__(self, path):
+        self.threads.append(threading.current_thread())
+        self.unblocked.wait(5)
+        os.rename(path, path + ".done")
+        self.compressed.append(os.path.basename(path))
+        self.done.release()
+
+
+def wait_archives(handler_id):
+    # The tasks run one after the other, the journal being updated at the end of each of them.
+    worker = logger._core.handlers[handler_id]._sink._archive_worker
+    worker._get_executor().submit(lambda: None).result(5)
+
+
+def test_rotation_does_not_wait_for_compression(tmpdir):
+    compression = BlockingCompression()
+    file = tmpdir.join("test.log")
+    logger.add(
+        str(file),
+        format="{message}",
+        rotation=lambda _, __: True,
+        compression=compression,
+        background="thread",
+    )
+
+    logger.info("A")
+    assert compression.compressed == []
+
+    compression.unblocked.set()
+    logger.remove()
+
+    assert len(compression.compressed) == 1
+    assert compression.threads[0].name.startswith("loguru-archive")
+    assert file.read() == "A\n"
+    assert not journal_of(tmpdir).check(exists=1)
+
+
+def test_pending_archives_listed_in_journal(tmpdir):
+    compression = BlockingCompression()
+    file = tmpdir.join("test.log")
+    logger.add(
+        str(file), format="{message}", rotation="3 B", compression=compression, background=True
+    )
+
+    logger.info("A")
+    logger.info("B")
+
+    [rotated] = [f for f in tmpdir.listdir() if f.basename.startswith("test.") and f != file]
+    assert journal_of(tmpdir).read() == str(rotated) + "\n"
+
+    compression.unblocked.set()
+    logger.remove()
+
+    assert not journal_of(tmpdir).check(exists=1)
+    assert sorted(f.basename for f in tmpdir.listdir()) == [rotated.basename + ".done", "test.log"]
+
+
+def test_resume_pending_archives(tmpdir):
+    rotated = tmpdir.join("test.2020-01-01_00-00-00_000000.log")
+    rotated.write("Interrupted\n")
+    journal_of(tmpdir).write(str(rotated) + "\n" + str(tmpdir.join("missing.log")) + "\n")
+
+    i = logger.add(
+        str(tmpdir.join("test.log")), rotation="1 MB", compression="gz", background="thread"
+    )
+    logger.remove(i)
+
+    assert sorted(f.basename for f in tmpdir.listdir()) == [
+        "test.2020-01-01_00-00-00_000000.log.gz",
+        "test.log",
+    ]
+
+
+def test_background_timeout(tmpdir):
+    compression = BlockingCompression()
+    file = tmpdir.join("test.log")
+    i = logger.add(str(file), compression=compression, background="thread", background_timeout=0.1)
+
+    logger.remove(i)
+
+    # The compression is still listed, it would be resumed if the process ended.
+    assert compression.compressed == []
+    assert journal_of(tmpdir).read() == str(file) + "\n"
+
+    compression.unblocked.set()
+    compression.threads[0].join(5)
+
+    assert compression.compressed == ["test.log"]
+    assert not journal_of(tmpdir).check(exists=1)
+
+
+@pytest.mark.parametrize("background_timeout", [60, datetime.timedelta(seconds=60)])
+def test_background_process(tmpdir, background_timeout):
+    logger.add(
+        str(tmpdir.join("test.log")),
+        format="{message}",
+        rotation="3 B",
+        compression="gz",
+        background="process",
+        background_timeout=background_timeout,
+    )
+
+    logger.info("A")
+    logger.info("B")
+    logger.remove()
+
+    files = sorted(f.basename for f in tmpdir.listdir())
+    assert len(files) == 2
+    assert files[0].endswith(".log.gz")
+    assert files[1] == "test.log"
+
+
+def test_background_retention_keeps_current_file(tmpdir):
+    file = tmpdir.join("test.log")
+    i = logger.add(str(file), format="{message}", rotation="3 B", retention=1, background="thread")
+
+    for message in "ABCD":
+        logger.info(message)
+        time.sleep(0.05)
+
+    wait_archives(i)
+
+    assert file.read() == "D\n"
+    assert len(tmpdir.listdir()) == 2
+
+
+def test_background_compression_error(tmpdir, capsys):
+    def compression(path):
+        raise ValueError("Compression error")
+
+    file = tmpdir.join("test.log")
+    logger.add(str(file), compression=compression, background="thread")
+    logger.remove()
+
+    out, err = capsys.readouterr()
+    lines = err.strip().splitlines()
+    assert out == ""
+    assert lines[0] == "Loguru: Failed to archive '%s' in background" % file
+    assert lines[-1] == "ValueError: Compression error"
+    assert journal_of(tmpdir).read() == str(file) + "\n"
+
+
+@pytest.mark.parametrize("background", ["fork", "Thread"])
+def test_invalid_background_value(tmpdir, background):
+    with pytest.raises(ValueError, match=r"^Invalid background"):
+        logger.add(str(tmpdir.join("test.log")), background=background)
+
+
+@pytest.mark.parametrize("background", [1, object()])
+def test_invalid_background_type(tmpdir, background):
+    with pytest.raises(TypeError, match=r"^Cannot infer background"):
+        logger.add(str(tmpdir.join("test.log")), background=background)
+
+
+@pytest.mark.parametrize("background_timeout", ["10", object()])
+def test_invalid_background_timeout(tmpdir, background_timeout):
+    with pytest.raises(TypeError, match=r"^Cannot infer background_timeout"):
+        logger.add(
+            str(tmpdir.join("test.log")), background=True, background_timeout=background_timeout
+        )
+
+
+def test_background_process_requires_python_37(tmpdir, monkeypatch):
+    monkeypatch.setattr(sys, "version_info", (3, 6, 15))
+    with pytest.raises(ValueError, match=r"requires Python 3.7"):
+        logger.add(str(tmpdir.join("test.log")), background="process")
+
+
+def test_background_retention_skips_pending_archives(tmpdir, capsys):
+    compression = BlockingCompression()
+    file = tmpdir.join("test.log")
+    logger.add(
+        str(file),
+        format="{message}",
+        rotation="3 B",
+        retention=1,
+        compression=compression,
+        background="thread",
+    )
+
+    for message in "ABCDE":
+        logger.info(message)
+
+    compression.unblocked.set()
+    logger.remove()
+
+    out, err = capsys.readouterr()
+    assert out == err == ""
+    assert len(compression.compressed) == 4
+    assert file.read() == "E\n"
+    assert len(tmpdir.listdir()) == 2
+
+
+def test_background_retention_keeps_current_file_with_time_in_path(tmpdir, capsys):
+    compression = BlockingCompression()
+    i = logger.add(
+        str(tmpdir.join("test.{time}.log")),
+        format="{message}",
+        rotation="3 B",
+        retention=1,
+        compression=compression,
+        background="thread",
+    )
+
+    for message in "ABC":
+        logger.info(message)
+        time.sleep(0.01)  # The files must have different names.
+
+    compression.unblocked.set()
+    wait_archives(i)
+
+    out, err = capsys.readouterr()
+    assert out == err == ""
+    assert len(compression.compressed) == 2
+    assert sorted(f.read() for f in tmpdir.listdir() if not f.basename.endswith(".done")) == ["C\n"]
+
+    logger.info("D")
+    logger.remove()
+
+    assert len(compression.compressed) == 3
+    assert sorted(f.read() for f in tmpdir.listdir()) == ["C\n", "D\n"]
+
+
+def test_background_retention_size_with_compression(tmpdir, capsys):
+    import gzip
+
+    logger.add(
+        str(tmpdir.join("test.log")),
+        format="{message}",
+        rotation="100 B",
+        retention="2 KB",
+        compression="gz",
+        background="thread",
+    )
+
+    for index in range(500):
+        logger.info("Message {:010d}", index)
+
+    logger.remove()
+
+    out, err = capsys.readouterr()
+    assert out == err == ""
+
+    archives = [f for f in tmpdir.listdir() if f.basename.endswith(".gz")]
+    assert 0 < sum(f.size() for f in archives) <= 2000
+    assert tmpdir.join("test.log").read().endswith("Message 0000000499\n")
+    with gzip.open(str(max(archives))) as archive:
+        assert archive.read().decode().endswith("Message 0000000494\n")
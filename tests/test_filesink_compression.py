@@ -321,3 +321,195 @@ def test_zipfile_module_unavailable(ext, monkeypatch):
     monkeypatch.setitem(sys.modules, "zipfile", None)
     with pytest.raises(ImportError):
         logger.add("test.log", compression=ext)
+
+
+@pytest.fixture
+def codecs(monkeypatch):
+    compression = loguru._file_sink.Compression
+    monkeypatch.setattr(compression, "codecs", dict(compression.codecs))
+    monkeypatch.setattr(compression, "requirements", dict(compression.requirements))
+
+
+@pytest.mark.parametrize(
+    "compression", ["gz", "bz2", "xz", "lzma", "tar.gz", "tar.bz2", "tar.xz", "zip"]
+)
+def test_compression_level(tmpdir, compression):
+    i = logger.add(str(tmpdir.join("file.log")), compression=compression, compression_level=1)
+    logger.debug("test")
+    logger.remove(i)
+
+    assert len(tmpdir.listdir()) == 1
+    assert tmpdir.join("file.log.%s" % compression).check(exists=1)
+
+
+def test_compression_level_is_used(tmpdir):
+    message = "".join(chr(ord("a") + i % 26) * (i % 7) for i in range(10000))
+
+    for level in [0, 9]:
+        file = tmpdir.join("%d.log" % level)
+        i = logger.add(str(file), format="{message}", compression="gz", compression_level=level)
+        logger.debug(message)
+        logger.remove(i)
+
+    assert tmpdir.join("9.log.gz").size() < tmpdir.join("0.log.gz").size()
+
+
+@pytest.mark.parametrize("buffer_size", [1, 100, "1 KB"])
+@pytest.mark.parametrize("compression", ["gz", "bz2", "xz", "lzma"])
+def test_compression_buffer_size(tmpdir, compression, buffer_size):
+    import bz2
+    import gzip
+    import lzma
+
+    i = logger.add(
+        str(tmpdir.join("file.log")),
+        format="{message}",
+        compression=compression,
+        compression_buffer_size=buffer_size,
+    )
+    for n in range(100):
+        logger.debug("Message {}", n)
+    logger.remove(i)
+
+    opener = {"gz": gzip.open, "bz2": bz2.open, "xz": lzma.open, "lzma": lzma.open}[compression]
+    with opener(str(tmpdir.join("file.log.%s" % compression)), "rt") as file:
+        assert file.read() == "".join("Message %d\n" % n for n in range(100))
+
+
+@pytest.mark.parametrize("threads", [1, 2, 4])
+def test_compression_threads(tmpdir, threads):
+    import gzip
+    import zlib
+
+    expected = "".join("Message %d\n" % n for n in range(10000))
+
+    i = logger.add(
+        str(tmpdir.join("file.log")),
+        format="{message}",
+        compression="gz",
+        compression_buffer_size=1000,
+        compression_threads=threads,
+    )
+    for n in range(10000):
+        logger.debug("Message {}", n)
+    logger.remove(i)
+
+    data = tmpdir.join("file.log.gz").read_binary()
+    assert gzip.decompress(data).decode() == expected
+
+    members = 0
+    while data:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        decompressor.decompress(data)
+        data = decompressor.unused_data
+        members += 1
+
+    assert members == (1 if threads == 1 else len(expected) // 1000 + 1)
+
+
+def test_compression_threads_empty_file(tmpdir):
+    import gzip
+
+    i = logger.add(str(tmpdir.join("file.log")), compression="gz", compression_threads=2)
+    logger.remove(i)
+
+    with gzip.open(str(tmpdir.join("file.log.gz"))) as file:
+        assert file.read() == b""
+
+
+@pytest.mark.parametrize(
+    "compression, option, value",
+    [
+        ("tar", "compression_level", 1),
+        ("tar.gz", "compression_buffer_size", 1024),
+        ("bz2", "compression_threads", 2),
+        ("zip", "compression_threads", 1),
+    ],
+)
+def test_unsupported_compression_option(compression, option, value):
+    with pytest.raises(ValueError, match=r"^The '%s' compression does not support" % compression):
+        logger.add("test.log", compression=compression, **{option: value})
+
+
+def test_compression_option_with_function():
+    with pytest.raises(ValueError, match=r"^The compression options can only be used"):
+        logger.add("test.log", compression=lambda _: None, compression_level=1)
+
+
+@pytest.mark.parametrize(
+    "option, value",
+    [
+        ("compression_level", "9"),
+        ("compression_level", 1.0),
+        ("compression_level", True),
+        ("compression_buffer_size", object()),
+        ("compression_buffer_size", True),
+        ("compression_threads", 2.0),
+        ("compression_threads", "2"),
+    ],
+)
+def test_invalid_compression_option_type(option, value):
+    with pytest.raises(TypeError, match=r"^Cannot infer %s" % option):
+        logger.add("test.log", compression="gz", **{option: value})
+
+
+@pytest.mark.parametrize(
+    "option, value",
+    [
+        ("compression_buffer_size", "foo"),
+        ("compression_buffer_size", 0),
+        ("compression_threads", 0),
+    ],
+)
+def test_invalid_compression_option_value(option, value):
+    with pytest.raises(ValueError):
+        logger.add("test.log", compression="gz", **{option: value})
+
+
+def test_register_compression(tmpdir, codecs):
+    def reverse(path_in, path_out, level=None):
+        with open(path_in) as f_in, open(path_out, "w") as f_out:
+            f_out.write(f_in.read()[::-1] + str(level))
+
+    logger.register_compression(".rev", reverse)
+
+    i = logger.add(str(tmpdir.join("file.log")), format="{message}", compression="rev")
+    logger.debug("abc")
+    logger.remove(i)
+
+    j = logger.add(
+        str(tmpdir.join("other.log")), format="{message}", compression="rev", compression_level=3
+    )
+    logger.debug("def")
+    logger.remove(j)
+
+    assert sorted(f.basename for f in tmpdir.listdir()) == ["file.log.rev", "other.log.rev"]
+    assert tmpdir.join("file.log.rev").read() == "\ncbaNone"
+    assert tmpdir.join("other.log.rev").read() == "\nfed3"
+
+
+def test_register_compression_replaces_builtin(tmpdir, codecs, monkeypatch):
+    monkeypatch.setitem(sys.modules, "gzip", None)
+
+    def compress(path_in, path_out, **options):
+        with open(path_out, "w") as file:
+            file.write(repr(options))
+
+    logger.register_compression("gz", compress)
+
+    i = logger.add(str(tmpdir.join("file.log")), compression="gz", compression_threads=4)
+    logger.remove(i)
+
+    assert tmpdir.join("file.log.gz").read() == "{'threads': 4}"
+
+
+@pytest.mark.parametrize("extension, function", [(None, print), (".zst", "zstd")])
+def test_register_compression_invalid_type(codecs, extension, function):
+    with pytest.raises(TypeError, match=r"^Invalid compression"):
+        logger.register_compression(extension, function)
+
+
+@pytest.mark.parametrize("extension", ["", " . "])
+def test_register_compression_empty_extension(codecs, extension):
+    with pytest.raises(ValueError, match=r"^The compression extension must not be empty"):
+        logger.register_compression(extension, print)
@@ -0,0 +1,176 @@
+import asyncio
+import datetime
+import threading
+import time
+
+import pytest
+
+from loguru import logger
+
+
+def test_line_buffered_by_default(tmpdir):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}")
+
+    logger.info("A")
+    assert file.read() == "A\n"
+
+
+def test_flush_count(tmpdir):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", flush_count=3)
+
+    logger.info("A")
+    logger.info("B")
+    assert file.read() == ""
+
+    logger.info("C")
+    assert file.read() == "A\nB\nC\n"
+
+    logger.info("D")
+    assert file.read() == "A\nB\nC\n"
+
+
+@pytest.mark.parametrize("flush_size", [10, "10 B", 9.5])
+def test_flush_size(tmpdir, flush_size):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", flush_size=flush_size)
+
+    logger.info("abcd")
+    assert file.read() == ""
+
+    logger.info("éfg")  # 5 bytes once encoded.
+    assert file.read() == "abcd\néfg\n"
+
+
+@pytest.mark.parametrize("flush_level", ["ERROR", 40])
+def test_flush_level(tmpdir, flush_level):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", flush_level=flush_level)
+
+    logger.info("A")
+    logger.warning("B")
+    assert file.read() == ""
+
+    logger.error("C")
+    assert file.read() == "A\nB\nC\n"
+
+
+@pytest.mark.parametrize("flush_interval", [0.1, "100 ms", datetime.timedelta(milliseconds=100)])
+def test_flush_interval(tmpdir, flush_interval):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", flush_interval=flush_interval)
+
+    logger.info("A")
+    assert file.read() == ""
+
+    time.sleep(0.5)
+    assert file.read() == "A\n"
+    assert any(thread.name == "loguru-file-flush" for thread in threading.enumerate())
+
+
+def test_flush_interval_thread_stopped(tmpdir):
+    i = logger.add(str(tmpdir.join("test.log")), flush_interval=0.05)
+    logger.info("A")
+    logger.remove(i)
+
+    time.sleep(0.2)
+    assert not any(thread.name == "loguru-file-flush" for thread in threading.enumerate())
+
+
+def test_flush_on_stop(tmpdir):
+    file = tmpdir.join("test.log")
+    i = logger.add(str(file), format="{message}", flush_count=100)
+
+    logger.info("A")
+    assert file.read() == ""
+
+    logger.remove(i)
+    assert file.read() == "A\n"
+
+
+def test_flush_on_complete(tmpdir):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", flush_count=100, flush_interval=60)
+
+    logger.info("A")
+    assert file.read() == ""
+
+    async def complete():
+        await logger.complete()
+
+    asyncio.run(complete())
+    assert file.read() == "A\n"
+
+
+def test_flush_count_with_rotation(tmpdir):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", flush_count=2, rotation="4 B")
+
+    logger.info("A")
+    logger.info("B")
+    logger.info("C")
+
+    # The file is flushed once closed by the rotation.
+    assert len(tmpdir.listdir()) == 2
+    assert file.read() == ""
+
+    logger.info("D")
+    assert file.read() == "C\nD\n"
+
+
+def test_flush_count_with_enqueue(tmpdir):
+    file = tmpdir.join("test.log")
+    i = logger.add(str(file), format="{message}", flush_count=2, enqueue=True)
+
+    logger.info("A")
+    logger.info("B")
+    logger.complete()
+    assert file.read() == "A\nB\n"
+
+    logger.info("C")
+    logger.complete()
+    assert file.read() == "A\nB\n"
+
+    logger.remove(i)
+    assert file.read() == "A\nB\nC\n"
+
+
+def test_explicit_buffering_is_kept(tmpdir):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", flush_count=10, buffering=1)
+
+    logger.info("A")
+    assert file.read() == "A\n"
+
+
+@pytest.mark.parametrize(
+    "option, value",
+    [
+        ("flush_size", object()),
+        ("flush_size", True),
+        ("flush_count", "10"),
+        ("flush_count", 1.5),
+        ("flush_interval", object()),
+        ("flush_level", 1.0),
+    ],
+)
+def test_invalid_flush_option_type(tmpdir, option, value):
+    with pytest.raises(TypeError, match=r"^Cannot infer %s" % option):
+        logger.add(str(tmpdir.join("test.log")), **{option: value})
+
+
+@pytest.mark.parametrize(
+    "option, value",
+    [
+        ("flush_size", "foo"),
+        ("flush_size", 0),
+        ("flush_count", 0),
+        ("flush_interval", "foo"),
+        ("flush_interval", -1),
+        ("flush_level", "UNKNOWN"),
+    ],
+)
+def test_invalid_flush_option_value(tmpdir, option, value):
+    with pytest.raises(ValueError):
+        logger.add(str(tmpdir.join("test.log")), **{option: value})
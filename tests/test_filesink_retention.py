@@ -378,8 +378,113 @@ def test_invalid_retention(retention):
 
 @pytest.mark.parametrize(
     "retention",
-    ["W5", "monday at 14:00", "sunday", "nope", "5 MB", "3 hours 2 dayz", "d", "H", "__dict__"],
+    ["W5", "monday at 14:00", "sunday", "nope", "5 MBs", "3 hours 2 dayz", "d", "H", "__dict__"],
 )
 def test_unkown_retention(retention):
     with pytest.raises(ValueError):
         logger.add("test.log", retention=retention)
+
+
+@pytest.mark.parametrize("retention", ["25 B", " 25B ", "200 b"])
+def test_retention_size(tmpdir, retention):
+    for i, name in enumerate(["test.1.log", "test.2.log", "test.3.log"]):
+        file = tmpdir.join(name)
+        file.write("0123456789")
+        os.utime(str(file), (1000 * (i + 1), 1000 * (i + 1)))
+
+    i = logger.add(str(tmpdir.join("test.log")), format="{message}", retention=retention)
+    logger.debug("abcd")
+    logger.remove(i)
+
+    assert sorted(f.basename for f in tmpdir.listdir()) == ["test.2.log", "test.3.log", "test.log"]
+
+
+def test_retention_size_at_rotation(tmpdir):
+    logger.add(str(tmpdir.join("test.log")), format="{message}", rotation="5 B", retention="12 B")
+
+    for message in ["aaaa", "bbbb", "cccc", "dddd", "eeee"]:
+        logger.debug(message)
+
+    files = sorted(tmpdir.listdir())
+    assert len(files) == 3
+    assert [f.read() for f in files] == ["cccc\n", "dddd\n", "eeee\n"]
+
+
+def test_retention_index_only_stats_new_files(tmpdir, monkeypatch):
+    scandir = os.scandir
+    stats = []
+
+    class Entry:
+        def __init__(self, entry):
+            self._entry = entry
+            self.name = entry.name
+
+        def is_file(self):
+            return self._entry.is_file()
+
+        def stat(self):
+            stats.append(self.name)
+            return self._entry.stat()
+
+    class Scandir:
+        def __init__(self, path):
+            self._iterator = scandir(path)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            self._iterator.close()
+
+        def __iter__(self):
+            return (Entry(entry) for entry in self._iterator)
+
+    for i in range(50):
+        tmpdir.join("test.2011-01-01_01-01-01_%06d.log" % i).write("test")
+
+    monkeypatch.setattr(os, "scandir", Scandir)
+
+    logger.add(str(tmpdir.join("test.log")), format="{message}", rotation=0, retention=1000)
+
+    for message in range(10):
+        logger.debug(message)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+
+    assert len(tmpdir.listdir()) == 61
+    assert len(stats) == len(set(stats)) == 60
+
+
+def test_retention_index_with_files_removed_by_others(tmpdir):
+    logger.add(str(tmpdir.join("test.log")), format="{message}", rotation="5 B", retention=2)
+
+    logger.debug("aaaa")
+    logger.debug("bbbb")
+    logger.debug("cccc")
+
+    for file in tmpdir.listdir():
+        if file.basename != "test.log":
+            file.remove()
+
+    logger.debug("dddd")
+    logger.debug("eeee")
+
+    files = sorted(tmpdir.listdir())
+    assert len(files) == 3
+    assert [f.read() for f in files] == ["cccc\n", "dddd\n", "eeee\n"]
+
+
+def test_retention_with_time_in_directory(tmpdir):
+    for i, name in enumerate(["a", "b", "c"]):
+        file = tmpdir.join(name, "test.log")
+        file.write("test", ensure=True)
+        os.utime(str(file), (1000 * (i + 1), 1000 * (i + 1)))
+
+    i = logger.add(str(tmpdir.join("{time}", "test.log")), retention=2)
+    logger.debug("test")
+    logger.remove(i)
+
+    assert sorted(f.basename for f in tmpdir.visit("*.log")) == ["test.log", "test.log"]
+    assert not tmpdir.join("a", "test.log").check(exists=1)
+    assert not tmpdir.join("b", "test.log").check(exists=1)
+    assert tmpdir.join("c", "test.log").check(exists=1)
@@ -193,6 +193,71 @@ def test_size_rotation(monkeypatch_date, tmpdir, size):
     assert tmpdir.join("test_2018-01-01_00-00-03_000000.log").read() == "klmno\n"
 
 
+def test_size_rotation_existing_file(tmpdir):
+    file = tmpdir.join("test.log")
+    file.write("abcde\n")
+
+    logger.add(str(file), format="{message}", rotation="8 B")
+    logger.debug("fghij")
+
+    assert len(tmpdir.listdir()) == 2
+    assert file.read() == "fghij\n"
+
+
+def test_size_rotation_encoded_length(tmpdir):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", rotation="8 B", encoding="utf8")
+
+    logger.debug("ééé")  # 7 bytes but 4 characters.
+    logger.debug("a")
+
+    assert len(tmpdir.listdir()) == 2
+    assert file.read() == "a\n"
+
+
+def test_size_rotation_file_truncated_externally(tmpdir):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", rotation="12 B")
+
+    logger.debug("abcd")
+    file.write("")  # As done by "logrotate" with "copytruncate".
+    logger.debug("efgh")
+    logger.debug("ijkl")
+
+    assert len(tmpdir.listdir()) == 1
+    assert file.read() == "efgh\nijkl\n"
+
+
+def test_size_rotation_does_not_seek(tmpdir, monkeypatch):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", rotation="1 KB")
+
+    def forbidden(*args):
+        raise AssertionError("The file should not be seeked")
+
+    sink = next(iter(logger._core.handlers.values()))._sink
+    monkeypatch.setattr(sink._file, "seek", forbidden, raising=False)
+    monkeypatch.setattr(sink._file, "tell", forbidden, raising=False)
+
+    for i in range(10):
+        logger.debug("{}", i)
+
+    assert file.read() == "".join("%d\n" % i for i in range(10))
+
+
+def test_size_rotation_batch(tmpdir):
+    file = tmpdir.join("test_{time}.log")
+    logger.add(str(file), format="{message}", rotation="10 B", enqueue=True)
+
+    for i in range(6):
+        logger.debug("ab{}", i)
+
+    logger.remove()
+
+    contents = sorted(f.read() for f in tmpdir.listdir())
+    assert contents == ["ab0\nab1\n", "ab2\nab3\n", "ab4\nab5\n"]
+
+
 @pytest.mark.parametrize(
     "when, hours",
     [
@@ -3,6 +3,7 @@ import re
 import pytest
 
 from loguru import logger
+from loguru._recattrs import LazyRecord
 
 
 @pytest.mark.parametrize(
@@ -227,3 +228,58 @@ def test_not_formattable_message_with_colors(writer):
 def test_invalid_color_markup(writer):
     with pytest.raises(ValueError):
         logger.add(writer, format="<red>Not closed tag", colorize=True)
+
+
+@pytest.mark.parametrize("handlers", [1, 4, 16])
+@pytest.mark.parametrize("colorize", [True, False])
+def test_record_not_copied_per_handler(monkeypatch, handlers, colorize):
+    def unexpected_copy(self):
+        raise AssertionError("The record should not be copied while formatting")
+
+    sinks = [[] for _ in range(handlers)]
+    for sink in sinks:
+        logger.add(sink.append, format="<red>{message}</red>\n{exception}", colorize=colorize)
+
+    monkeypatch.setattr(LazyRecord, "copy", unexpected_copy)
+    logger.opt(colors=True).info("<blue>Test</blue>")
+
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Error")
+
+    for sink in sinks:
+        assert len(sink) == 2
+        assert "Test" in sink[0]
+        assert "ZeroDivisionError" in sink[1]
+
+
+class CountingFormat(str):
+    calls = 0
+
+    def format_map(self, mapping):
+        CountingFormat.calls += 1
+        return super().format_map(mapping)
+
+
+@pytest.mark.parametrize("colorize", [True, False])
+def test_formatting_done_once_per_distinct_format(monkeypatch, colorize):
+    monkeypatch.setattr(CountingFormat, "calls", 0)
+
+    sinks = [[] for _ in range(8)]
+    for i, sink in enumerate(sinks):
+        format_ = "{level} | {message}" if i % 2 else "{message}"
+        handler_id = logger.add(sink.append, format=format_, colorize=colorize)
+        handler = logger._core.handlers[handler_id]
+        if colorize:
+            formats = handler._precolorized_formats
+            handler._precolorized_formats = {k: CountingFormat(f) for k, f in formats.items()}
+        else:
+            handler._decolorized_format = CountingFormat(handler._decolorized_format)
+
+    logger.info("Message {}", 1)
+
+    assert CountingFormat.calls == 2
+    assert [sink[0].record["message"] for sink in sinks] == ["Message 1"] * 8
+    assert [str(sink[0]) for sink in sinks[:2]] == ["Message 1\n", "INFO | Message 1\n"]
+    assert [str(sink[0]) for sink in sinks] == [str(sink[0]) for sink in sinks[:2]] * 4
@@ -2,6 +2,7 @@ import functools
 
 import pytest
 
+import loguru
 from loguru import logger
 
 from .conftest import parse
@@ -242,3 +243,60 @@ def test_edit_unknown_level():
 def test_add_invalid_level_color(color):
     with pytest.raises(ValueError):
         logger.level("foobar", no=20, icon="", color=color)
+
+
+def test_is_enabled_for():
+    assert not logger.is_enabled_for("TRACE")
+    assert not logger.is_enabled_for(100)
+
+    i = logger.add(lambda _: None, level="INFO")
+
+    assert not logger.is_enabled_for("DEBUG")
+    assert not logger.is_enabled_for(19)
+    assert logger.is_enabled_for("INFO")
+    assert logger.is_enabled_for(20)
+    assert logger.is_enabled_for("CRITICAL")
+
+    logger.level("foobar", no=15)
+    assert not logger.is_enabled_for("foobar")
+
+    logger.add(lambda _: None, level=15)
+    assert logger.is_enabled_for("foobar")
+    assert not logger.is_enabled_for("DEBUG")
+
+    logger.remove(i)
+    assert logger.is_enabled_for("foobar")
+
+    logger.remove()
+    assert not logger.is_enabled_for("CRITICAL")
+
+
+@pytest.mark.parametrize("level", ["foo", "debug", -1, 3.4])
+def test_is_enabled_for_invalid_level(level):
+    with pytest.raises((ValueError, TypeError)):
+        logger.is_enabled_for(level)
+
+
+@pytest.mark.parametrize(
+    "method", ["trace", "debug", "info", "success", "warning", "error", "critical", "exception"]
+)
+def test_disabled_level_does_not_reach_log(writer, monkeypatch, method):
+    def unexpected_log(*args, **kwargs):
+        raise AssertionError("Logging call should have been discarded early")
+
+    logger.add(writer, level=100, format="{message}")
+    monkeypatch.setattr(logger, "_log", unexpected_log)
+    getattr(logger, method)("Discarded {}", 1)
+    assert writer.read() == ""
+
+
+@pytest.mark.parametrize("log", [logger.debug, functools.partial(logger.log, "DEBUG")])
+def test_disabled_level_skips_record_creation(writer, monkeypatch, log):
+    def unexpected(*args, **kwargs):
+        raise AssertionError("No record should be built for a disabled level")
+
+    logger.add(writer, level="INFO", format="{message}")
+    monkeypatch.setattr(loguru._logger, "get_frame", unexpected)
+    monkeypatch.setattr(loguru._logger, "LazyRecord", unexpected)
+    log("Message {}", 1)
+    assert writer.read() == ""
@@ -1,5 +1,6 @@
 import asyncio
 import copy
+import datetime
 import os
 import platform
 import sys
@@ -18,6 +19,7 @@ def fork_context(monkeypatch):
 
     context = multiprocessing.get_context("fork")
     monkeypatch.setattr(loguru._handler, "multiprocessing", context)
+    monkeypatch.setattr(loguru._dispatcher, "multiprocessing", context)
     yield context
 
 
@@ -27,6 +29,7 @@ def spawn_context(monkeypatch):
 
     context = multiprocessing.get_context("spawn")
     monkeypatch.setattr(loguru._handler, "multiprocessing", context)
+    monkeypatch.setattr(loguru._dispatcher, "multiprocessing", context)
     yield context
 
 
@@ -626,3 +629,394 @@ def test_complete_from_multiple_child_processes(capsys, fork_context):
 
     out, err = capsys.readouterr()
     assert out == err == ""
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows does not support forking")
+def test_process_fork_enqueue_thread(fork_context, tmp_path):
+    filepath = tmp_path / "test.log"
+    logger.add(filepath, format="{message}", enqueue="thread", catch=False)
+
+    logger.info("Parent")
+    logger.complete()
+
+    process = fork_context.Process(target=subworker_inheritance)
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+
+    logger.info("Done!")
+    logger.remove()
+
+    assert filepath.read_text() == "Parent\nChild\nDone!\n"
+
+
+class RecordWriter(Writer):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def write(self, message):
+        super().write(message)
+        self.records.append(message.record)
+
+
+@pytest.mark.skipif(platform.python_implementation() == "PyPy", reason="PyPy bug #3630")
+def test_apply_spawn_enqueue_compact(spawn_context):
+    writer = RecordWriter()
+
+    logger.add(writer, format="{level} {message}", enqueue="compact", catch=False)
+
+    with spawn_context.Pool(1, set_logger, [logger]) as pool:
+        for i in range(3):
+            pool.apply(do_something, (i,))
+        pool.close()
+        pool.join()
+
+    logger.info("Done!")
+    logger.remove()
+
+    assert writer.read() == "INFO #0\nINFO #1\nINFO #2\nINFO Done!\n"
+    assert all(set(record) == {"level", "time"} for record in writer.records)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows does not support forking")
+def test_apply_fork_enqueue_compact(fork_context):
+    writer = RecordWriter()
+
+    logger.add(writer, format="{level} {message}", enqueue="compact", catch=False)
+
+    with fork_context.Pool(1, set_logger, [logger]) as pool:
+        for i in range(3):
+            pool.apply(do_something, (i,))
+        pool.close()
+        pool.join()
+
+    logger.info("Done!")
+    logger.remove()
+
+    assert writer.read() == "INFO #0\nINFO #1\nINFO #2\nINFO Done!\n"
+    assert [record["level"].name for record in writer.records] == ["INFO"] * 4
+    assert all(set(record) == {"level", "time"} for record in writer.records)
+
+
+def test_enqueue_compact_preserves_time_and_level():
+    records = []
+    writer = RecordWriter()
+
+    logger.add(writer, format="{message}", enqueue="compact", catch=False)
+    logger.add(lambda m: records.append(m.record), format="{message}", catch=False)
+
+    logger.level("foo", no=15, icon="é")
+    logger.log("foo", "Test")
+    logger.remove()
+
+    compact, full = writer.records[0], records[0]
+    assert compact["time"] == full["time"]
+    assert compact["time"].tzinfo.utcoffset(None) == full["time"].utcoffset()
+    assert compact["time"].tzname() == full["time"].tzname()
+    fmt = "{:YYYY-MM-DD HH:mm:ss.SSSSSS Z}"
+    assert fmt.format(compact["time"]) == fmt.format(full["time"])
+    assert (compact["level"].name, compact["level"].no, compact["level"].icon) == ("foo", 15, "é")
+
+
+def test_enqueue_compact_naive_time_falls_back_to_whole_record():
+    writer = RecordWriter()
+
+    def patcher(record):
+        record["time"] = record["time"].replace(tzinfo=None)
+
+    logger.add(writer, format="{message}", enqueue="compact", catch=False)
+    logger.patch(patcher).info("Naive")
+    logger.info("Aware")
+    logger.remove()
+
+    assert writer.read() == "Naive\nAware\n"
+    assert "thread" in writer.records[0]
+    assert set(writer.records[1]) == {"level", "time"}
+
+
+class UnnamedTimezone(datetime.tzinfo):
+    def utcoffset(self, dt):
+        return datetime.timedelta(hours=2)
+
+    def tzname(self, dt):
+        return None
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+
+@pytest.mark.parametrize(
+    "time",
+    [
+        datetime.datetime(2022, 1, 1, 12, tzinfo=UnnamedTimezone()),
+        "2022-01-01 12:00:00",
+        None,
+    ],
+)
+def test_enqueue_compact_unusual_time(time):
+    writer = RecordWriter()
+
+    logger.add(writer, format="{message}", enqueue="compact", catch=False)
+    logger.patch(lambda record: record.update(time=time)).info("Unusual")
+    logger.remove()
+
+    assert writer.read() == "Unusual\n"
+    if isinstance(time, datetime.datetime):
+        assert writer.records[0]["time"] == time
+        assert writer.records[0]["time"].tzname() == ""
+    else:
+        assert writer.records[0]["time"] == time
+
+
+def test_enqueue_compact_with_standard_handler():
+    import logging
+
+    with pytest.raises(ValueError, match=r"enqueue='compact'"):
+        logger.add(logging.StreamHandler(), enqueue="compact")
+
+
+@pytest.mark.parametrize("level", ["INFO", "SUCCESS"])
+def test_enqueue_compact_round_trip_smaller_than_pickle(level):
+    import pickle
+
+    messages = []
+    logger.add(messages.append, format="{time} - {level} - {name}:{line} - {message}")
+    logger.bind(user="someone").log(level, "Some message: {} é", 42)
+    message = messages[0]
+    record = message.record
+
+    packed = loguru._compact_message.pack_message(message)
+    text, unpacked = loguru._compact_message.unpack_message(pickle.loads(pickle.dumps(packed)))
+
+    assert text == str(message)
+    assert unpacked["time"] == record["time"]
+    assert unpacked["time"].utcoffset() == record["time"].utcoffset()
+    assert unpacked["time"].tzname() == record["time"].tzname()
+    assert unpacked["level"].name == record["level"].name
+    assert unpacked["level"].no == record["level"].no
+    assert unpacked["level"].icon == record["level"].icon
+    assert len(pickle.dumps(packed)) * 3 < len(pickle.dumps(message))
+
+
+def subworker_many(logger_, index):
+    for i in range(500):
+        logger_.info("{}-{}", index, i)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Shared memory requires Python 3.8+")
+@pytest.mark.skipif(os.name == "nt", reason="Windows does not support forking")
+def test_process_fork_enqueue_shared_memory(fork_context):
+    writer = RecordWriter()
+
+    logger.add(writer, format="{message}", enqueue="shared_memory", catch=False)
+
+    processes = [
+        fork_context.Process(target=subworker_many, args=(logger, index)) for index in range(4)
+    ]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    logger.info("Main")
+    logger.remove()
+
+    lines = writer.read().splitlines()
+    assert lines[-1] == "Main"
+    assert sorted(lines[:-1]) == sorted("%d-%d" % (p, i) for p in range(4) for i in range(500))
+    for index in range(4):
+        assert [line for line in lines if line.startswith("%d-" % index)] == [
+            "%d-%d" % (index, i) for i in range(500)
+        ]
+    assert all(set(record) == {"level", "time"} for record in writer.records)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Shared memory requires Python 3.8+")
+@pytest.mark.skipif(platform.python_implementation() == "PyPy", reason="PyPy bug #3630")
+def test_process_spawn_enqueue_shared_memory(spawn_context):
+    writer = Writer()
+
+    logger.add(writer, format="{message}", enqueue="shared_memory", catch=False)
+
+    process = spawn_context.Process(target=subworker, args=(logger,))
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+
+    logger.info("Main")
+    logger.remove()
+
+    assert writer.read() == "Child\nMain\n"
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Shared memory requires Python 3.8+")
+def test_shared_memory_queue_wrap_around():
+    import multiprocessing
+
+    queue = loguru._shared_memory_queue.SharedMemoryQueue(multiprocessing, capacity=64)
+    items = [b"x" * (i % 40) for i in range(200)] + [("pickled", 1), True, None]
+
+    thread = threading.Thread(target=lambda: [queue.put(item) for item in items])
+    thread.start()
+
+    received = []
+    while True:
+        item = queue.get()
+        received.append(item)
+        if item is None:
+            break
+
+    thread.join()
+    queue.close()
+
+    assert received == items
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Shared memory requires Python 3.8+")
+def test_shared_memory_queue_message_too_large():
+    import multiprocessing
+
+    queue = loguru._shared_memory_queue.SharedMemoryQueue(multiprocessing, capacity=64)
+
+    with pytest.raises(ValueError, match=r"too large"):
+        queue.put(b"x" * 100)
+
+    queue.put(b"y" * 50)
+    assert queue.get() == b"y" * 50
+    queue.close()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Shared memory requires Python 3.8+")
+def test_enqueue_shared_memory_naive_time_falls_back_to_whole_record():
+    writer = RecordWriter()
+
+    def patcher(record):
+        record["time"] = record["time"].replace(tzinfo=None)
+
+    logger.add(writer, format="{message}", enqueue="shared_memory", catch=False)
+    logger.patch(patcher).info("Naive")
+    logger.info("Aware")
+    logger.remove()
+
+    assert writer.read() == "Naive\nAware\n"
+    assert "thread" in writer.records[0]
+    assert set(writer.records[1]) == {"level", "time"}
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows does not support forking")
+def test_process_fork_enqueue_shared(fork_context):
+    writers = [Writer() for _ in range(3)]
+
+    for writer in writers:
+        logger.add(writer, format="{message}", enqueue="shared", catch=False)
+
+    processes = [
+        fork_context.Process(target=subworker_many, args=(logger, index)) for index in range(4)
+    ]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    logger.info("Main")
+    logger.remove()
+
+    for writer in writers:
+        lines = writer.read().splitlines()
+        assert lines[-1] == "Main"
+        for index in range(4):
+            assert [line for line in lines if line.startswith("%d-" % index)] == [
+                "%d-%d" % (index, i) for i in range(500)
+            ]
+
+
+@pytest.mark.skipif(platform.python_implementation() == "PyPy", reason="PyPy bug #3630")
+def test_process_spawn_enqueue_shared(spawn_context):
+    writer_1, writer_2 = Writer(), Writer()
+
+    logger.add(writer_1, format="{message}", enqueue="shared", catch=False)
+    logger.add(writer_2, format="2: {message}", enqueue="shared", catch=False)
+
+    process = spawn_context.Process(target=subworker, args=(logger,))
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+
+    logger.info("Main")
+    logger.remove()
+
+    assert writer_1.read() == "Child\nMain\n"
+    assert writer_2.read() == "2: Child\n2: Main\n"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows does not support forking")
+def test_process_fork_enqueue_deferred(fork_context, tmp_path):
+    filepath = tmp_path / "test.log"
+    logger.add(filepath, format="{message}", enqueue="deferred", catch=False)
+
+    logger.info("Parent")
+    logger.complete()
+
+    process = fork_context.Process(target=subworker_inheritance)
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+
+    logger.info("Done!")
+    logger.remove()
+
+    assert filepath.read_text() == "Parent\nChild\nDone!\n"
+
+
+@pytest.mark.skipif(platform.python_implementation() == "PyPy", reason="PyPy bug #3630")
+def test_process_spawn_enqueue_deferred(spawn_context):
+    writer = Writer()
+    logger.add(writer, format="{message}", enqueue="deferred", catch=False)
+
+    logger.info("Parent")
+    logger.complete()
+
+    # The queue is internal to the parent, the child writes to its own copy of the sink.
+    process = spawn_context.Process(target=subworker, args=(logger,))
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+
+    logger.info("Done!")
+    logger.remove()
+
+    assert writer.read() == "Parent\nDone!\n"
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Shared memory requires Python 3.8+")
+def test_enqueue_shared_memory_message_too_large(monkeypatch, capsys):
+    monkeypatch.setattr(loguru._defaults, "LOGURU_SHARED_MEMORY_SIZE", 1024)
+    writer = Writer()
+
+    logger.add(writer, format="{message}", enqueue="shared_memory", catch=True)
+    logger.info("x" * 2000)
+    logger.info("Small")
+    logger.remove()
+
+    out, err = capsys.readouterr()
+    assert writer.read() == "Small\n"
+    assert "ValueError: The message is too large for the shared memory queue" in err
+
+
+def test_enqueue_shared_memory_requires_python_38(writer, monkeypatch):
+    monkeypatch.setattr(sys, "version_info", (3, 7, 0))
+
+    with pytest.raises(ValueError, match=r"requires Python 3.8"):
+        logger.add(writer, enqueue="shared_memory")
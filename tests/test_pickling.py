@@ -120,6 +120,18 @@ def test_pickling_stream_handler(flushable, stoppable):
     assert stream.stopped == stoppable
 
 
+def test_pickling_handler_enqueued_in_thread(capsys):
+    logger.add(print_, format="{level} - {function} - {message}", enqueue="thread")
+    pickled = pickle.dumps(logger)
+    unpickled = pickle.loads(pickled)
+    unpickled.debug("A message")
+    unpickled.complete()
+    unpickled.remove()
+    out, err = capsys.readouterr()
+    assert out == "DEBUG - test_pickling_handler_enqueued_in_thread - A message\n"
+    assert err == ""
+
+
 def test_pickling_standard_handler():
     handler = StandardHandler(logging.NOTSET)
     logger.add(handler, format="{level} - {function} - {message}")
@@ -1,7 +1,17 @@
+import copy
+import pickle
 import re
 
+import pytest
+
+import loguru
 import loguru._recattrs as recattrs
 from loguru import logger
+from loguru._code_cache import CodeCache
+
+
+def pickle_copy(obj):
+    return pickle.loads(pickle.dumps(obj))
 
 
 def test_patch_record_file(writer):
@@ -75,3 +85,189 @@ def test_exception_repr():
     exception = recattrs.RecordException(ValueError, ValueError("Nope"), None)
     regex = r"\(type=<class 'ValueError'>, value=ValueError\('Nope',?\), traceback=None\)"
     assert re.fullmatch(regex, repr(exception))
+
+
+def make_lazy_record():
+    records = []
+    logger.add(lambda m: None, format="{message}")
+    logger.patch(records.append).info("Test")
+    return records[0]
+
+
+def test_lazy_record_fields_not_computed(writer):
+    records = []
+    logger.add(writer, format="{time} {level} {message}")
+    logger.add(lambda m: records.append(m.record), format="{message}")
+    logger.info("Test")
+
+    assert sorted(dict.keys(records[0])) == [
+        "exception",
+        "extra",
+        "function",
+        "level",
+        "line",
+        "message",
+        "name",
+        "time",
+    ]
+
+
+def test_lazy_record_field_access():
+    record = make_lazy_record()
+
+    assert record["elapsed"].total_seconds() >= 0
+    assert record["file"].name == "test_recattr.py"
+    assert record["module"] == "test_recattr"
+    assert record["process"].name == "MainProcess"
+    assert record["thread"].name == "MainThread"
+    assert record["thread"] is record["thread"]
+
+    with pytest.raises(KeyError):
+        record["foobar"]
+
+
+def test_lazy_record_behaves_like_dict():
+    record = make_lazy_record()
+
+    assert list(record) == [
+        "elapsed",
+        "exception",
+        "extra",
+        "file",
+        "function",
+        "level",
+        "line",
+        "message",
+        "module",
+        "name",
+        "process",
+        "thread",
+        "time",
+    ]
+    assert len(record) == 13
+    assert "thread" in record
+    assert record.get("module") == "test_recattr"
+    assert dict(record) == record
+    assert record == dict(record)
+    assert {**record}["process"] is record["process"]
+    assert repr(record).startswith("{'elapsed': datetime.timedelta(")
+
+
+def test_lazy_record_key_removal():
+    record = make_lazy_record()
+
+    del record["thread"]
+    assert record.pop("process").name == "MainProcess"
+
+    with pytest.raises(KeyError):
+        record["thread"]
+
+    with pytest.raises(KeyError):
+        record["process"]
+
+    record.clear()
+
+    with pytest.raises(KeyError):
+        record["file"]
+
+
+def test_lazy_record_overridden_field():
+    record = make_lazy_record()
+    record["thread"] = "foo"
+    record.update(module="bar")
+
+    assert record["thread"] == "foo"
+    assert record["module"] == "bar"
+    assert record["file"].name == "test_recattr.py"
+    assert list(record) == list(make_lazy_record())
+
+
+def test_lazy_record_copy():
+    record = make_lazy_record()
+    copied = record.copy()
+    copied["message"] = "Copy"
+
+    assert copied["thread"].name == record["thread"].name
+    assert copied["message"] == "Copy"
+    assert record["message"] == "Test"
+    assert copied.keys() == record.keys()
+
+
+@pytest.mark.parametrize("copy_function", [pickle_copy, copy.copy, copy.deepcopy])
+def test_lazy_record_copy_module(copy_function):
+    record = make_lazy_record()
+    copied = copy_function(record)
+
+    assert type(copied) is dict
+    assert copied.keys() == record.keys()
+    assert copied["file"].name == "test_recattr.py"
+
+
+def test_code_cache_hits():
+    cache = CodeCache(maxsize=10)
+
+    def f():
+        pass
+
+    assert cache.get(f.__code__) == ("test_recattr.py", __file__, "test_recattr")
+    assert cache.get(f.__code__) == ("test_recattr.py", __file__, "test_recattr")
+    assert cache.cache_info() == (1, 1, 10, 1)
+
+    cache.cache_clear()
+    assert cache.cache_info() == (0, 0, 10, 0)
+
+
+def test_code_cache_identical_code_different_files():
+    cache = CodeCache(maxsize=10)
+    code_a = compile("x = 1", "/foo/a.py", "exec")
+    code_b = compile("x = 1", "/bar/b.py", "exec")
+
+    assert cache.get(code_a) == ("a.py", "/foo/a.py", "a")
+    assert cache.get(code_b) == ("b.py", "/bar/b.py", "b")
+    assert cache.cache_info().currsize == 2
+
+
+def test_code_cache_eviction():
+    cache = CodeCache(maxsize=3)
+    codes = [compile("x = %d" % i, "file_%d.py" % i, "exec") for i in range(5)]
+
+    for code in codes:
+        cache.get(code)
+
+    assert cache.cache_info() == (0, 5, 3, 3)
+
+    cache.get(codes[-1])
+    cache.get(codes[0])
+    assert cache.cache_info() == (1, 6, 3, 3)
+
+
+def test_code_cache_evicts_least_recently_used():
+    cache = CodeCache(maxsize=3)
+    codes = [compile("x = %d" % i, "file_%d.py" % i, "exec") for i in range(4)]
+
+    for code in codes[:3]:
+        cache.get(code)
+
+    cache.get(codes[0])
+    cache.get(codes[3])
+    assert cache.cache_info() == (1, 4, 3, 3)
+
+    cache.get(codes[0])
+    cache.get(codes[2])
+    cache.get(codes[3])
+    assert cache.cache_info() == (4, 4, 3, 3)
+
+    cache.get(codes[1])
+    assert cache.cache_info() == (4, 5, 3, 3)
+
+
+def test_code_cache_used_by_logger(writer):
+    loguru._logger.code_cache.cache_clear()
+    logger.add(writer, format="{file} {module} {function}")
+
+    for _ in range(3):
+        logger.info("Test")
+
+    hits, misses, *_ = loguru._logger.code_cache.cache_info()
+    assert writer.read() == "test_recattr.py test_recattr test_code_cache_used_by_logger\n" * 3
+    assert (hits, misses) == (2, 1)
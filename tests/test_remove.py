@@ -1,4 +1,7 @@
+import os
+import subprocess
 import sys
+import threading
 import time
 
 import pytest
@@ -110,3 +113,187 @@ def test_invalid_handler_id_value(writer):
 def test_invalid_handler_id_type(handler_id):
     with pytest.raises(TypeError, match=r"^Invalid handler id.*"):
         logger.remove(handler_id)
+
+
+class BarrierStopSink:
+    def __init__(self, barrier, error=None):
+        self.barrier = barrier
+        self.error = error
+
+    def write(self, message):
+        pass
+
+    def stop(self):
+        # Stopping the handlers one after the other would break the barrier.
+        self.barrier.wait()
+        if self.error is not None:
+            raise self.error
+
+
+def test_shutdown_removes_all_handlers(tmpdir, writer):
+    file = tmpdir.join("test.log")
+    logger.add(str(file), format="{message}", enqueue=True, compression="gz")
+    logger.add(writer, format="{message}", enqueue="thread")
+
+    logger.info("Message")
+    logger._shutdown()
+    logger.info("Nope")
+
+    assert writer.read() == "Message\n"
+    assert [f.basename for f in tmpdir.listdir()] == ["test.log.gz"]
+    assert repr(logger) == "<loguru.logger handlers=[]>"
+
+
+def test_shutdown_stops_handlers_concurrently():
+    barrier = threading.Barrier(4, timeout=5)
+    sinks = [BarrierStopSink(barrier) for _ in range(4)]
+
+    for sink in sinks:
+        logger.add(sink, enqueue="thread")
+
+    logger._shutdown()
+
+    assert not barrier.broken
+    assert repr(logger) == "<loguru.logger handlers=[]>"
+
+
+class BlockingStopSink:
+    def __init__(self):
+        self.unblocked = threading.Event()
+        self.stopped = threading.Event()
+
+    def write(self, message):
+        pass
+
+    def stop(self):
+        self.unblocked.wait(5)
+        self.stopped.set()
+
+
+def test_shutdown_timeout(capsys):
+    sink = BlockingStopSink()
+    logger.add(sink)
+
+    logger._shutdown(timeout=0.1)
+
+    assert not sink.stopped.is_set()
+    sink.unblocked.set()
+    assert sink.stopped.wait(5)
+
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "Loguru: 1 handler(s) could not be stopped within 0.1 seconds at exit\n"
+
+
+def test_shutdown_error_in_stop(capsys):
+    logger.add(StopSinkError(), catch=False)
+    logger._shutdown()
+
+    out, err = capsys.readouterr()
+    lines = err.strip().splitlines()
+
+    assert out == ""
+    assert lines[0] == "Traceback (most recent call last):"
+    assert lines[-1] == "Exception: Stop error"
+    assert repr(logger) == "<loguru.logger handlers=[]>"
+
+
+def test_shutdown_at_exit(tmpdir):
+    code = (
+        "from loguru import logger\n"
+        "logger.remove()\n"
+        "for i in range(3):\n"
+        "    logger.add(%r + '/file_%%d.log' %% i, enqueue=True, compression='gz')\n"
+        "logger.info('Message')\n" % str(tmpdir)
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    files = sorted(f.basename for f in tmpdir.listdir())
+    assert files == ["file_0.log.gz", "file_1.log.gz", "file_2.log.gz"]
+
+
+def shutdown_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("loguru-shutdown")]
+
+
+def test_shutdown_workers_not_started_by_add():
+    threads = shutdown_threads()
+
+    logger.add(lambda _: None, enqueue="thread")
+    logger.add(lambda _: None, enqueue="thread")
+
+    assert shutdown_threads() == threads
+
+
+def test_remove_stops_slow_handlers_concurrently(writer):
+    barrier = threading.Barrier(3, timeout=5)
+    sinks = [BarrierStopSink(barrier) for _ in range(3)]
+
+    for sink in sinks:
+        logger.add(sink, enqueue="thread", catch=False)
+    logger.add(writer, format="{message}")
+
+    logger.remove()
+    logger.info("Nope")
+
+    assert not barrier.broken
+    assert len(shutdown_threads()) >= 3
+    assert writer.read() == ""
+    assert repr(logger) == "<loguru.logger handlers=[]>"
+
+
+def test_remove_slow_handlers_concurrently_with_error():
+    barrier = threading.Barrier(2, timeout=5)
+    logger.add(BarrierStopSink(barrier), enqueue="thread", catch=False)
+    logger.add(BarrierStopSink(barrier, Exception("Stop error")), enqueue="thread", catch=False)
+
+    with pytest.raises(Exception, match=r"Stop error"):
+        logger.remove()
+
+    assert not barrier.broken
+    assert repr(logger) == "<loguru.logger handlers=[]>"
+
+
+BARRIER_STOP_SINKS_AT_EXIT = """
+import sys, threading
+from loguru import logger
+
+# The handlers can only be stopped if they all wait for the barrier at the same time.
+barrier = threading.Barrier(%d, timeout=5)
+
+class BarrierStopSink:
+    def __init__(self, i):
+        self.i = i
+    def write(self, message):
+        pass
+    def stop(self):
+        barrier.wait()
+        sys.stdout.write("Stopped %%d\\n" %% self.i)
+
+logger.remove()
+for i in range(4):
+    logger.add(BarrierStopSink(i), enqueue="thread")
+logger.info("Message")
+"""
+
+
+def test_shutdown_at_exit_stops_handlers_concurrently():
+    code = BARRIER_STOP_SINKS_AT_EXIT % 4
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    assert sorted(result.stdout.decode().splitlines()) == ["Stopped %d" % i for i in range(4)]
+    assert result.stderr == b""
+
+
+def test_shutdown_at_exit_timeout():
+    # The barrier is never reached, the process exits before it is broken.
+    code = BARRIER_STOP_SINKS_AT_EXIT % 5
+    env = dict(os.environ, LOGURU_SHUTDOWN_TIMEOUT="1")
+    result = subprocess.run(
+        [sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
+    )
+
+    assert result.stdout == b""
+    assert result.stderr == b"Loguru: 4 handler(s) could not be stopped within 1 seconds at exit\n"